@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Build everything generated from the Bible corpus, rebuilding only what changed.
+
+The build is a graph of stages, each one of the existing scripts:
+
+    parse        data/corpus_parser.py             parsed-chapter cache (used by audio)
+    index        data/generate_index.py            search index
+    bundles      data/generate_bundles.py          offline download bundles
+    lexicon      data/generate_lexicon.py          lexicon store, per-chapter lexicon bundles
+    precompress  data/precompress.py               .gz/.br sidecars      (after index, bundles,
+                                                                          lexicon; not with
+                                                                          --no-sidecars)
+    manifest     data/generate_content_manifest.py content manifest      (after precompress)
+    audio        generate_audio.py --incremental   chapter audio         (after parse, manifest;
+                                                                          only with --voice)
+
+A stage runs when the content hash of one of its inputs (source files,
+the script itself, or an upstream stage's outputs) has changed since it
+last succeeded, when its outputs were changed or deleted since, or when
+its options differ. Stages whose dependencies are done run in parallel.
+Fingerprints are kept in .cache/build_state.json; files are only hashed
+again when their size or mtime changed.
+
+Usage:
+    python3 build.py                       Build everything except audio
+    python3 build.py manifest              Build the manifest and what it depends on
+    python3 build.py --dry-run             Show which stages are out of date
+    python3 build.py --no-sidecars         For hosts that don't serve .gz/.br files (GitHub Pages)
+    python3 build.py --voice "en-US-JennyNeural" --audio-args "--workers 4"
+"""
+
+import os
+import sys
+import json
+import shlex
+import hashlib
+import argparse
+import threading
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join('.cache', 'build_state.json')
+
+# Bump when the fingerprint format changes, so every stage runs once
+STATE_VERSION = 1
+
+# Source file sets: (directory, suffixes) or a single file
+CHAPTERS = ('bibles', ('.md',))
+BSB_CHAPTERS = ('bibles/BSB', ('.md',))
+LEXICON = ('lexicon', ('.md',))
+PLANS = ('plans', ('.json',))
+MANIFEST_SCRIPT = 'data/generate_content_manifest.py'
+
+# Outputs of one stage that are inputs of another
+SEARCH_OUTPUTS = ['data/search_index.json', ('data/search', ('.json',)),
+                  'data/search_columnar.json', ('data/search_trigrams', ('.json',))]
+BUNDLE_OUTPUTS = [('data/bundles', ('.pack', '.index.json'))]
+LEXICON_OUTPUTS = [('data/lexicon_store', ('.pack', '.json'))]
+PRECOMPRESS_STATE = '.cache/precompress.json'
+CONTENT_MANIFEST = 'data/content_manifest.json'
+PARSED_CORPUS = '.cache/parsed_corpus.json'
+
+print_lock = threading.Lock()
+
+
+# ============================================================================
+# Stages
+# ============================================================================
+
+class Stage:
+    """A build step: a command, the stages it runs after, and the files it reads and writes."""
+
+    def __init__(self, name: str, command: List[str], deps: List[str], inputs: List, outputs: List):
+        self.name = name
+        self.command = command
+        self.deps = deps
+        self.inputs = inputs
+        self.outputs = outputs
+
+
+def build_stages(args) -> Dict[str, Stage]:
+    """The stage graph for the given options."""
+    python = sys.executable
+    index_options = ['--columnar'] * args.columnar + ['--trigrams'] * args.trigrams
+    full = ['--full'] * args.full
+    jobs = ['--jobs', str(args.jobs)] if args.jobs else []
+
+    stages = [
+        Stage('parse', [python, 'data/corpus_parser.py'], [],
+              [CHAPTERS, 'data/corpus_parser.py', MANIFEST_SCRIPT],
+              [PARSED_CORPUS]),
+        Stage('index', [python, 'data/generate_index.py'] + index_options + full + jobs, ['parse'],
+              [BSB_CHAPTERS, PARSED_CORPUS, 'data/generate_index.py', 'data/corpus_parser.py',
+               'data/precompress.py'],
+              SEARCH_OUTPUTS),
+        Stage('bundles', [python, 'data/generate_bundles.py'], [],
+              [CHAPTERS, LEXICON, 'data/generate_bundles.py', MANIFEST_SCRIPT],
+              BUNDLE_OUTPUTS),
+        Stage('lexicon', [python, 'data/generate_lexicon.py'], [],
+              [CHAPTERS, LEXICON, 'data/generate_lexicon.py', 'data/generate_bundles.py', MANIFEST_SCRIPT],
+              LEXICON_OUTPUTS),
+        Stage('precompress', [python, 'data/precompress.py'] + full + jobs, ['index', 'bundles', 'lexicon'],
+              [CHAPTERS, LEXICON, PLANS, 'data/precompress.py', MANIFEST_SCRIPT]
+              + SEARCH_OUTPUTS + BUNDLE_OUTPUTS + LEXICON_OUTPUTS,
+              [PRECOMPRESS_STATE]),
+        Stage('manifest', [python, MANIFEST_SCRIPT], ['precompress'],
+              [CHAPTERS, LEXICON, PLANS, MANIFEST_SCRIPT, PRECOMPRESS_STATE]
+              + SEARCH_OUTPUTS + BUNDLE_OUTPUTS + LEXICON_OUTPUTS,
+              [CONTENT_MANIFEST, ('data/content_deltas', ('.json',))]),
+    ]
+    if args.no_sidecars:
+        # The manifest then follows the content stages directly
+        stages = [stage for stage in stages if stage.name != 'precompress']
+        manifest = stages[-1]
+        manifest.deps = ['index', 'bundles', 'lexicon']
+        manifest.inputs = [i for i in manifest.inputs if i != PRECOMPRESS_STATE]
+    if args.voice:
+        stages.append(Stage('audio', [python, 'generate_audio.py', '--voice', args.voice, '--incremental']
+                            + shlex.split(args.audio_args or ''), ['parse', 'manifest'],
+                            [CHAPTERS, CONTENT_MANIFEST, PARSED_CORPUS, 'generate_audio.py',
+                             'data/corpus_parser.py'],
+                            ['audio/build_manifest.json']))
+    return {stage.name: stage for stage in stages}
+
+
+def select_stages(stages: Dict[str, Stage], targets: List[str]) -> List[str]:
+    """Names of the targets and everything they depend on, in graph order."""
+    wanted = set()
+    pending = list(targets or stages)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(stages[name].deps)
+    return [name for name in stages if name in wanted]
+
+
+# ============================================================================
+# Fingerprints
+# ============================================================================
+
+class FileHashes:
+    """
+    Content hashes of files, reusing a stored hash while the file's size
+    and mtime are unchanged.
+    """
+
+    def __init__(self, entries: Dict[str, List]):
+        self.entries = entries
+        self.seen = {}
+
+    def get(self, path: str) -> Optional[str]:
+        """Hash of a file relative to BASE_DIR, or None if it doesn't exist."""
+        try:
+            stat = os.stat(os.path.join(BASE_DIR, path))
+        except OSError:
+            return None
+        entry = self.entries.get(path)
+        if not entry or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            digest = hashlib.sha256()
+            with open(os.path.join(BASE_DIR, path), 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            entry = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()[:16]]
+            self.entries[path] = entry
+        self.seen[path] = entry
+        return entry[2]
+
+
+def expand(spec) -> List[str]:
+    """Paths of a file set: a single file, or (directory, suffixes)."""
+    if isinstance(spec, str):
+        return [spec]
+    directory, suffixes = spec
+    paths = []
+    for root, dirs, filenames in os.walk(os.path.join(BASE_DIR, directory)):
+        for filename in filenames:
+            if filename.endswith(suffixes):
+                paths.append(os.path.relpath(os.path.join(root, filename), BASE_DIR).replace(os.sep, '/'))
+    return paths
+
+
+def fingerprint(specs: List, hashes: FileHashes, extra: str = '') -> str:
+    """Hash of every path and content hash in the file sets (missing files count too)."""
+    digest = hashlib.sha256(extra.encode('utf-8'))
+    for path in sorted({path for spec in specs for path in expand(spec)}):
+        digest.update(f"{path}\t{hashes.get(path)}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def stage_key(stage: Stage) -> str:
+    """What a stage's inputs fingerprint includes besides files: its command line."""
+    return ' '.join(stage.command[1:])
+
+
+def load_state() -> Dict:
+    try:
+        with open(os.path.join(BASE_DIR, STATE_FILE), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    if state.get("version") != STATE_VERSION:
+        state = {"version": STATE_VERSION, "files": {}, "stages": {}}
+    return state
+
+
+def save_state(state: Dict, hashes: FileHashes):
+    # Keep only the files this run looked at
+    state["files"] = dict(sorted(hashes.seen.items()))
+    path = os.path.join(BASE_DIR, STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+
+def out_of_date(stage: Stage, state: Dict, hashes: FileHashes) -> Optional[str]:
+    """Why a stage has to run, or None if it is up to date."""
+    record = state["stages"].get(stage.name)
+    if not record:
+        return "never built"
+    if record["inputs"] != fingerprint(stage.inputs, hashes, stage_key(stage)):
+        return "inputs changed"
+    if record["outputs"] != fingerprint(stage.outputs, hashes):
+        return "outputs changed"
+    return None
+
+
+# ============================================================================
+# Running
+# ============================================================================
+
+def run_stage(stage: Stage) -> bool:
+    """Run a stage's command from the repository root, prefixing its output with its name."""
+    process = subprocess.Popen(stage.command, cwd=BASE_DIR, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, bufsize=1)
+    for line in process.stdout:
+        with print_lock:
+            print(f"[{stage.name}] {line}", end='', flush=True)
+    return process.wait() == 0
+
+
+def build(targets: List[str], args) -> bool:
+    """Run the out-of-date stages needed for targets. Returns False if any failed."""
+    stages = build_stages(args)
+    names = select_stages(stages, targets)
+    state = load_state()
+    hashes = FileHashes(state["files"])
+
+    if args.dry_run:
+        # A stage after one that runs may find nothing changed; it is listed as "maybe"
+        running = set()
+        for name in names:
+            stage = stages[name]
+            reason = None if args.force else out_of_date(stage, state, hashes)
+            upstream = [dep for dep in stage.deps if dep in running]
+            if args.force or reason:
+                running.add(name)
+                print(f"  run    {name:<12} {reason or 'forced'}")
+            elif upstream:
+                running.add(name)
+                print(f"  maybe  {name:<12} after {', '.join(upstream)}")
+            else:
+                print(f"  ok     {name}")
+        return True
+
+    done, failed, skipped = set(), set(), set()
+    ran = []
+    inputs = {}
+    futures = {}
+    with ThreadPoolExecutor(max_workers=args.parallel or len(names)) as pool:
+        while len(done | failed | skipped) < len(names):
+            for name in names:
+                stage = stages[name]
+                if name in done | failed | skipped or name in futures.values():
+                    continue
+                if any(dep in failed | skipped for dep in stage.deps):
+                    skipped.add(name)
+                    print(f"Skipping {name}: {', '.join(d for d in stage.deps if d in failed | skipped)} "
+                          f"did not build")
+                    continue
+                if not all(dep in done for dep in stage.deps):
+                    continue
+                reason = 'forced' if args.force else out_of_date(stage, state, hashes)
+                if not reason:
+                    done.add(name)
+                    continue
+                # Taken before the run, so an edit made while it runs is seen next time
+                inputs[name] = fingerprint(stage.inputs, hashes, stage_key(stage))
+                with print_lock:
+                    print(f"Running {name} ({reason}): {' '.join(stage.command[1:])}", flush=True)
+                futures[pool.submit(run_stage, stage)] = name
+            if not futures:
+                continue
+
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = futures.pop(future)
+                stage = stages[name]
+                if future.result():
+                    state["stages"][name] = {
+                        "inputs": inputs[name],
+                        "outputs": fingerprint(stage.outputs, hashes)
+                    }
+                    done.add(name)
+                    ran.append(name)
+                else:
+                    state["stages"].pop(name, None)
+                    failed.add(name)
+                    print(f"Stage {name} failed.")
+                save_state(state, hashes)
+
+    save_state(state, hashes)
+    if ran:
+        print(f"Built: {', '.join(ran)}.")
+    else:
+        print("Everything is up to date.")
+    if failed or skipped:
+        print(f"Failed: {', '.join(sorted(failed))}"
+              + (f"; skipped: {', '.join(sorted(skipped))}" if skipped else ''))
+    return not failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build everything generated from the corpus, '
+                                                 'rebuilding only what changed')
+    parser.add_argument('targets', nargs='*', metavar='STAGE',
+                        help='Stages to build, with what they depend on '
+                             '(parse, index, bundles, lexicon, precompress, manifest, audio; '
+                             'default: all)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Show which stages are out of date without running them')
+    parser.add_argument('--force', action='store_true',
+                        help='Run every selected stage, even if it is up to date')
+    parser.add_argument('--full', action='store_true',
+                        help='Also have the index and precompress stages ignore their own caches')
+    parser.add_argument('--parallel', type=int, metavar='N',
+                        help='Stages to run at once (default: all that are ready)')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='Worker processes for the index and precompress stages')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Also build the columnar search index')
+    parser.add_argument('--trigrams', action='store_true',
+                        help='Also build the trigram search index')
+    parser.add_argument('--no-sidecars', action='store_true',
+                        help='Skip the precompress stage, for hosts that do not serve '
+                             'precompressed files (GitHub Pages)')
+    parser.add_argument('--voice', metavar='NAME',
+                        help='Voice for the audio stage; without it, audio is not built')
+    parser.add_argument('--audio-args', metavar='ARGS',
+                        help='More options for generate_audio.py, e.g. "--workers 4"')
+    args = parser.parse_args()
+
+    known = list(build_stages(args))
+    for target in args.targets:
+        if target == 'audio' and not args.voice:
+            parser.error("the audio stage needs --voice")
+        if target not in known:
+            parser.error(f"unknown stage '{target}' (choose from {', '.join(known)})")
+    sys.exit(0 if build(args.targets, args) else 1)
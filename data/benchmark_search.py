@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark the search index formats with a fixed query corpus.
+
+Each format is measured in its own process (see search_engine.py for the
+engines), so load time and memory are not skewed by the others:
+
+    load        seconds to open the index (the word index reads only meta.json)
+    index RSS   resident memory added by loading, and by the end of the run
+    cold        the first pass over the corpus, including shards read on demand
+    p50/95/99   query latency over the warm passes
+
+    python3 data/benchmark_search.py
+    python3 data/benchmark_search.py --formats flat word --repeat 10 --json bench.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import subprocess
+from typing import Dict, List, Optional
+
+try:
+    from data.search_engine import FORMATS, available_formats, load_book_order
+except ImportError:
+    from search_engine import FORMATS, available_formats, load_book_order
+
+# The fixed corpus: (kind, query)
+QUERIES = [
+    ('word', 'love'), ('word', 'faith'), ('word', 'shepherd'), ('word', 'jerusalem'),
+    ('word', 'repent'), ('word', "lord's"), ('word', 'the'),
+    ('prefix', 'lov'), ('prefix', 'begin'), ('prefix', 'righteous'),
+    ('phrase', 'in the beginning'), ('phrase', 'god so loved'), ('phrase', 'son of man'),
+    ('phrase', 'bread of life'), ('phrase', 'the lord is my shepherd'),
+    ('proximity', 'living water'), ('proximity', 'grace peace'), ('proximity', 'light darkness'),
+    ('proximity', 'abraham isaac jacob'), ('proximity', 'amen amen'),
+    ('strongs', 'H7225'), ('strongs', 'G26'), ('strongs', 'H3068'), ('strongs', 'G2316 G26'),
+    ('substring', 'otten'), ('substring', 'salem'),
+    ('fuzzy', 'begoten'), ('fuzzy', 'Nebuchadnezer'), ('fuzzy', 'jehosaphat'),
+    ('none', 'zzzqqq'),
+]
+
+
+def resident_bytes() -> Optional[int]:
+    """Current resident set size, or the peak where only that is available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def run_format(name: str, repeat: int) -> Dict:
+    """Measure one format in this process (see module docstring)."""
+    book_order = load_book_order()
+    baseline = resident_bytes()
+
+    started = time.perf_counter()
+    engine = FORMATS[name]()
+    engine.book_order = book_order
+    load_seconds = time.perf_counter() - started
+    loaded = resident_bytes()
+
+    def run_pass():
+        latencies = {}
+        for kind, query in QUERIES:
+            started = time.perf_counter()
+            results = engine.search(query)
+            latencies.setdefault(kind, []).append((time.perf_counter() - started, len(results)))
+        return latencies
+
+    cold = run_pass()
+    warm = {}
+    for _ in range(repeat):
+        for kind, samples in run_pass().items():
+            warm.setdefault(kind, []).extend(seconds for seconds, _ in samples)
+    finished = resident_bytes()
+
+    latencies = [seconds for samples in warm.values() for seconds in samples]
+    return {
+        "format": name,
+        "loadSeconds": load_seconds,
+        "rssLoaded": loaded - baseline if baseline is not None else None,
+        "rssFinished": finished - baseline if baseline is not None else None,
+        "coldSeconds": sum(seconds for samples in cold.values() for seconds, _ in samples),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "byKind": {kind: {"p50": percentile(samples, 50), "results": cold[kind][0][1]}
+                   for kind, samples in warm.items()},
+        "queries": len(QUERIES),
+        "repeat": repeat
+    }
+
+
+def format_bytes(size):
+    if size is None:
+        return '-'
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.2f} ms"
+
+
+def print_report(reports: List[Dict]):
+    print(f"\n{'Format':<14} {'Load':>10} {'Index RSS':>10} {'After run':>10} {'Cold':>11} "
+          f"{'p50':>10} {'p95':>10} {'p99':>10}")
+    for r in reports:
+        print(f"{r['format']:<14} {format_ms(r['loadSeconds']):>10} {format_bytes(r['rssLoaded']):>10} "
+              f"{format_bytes(r['rssFinished']):>10} {format_ms(r['coldSeconds']):>11} "
+              f"{format_ms(r['p50']):>10} {format_ms(r['p95']):>10} {format_ms(r['p99']):>10}")
+
+    kinds = list(dict.fromkeys(kind for kind, _ in QUERIES))
+    print(f"\np50 by query kind:\n{'Format':<14} " + " ".join(f"{kind:>10}" for kind in kinds))
+    for r in reports:
+        print(f"{r['format']:<14} " + " ".join(f"{format_ms(r['byKind'][kind]['p50']):>10}"
+                                              for kind in kinds))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the search index formats')
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), metavar='FORMAT',
+                        help=f"Formats to measure (default: every generated one of {', '.join(FORMATS)})")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Warm passes over the query corpus (default: 5)')
+    parser.add_argument('--json', metavar='FILE', help='Also write the measurements as JSON')
+    parser.add_argument('--worker', choices=list(FORMATS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_format(args.worker, args.repeat)))
+        raise SystemExit(0)
+
+    present = available_formats()
+    formats = args.formats or present
+    missing = [name for name in formats if name not in present]
+    if missing:
+        print(f"Error: not generated: {', '.join(missing)} (see data/generate_index.py).")
+        raise SystemExit(1)
+    if not formats:
+        print("Error: no search index found. Run data/generate_index.py first.")
+        raise SystemExit(1)
+
+    print(f"Running {len(QUERIES)} queries, 1 cold + {args.repeat} warm passes per format...")
+    reports = []
+    for name in formats:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', name,
+                                 '--repeat', str(args.repeat)],
+                                check=True, capture_output=True, text=True).stdout
+        reports.append(json.loads(output))
+        print(f"  {name}: done")
+    print_report(reports)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"queries": QUERIES, "formats": reports}, f, indent=2)
+        print(f"\nWrote {args.json}")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Shared single-pass parser for Bible chapter markdown.
+
+A chapter is tokenized once into verse records of (verse number, words,
+Strong's codes). Every build tool derives its own view of the text from
+those records instead of re-running its own regexes:
+
+    verse_tts_text()    plain text for speech synthesis (generate_audio.py)
+    verse_index_text()  text with inline [[H1234]] codes (generate_index.py)
+
+ParsedCorpus caches parsed chapters on disk, keyed by file mtime/size and
+content hash, so only chapters that changed are parsed again. Running this
+module brings the shared cache (CACHE_FILE) up to date for every chapter.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+# A verse marker line: "###### 12"
+VERSE_MARKER = re.compile(r'^######\s+(\d+)\s*$')
+
+# A Strong's code token ([[G976]], [[H1234]]) with the whitespace before it.
+# Splitting a line on this yields alternating text runs and codes.
+CODE_SPLIT = re.compile(r'\s*(?<!\S)\[\[([GH]\d+)\]\](?!\S)')
+
+# Characters that never belong in spoken text
+NAV_CHARS = '←→•'
+MARKUP_CHARS = set('[]*←→•')
+
+CACHE_VERSION = 1
+
+# The cache the build tools share, relative to the repository root
+CACHE_FILE = os.path.join('.cache', 'parsed_corpus.json')
+
+
+def parse_chapter(content):
+    """
+    Parse chapter markdown in a single pass.
+
+    Returns a dict:
+        {"title": "Genesis 1",
+         "verses": [{"v": 1, "w": "In the beginning God ...", "c": [[2, "H7225"], ...]}, ...]}
+
+    "w" holds the verse's words as written (brackets, braces and punctuation
+    kept), separated by single spaces. "c" lists Strong's codes as
+    [word_index, code], where word_index is the word the code follows
+    (-1 if it precedes every word).
+    """
+    title = ''
+    verses = []
+    words = None
+    codes = None
+    verse_num = 0
+    in_front_matter = content.startswith('---')
+
+    def finish():
+        if words or codes:
+            verses.append({"v": verse_num, "w": ' '.join(words), "c": codes})
+
+    for line_no, line in enumerate(content.split('\n')):
+        stripped = line.strip()
+
+        # YAML front matter runs to the next '---'
+        if in_front_matter:
+            if line_no > 0 and stripped == '---':
+                in_front_matter = False
+            continue
+
+        if not title and line.startswith('# '):
+            title = line[2:].strip()
+            continue
+
+        if stripped.startswith('######'):
+            marker = VERSE_MARKER.match(stripped)
+            if marker:
+                if words is not None:
+                    finish()
+                verse_num = int(marker.group(1))
+                words = []
+                codes = []
+                continue
+
+        # Anything before the first verse is chapter header/navigation
+        if words is None or not stripped:
+            continue
+
+        # Even entries are runs of words, odd entries are codes
+        parts = CODE_SPLIT.split(stripped)
+        for i, part in enumerate(parts):
+            if i % 2:
+                codes.append([len(words) - 1, part])
+            elif part:
+                words.extend(part.split())
+
+    if words is not None:
+        finish()
+
+    return {"title": title, "verses": verses}
+
+
+def _spoken_word(word):
+    """Strip markup from a word for speech; returns '' if nothing is left."""
+    if '[' in word or ']' in word:
+        # Broken code fragments like "[[HThou" lose the "[[H" prefix
+        if word.startswith('[['):
+            word = word[2:]
+            if word[:1] in ('G', 'H'):
+                word = word[1:]
+            word = word.lstrip('0123456789')
+        # Single brackets mark translator insertions ([was]); Azure TTS
+        # would read them as paralinguistic notation
+        word = word.replace('[', '').replace(']', '')
+    if '*' in word:
+        word = word.replace('*', '')
+    if word == '---' or word.strip(NAV_CHARS) == '':
+        return ''
+    return word
+
+
+def verse_tts_text(verse):
+    """Plain text of a verse for speech synthesis."""
+    text = verse["w"]
+    if MARKUP_CHARS.isdisjoint(text) and '---' not in text:
+        return text
+    return ' '.join(w for w in map(_spoken_word, text.split()) if w)
+
+
+def verse_words(verse):
+    """The words of a verse as a list."""
+    return verse["w"].split() if verse["w"] else []
+
+
+def verse_index_text(verse):
+    """Verse text with Strong's codes inline, as in the search index."""
+    codes = verse["c"]
+    if not codes:
+        return verse["w"]
+
+    parts = []
+    code_iter = iter(codes)
+    pending = next(code_iter, None)
+
+    # Codes that precede every word
+    while pending is not None and pending[0] < 0:
+        parts.append(f"[[{pending[1]}]]")
+        pending = next(code_iter, None)
+
+    for i, word in enumerate(verse_words(verse)):
+        parts.append(word)
+        while pending is not None and pending[0] == i:
+            parts.append(f"[[{pending[1]}]]")
+            pending = next(code_iter, None)
+
+    return ' '.join(parts)
+
+
+def verse_codes(verse):
+    """Strong's codes of a verse, in order of appearance."""
+    return [code for _, code in verse["c"]]
+
+
+class ParsedCorpus:
+    """
+    Parsed chapters with an on-disk cache.
+
+    A cached entry is reused without reading the file when its mtime and
+    size are unchanged; otherwise the file is read and hashed, and only
+    parsed again if the content actually differs. Safe to share between
+    threads.
+    """
+
+    def __init__(self, base_dir, cache_path=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.cache_path = cache_path
+        self.entries = {}
+        self.parsed = 0
+        self.reused = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == CACHE_VERSION:
+            self.entries = data.get('chapters', {})
+
+    def _key(self, path):
+        """Cache key: path relative to the base directory, with '/' separators."""
+        full_path = os.path.abspath(path)
+        rel_path = os.path.relpath(full_path, self.base_dir)
+        return full_path, rel_path.replace(os.sep, '/')
+
+    def get(self, path):
+        """Return the parsed chapter at path (see parse_chapter)."""
+        full_path, key = self._key(path)
+        stat = os.stat(full_path)
+
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            with self._lock:
+                self.reused += 1
+            return entry['chapter']
+
+        with open(full_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if entry and entry['hash'] == digest:
+            chapter = entry['chapter']
+            with self._lock:
+                self.reused += 1
+        else:
+            chapter = parse_chapter(raw.decode('utf-8'))
+            with self._lock:
+                self.parsed += 1
+
+        self._store(key, stat.st_mtime_ns, stat.st_size, digest, chapter)
+        return chapter
+
+    def _store(self, key, mtime, size, digest, chapter):
+        with self._lock:
+            self.entries[key] = {
+                "mtime": mtime,
+                "size": size,
+                "hash": digest,
+                "chapter": chapter
+            }
+            self._dirty = True
+
+    def current(self, path):
+        """
+        Content hash of the chapter at path if its cached entry is current
+        (same mtime and size), else None. Only stats the file.
+        """
+        full_path, key = self._key(path)
+        stat = os.stat(full_path)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry['hash']
+        return None
+
+    def add(self, path, mtime, size, digest, chapter):
+        """
+        Store a chapter that was read and parsed elsewhere (in a worker
+        process), as get would have: mtime in nanoseconds, digest the
+        SHA-256 of the file.
+        """
+        _, key = self._key(path)
+        with self._lock:
+            self.parsed += 1
+        self._store(key, mtime, size, digest, chapter)
+
+    def content_hash(self, path):
+        """SHA-256 of the chapter file, from the cache when it is current."""
+        self.get(path)
+        _, key = self._key(path)
+        with self._lock:
+            return self.entries[key]['hash']
+
+    def save(self):
+        """Write the cache if anything changed."""
+        if not self.cache_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": CACHE_VERSION, "chapters": self.entries}
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            # dumps() uses the C encoder; dump() streams through the pure
+            # Python one, which is several times slower for a cache this size
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+
+
+if __name__ == '__main__':
+    try:
+        from data.generate_content_manifest import collect_files
+    except ImportError:
+        from generate_content_manifest import collect_files
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    corpus = ParsedCorpus(base_dir, os.path.join(base_dir, CACHE_FILE))
+    for path in collect_files(base_dir):
+        if path.startswith('bibles/'):
+            corpus.get(os.path.join(base_dir, path))
+    corpus.save()
+    print(f"Parsed {corpus.parsed} chapter(s), {corpus.reused} unchanged.")
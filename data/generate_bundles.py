@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Pack the many small offline content files into a few bundles.
+Run this before generate_content_manifest.py, which lists the bundles.
+
+Chapters are packed per book and lexicon entries per range of 1000
+codes. A bundle is its files' bytes back to back, with an index of where
+each file lies:
+
+    data/bundles/<name>.pack          the packed files
+    data/bundles/<name>.index.json    {"bundle": path of the pack, "size", "hash",
+                                       "files": {path: [offset, length, hash]}}
+
+Hashes are in the manifest's form (see generate_content_manifest.py), so
+a client can fetch a whole book in one request, or a single entry with
+an HTTP Range request, and check what it got.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+try:
+    from data.generate_content_manifest import collect_files, HASH_LENGTH
+except ImportError:
+    from generate_content_manifest import collect_files, HASH_LENGTH
+
+BUNDLE_DIR = os.path.join('data', 'bundles')
+
+# Lexicon codes per bundle (H1000-H1999 -> lexicon-H1000)
+LEXICON_GROUP = 1000
+
+CHAPTER_PATH = re.compile(r'bibles/([^/]+)/(?:BER-)?([^/]+)/[^/]+\.md')
+LEXICON_PATH = re.compile(r'lexicon/([GH])(\d+)\.md')
+
+
+def bundle_of(path):
+    """Name of the bundle a content file goes in, or None to leave it loose."""
+    match = CHAPTER_PATH.fullmatch(path)
+    if match:
+        translation, book = match.groups()
+        return f"bible-{translation}-{book}".replace(' ', '_')
+    match = LEXICON_PATH.fullmatch(path)
+    if match:
+        prefix, number = match.group(1), int(match.group(2))
+        return f"lexicon-{prefix}{number // LEXICON_GROUP * LEXICON_GROUP}"
+    return None
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def write_if_changed(path, data):
+    """Write bytes unless the file already holds them. Returns True if written."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def generate_bundles():
+    """Write every bundle and its index; remove bundles that are no longer produced."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    bundle_dir = os.path.join(base_dir, BUNDLE_DIR)
+
+    groups = {}
+    loose = 0
+    for path in collect_files(base_dir):
+        name = bundle_of(path)
+        if name:
+            groups.setdefault(name, []).append(path)
+        else:
+            loose += 1
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    written = 0
+    total = 0
+    for name, paths in sorted(groups.items()):
+        chunks = []
+        files = {}
+        offset = 0
+        for path in paths:
+            with open(os.path.join(base_dir, path), 'rb') as f:
+                data = f.read()
+            files[path] = [offset, len(data), content_hash(data)]
+            chunks.append(data)
+            offset += len(data)
+        payload = b''.join(chunks)
+        total += len(payload)
+
+        bundle_path = f"{BUNDLE_DIR}/{name}.pack".replace(os.sep, '/')
+        index = {"bundle": bundle_path, "size": len(payload), "hash": content_hash(payload),
+                 "files": files}
+        written += write_if_changed(os.path.join(bundle_dir, f'{name}.pack'), payload)
+        write_if_changed(os.path.join(bundle_dir, f'{name}.index.json'),
+                         json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    # Bundles of content that no longer exists, with their precompressed
+    # sidecars (see precompress.py)
+    keep = {f'{name}{ext}{sidecar}' for name in groups for ext in ('.pack', '.index.json')
+            for sidecar in ('', '.gz', '.br')}
+    for filename in os.listdir(bundle_dir):
+        if filename not in keep:
+            os.remove(os.path.join(bundle_dir, filename))
+
+    packed = sum(map(len, groups.values()))
+    print(f"Packed {packed} files ({total / (1024 * 1024):.1f} MB) into {len(groups)} bundles "
+          f"({written} rewritten); {loose} files stay loose.")
+    print(f"Output: {bundle_dir}")
+
+
+if __name__ == '__main__':
+    generate_bundles()
@@ -2,17 +2,49 @@
 """
 Generate a manifest of all Bible content files for offline caching.
 Run this script whenever you add new Bible content.
+
+Every file is listed with its content hash and size, and the manifest's
+version is derived from those hashes, so it only changes when content
+does. When it changes, a delta manifest from the previous version is
+written to data/content_deltas/, letting a client that synced an earlier
+version download just the files that changed.
+
+Bundles packed by generate_bundles.py (run it first) are listed too, so
+a client can download chapters and lexicon entries a book or a code
+range at a time instead of file by file.
+
+Where precompress.py has written .gz/.br sidecars for the current
+content, and they are still on disk to be served, their sizes are listed
+as well, so a client can tell how much a download will actually transfer.
 """
 
 import os
+import re
 import json
+import hashlib
 
-def generate_content_manifest():
-    """Generate a JSON manifest of all content files."""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
+# Manifest layout; "version" is the content version
+MANIFEST_FORMAT = 2
+
+# Hex digits kept of each file's SHA-256 (64 bits is plenty to spot a change)
+HASH_LENGTH = 16
+
+# Versions a client can catch up from with deltas; older clients compare hashes
+MAX_HISTORY = 20
+
+# An entry ([hash, size, gzip, brotli], [offset, length]) as
+# json.dump(indent=2) spreads it over a line per item
+SPREAD_ENTRY = re.compile(r'\[\n\s+((?:(?:"[0-9a-f]+"|\d+|null),\n\s+)+(?:\d+|null))\n\s+\]')
+SPREAD_ITEM = re.compile(r',\n\s+')
+
+BUNDLE_DIR = os.path.join('data', 'bundles')
+PRECOMPRESS_STATE = os.path.join('.cache', 'precompress.json')
+
+
+def collect_files(base_dir):
+    """Content files to cache offline, as paths relative to base_dir."""
     files = []
-    
+
     # Bible chapters
     bibles_dir = os.path.join(base_dir, 'bibles')
     if os.path.exists(bibles_dir):
@@ -26,7 +58,7 @@ def generate_content_manifest():
                         full_path = os.path.join(root, filename)
                         relative_path = os.path.relpath(full_path, base_dir).replace('\\', '/')
                         files.append(relative_path)
-    
+
     # Lexicon files
     lexicon_dir = os.path.join(base_dir, 'lexicon')
     if os.path.exists(lexicon_dir):
@@ -35,7 +67,7 @@ def generate_content_manifest():
                 full_path = os.path.join(lexicon_dir, filename)
                 relative_path = os.path.relpath(full_path, base_dir).replace('\\', '/')
                 files.append(relative_path)
-    
+
     # Reading plans
     plans_dir = os.path.join(base_dir, 'plans')
     if os.path.exists(plans_dir):
@@ -44,31 +76,235 @@ def generate_content_manifest():
                 full_path = os.path.join(plans_dir, filename)
                 relative_path = os.path.relpath(full_path, base_dir).replace('\\', '/')
                 files.append(relative_path)
-    
+
     # Search index
     search_index = os.path.join(base_dir, 'data', 'search_index.json')
     if os.path.exists(search_index):
         relative_path = os.path.relpath(search_index, base_dir).replace('\\', '/')
         files.append(relative_path)
-    
+
+    # Optional columnar search index
+    columnar_index = os.path.join(base_dir, 'data', 'search_columnar.json')
+    if os.path.exists(columnar_index):
+        relative_path = os.path.relpath(columnar_index, base_dir).replace('\\', '/')
+        files.append(relative_path)
+
+    # Sharded word index (meta, term shards, text blocks), the optional
+    # trigram index, and the compiled lexicon store (pack, index and
+    # per-chapter bundles)
+    for content_dir, extensions in ((os.path.join(base_dir, 'data', 'search'), ('.json',)),
+                                    (os.path.join(base_dir, 'data', 'search_trigrams'), ('.json',)),
+                                    (os.path.join(base_dir, 'data', 'lexicon_store'), ('.pack', '.json'))):
+        if not os.path.exists(content_dir):
+            continue
+        for root, dirs, filenames in os.walk(content_dir):
+            for filename in filenames:
+                if filename.endswith(extensions):
+                    full_path = os.path.join(root, filename)
+                    relative_path = os.path.relpath(full_path, base_dir).replace('\\', '/')
+                    files.append(relative_path)
+
     # Sort files for consistent ordering
     files.sort()
-    
+    return files
+
+
+def file_entry(path):
+    """[content hash, size in bytes] of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+            size += len(block)
+    return [digest.hexdigest()[:HASH_LENGTH], size]
+
+
+def load_compressed_sizes(base_dir):
+    """
+    {path: [hash, gzip size, brotli size]} of the sidecars precompress.py
+    wrote; empty if it has not been run.
+    """
+    try:
+        with open(os.path.join(base_dir, PRECOMPRESS_STATE), 'r', encoding='utf-8') as f:
+            return json.load(f)["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def published_sizes(base_dir, path, file_hash, compressed):
+    """
+    [gzip size] or [gzip size, brotli size] of path's sidecars, when they
+    are for file_hash and still on disk; [] otherwise. A build without
+    sidecars (build.py --no-sidecars) keeps the precompress cache but has no
+    .gz/.br files to serve, so the cache alone is not enough.
+    """
+    if not compressed or compressed[0] != file_hash:
+        return []
+    sizes = []
+    for suffix, size in zip(('.gz', '.br'), compressed[1:]):
+        if size is None or not os.path.isfile(os.path.join(base_dir, path + suffix)):
+            break
+        sizes.append(size)
+    return sizes
+
+
+def add_compressed_sizes(base_dir, path, entry, compressed):
+    """Append the published sidecar sizes to entry (see published_sizes)."""
+    entry.extend(published_sizes(base_dir, path, entry[0], compressed))
+    return entry
+
+
+def content_version(entries):
+    """Version derived from every path and hash, so equal content gets an equal version."""
+    digest = hashlib.sha256()
+    for path in sorted(entries):
+        digest.update(f"{path}\t{entries[path][0]}\n".encode('utf-8'))
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def load_bundles(base_dir, entries, compressed):
+    """
+    {bundle path: {"hash", "size", ["gzip", "brotli",] "files": {path: [offset, length]}}}
+    from the bundle indexes. A bundle whose files have changed since it was
+    packed, or whose pack file is missing, is left out, so clients fetch
+    those files loose.
+    """
+    bundle_dir = os.path.join(base_dir, BUNDLE_DIR)
+    if not os.path.isdir(bundle_dir):
+        return {}
+
+    bundles = {}
+    stale = []
+    for filename in sorted(os.listdir(bundle_dir)):
+        if not filename.endswith('.index.json'):
+            continue
+        with open(os.path.join(bundle_dir, filename), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if (not os.path.isfile(os.path.join(base_dir, index["bundle"]))
+                or any(entries.get(path, [None])[0] != file_hash
+                       for path, (_, _, file_hash) in index["files"].items())):
+            stale.append(index["bundle"])
+            continue
+        bundle = {"hash": index["hash"], "size": index["size"]}
+        bundle.update(zip(("gzip", "brotli"),
+                          published_sizes(base_dir, index["bundle"], index["hash"],
+                                          compressed.get(index["bundle"]))))
+        bundle["files"] = {path: [offset, length] for path, (offset, length, _) in index["files"].items()}
+        bundles[index["bundle"]] = bundle
+    if stale:
+        print(f"Warning: {len(stale)} bundle(s) out of date, left out (run data/generate_bundles.py)")
+    return bundles
+
+
+def load_previous(output_path):
+    """The manifest being replaced, if it has per-file entries (format 2)."""
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else None
+
+
+def write_delta(deltas_dir, previous, version, entries):
+    """
+    Write deltas_dir/<previous version>.json:
+        {"from", "to", "changed": {path: entry}, "removed": [path, ...]}
+    """
+    old = previous["entries"]
+    delta = {
+        "from": previous["version"],
+        "to": version,
+        "changed": {path: entry for path, entry in entries.items()
+                    if old.get(path, [None])[0] != entry[0]},
+        "removed": sorted(path for path in old if path not in entries)
+    }
+    os.makedirs(deltas_dir, exist_ok=True)
+    with open(os.path.join(deltas_dir, f'{previous["version"]}.json'), 'w', encoding='utf-8') as f:
+        json.dump(delta, f, separators=(',', ':'))
+    return delta
+
+
+def generate_content_manifest():
+    """
+    Generate a JSON manifest of all content files:
+
+        {"format": 2, "version": content version, "generated", "totalFiles",
+         "totalBytes", "files": [path, ...],
+         "entries": {path: [hash, size], [hash, size, gzip] or
+                           [hash, size, gzip, brotli]},
+         "history": [oldest version, ..., current version],
+         "bundles": {bundle path: {"hash", "size", ["gzip", "brotli",]
+                                   "files": {path: [offset, length]}}}}
+
+    "files" is the plain path list older clients read. Each version in
+    "history" but the last has a delta to the next one in
+    data/content_deltas/<version>.json. Bundled files stay in "files" and
+    "entries"; "bundles" only says where else they can be fetched from.
+    gzip and brotli are the sizes of the .gz/.br sidecars, listed only when
+    precompress.py is current and the sidecar is there to be served (no
+    brotli without the brotli package).
+    """
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output_path = os.path.join(base_dir, 'data', 'content_manifest.json')
+    deltas_dir = os.path.join(base_dir, 'data', 'content_deltas')
+
+    files = collect_files(base_dir)
+    compressed = load_compressed_sizes(base_dir)
+    entries = {path: add_compressed_sizes(base_dir, path, file_entry(os.path.join(base_dir, path)),
+                                          compressed.get(path))
+               for path in files}
+    version = content_version(entries)
+    previous = load_previous(output_path)
+
+    bundles = load_bundles(base_dir, entries, compressed)
+
+    if previous and previous["version"] == version and previous.get("bundles", {}) == bundles \
+            and previous["entries"] == entries:
+        print(f"Content manifest is up to date (version {version}, {len(files)} files)")
+        return previous
+
+    history = [version]
+    if previous and previous["version"] == version:
+        # Only the bundles or compressed sizes changed
+        history = previous.get("history", [version])
+    elif previous:
+        delta = write_delta(deltas_dir, previous, version, entries)
+        history = previous.get("history", [previous["version"]])
+        # Content reverted to an earlier version: deltas before it no longer chain
+        if version in history:
+            history = history[history.index(version) + 1:]
+        history = (history + [version])[-MAX_HISTORY:]
+        print(f"Delta from {previous['version']}: {len(delta['changed'])} changed, "
+              f"{len(delta['removed'])} removed")
+
+    # Deltas that no longer lead anywhere
+    if os.path.exists(deltas_dir):
+        for filename in os.listdir(deltas_dir):
+            if filename.endswith('.json') and filename[:-5] not in history[:-1]:
+                os.remove(os.path.join(deltas_dir, filename))
+
     manifest = {
-        "version": 1,
+        "format": MANIFEST_FORMAT,
+        "version": version,
         "generated": __import__('datetime').datetime.now().isoformat(),
         "totalFiles": len(files),
-        "files": files
+        "totalBytes": sum(entry[1] for entry in entries.values()),
+        "files": files,
+        "entries": entries,
+        "history": history,
+        "bundles": bundles
     }
-    
-    # Write manifest
-    output_path = os.path.join(base_dir, 'data', 'content_manifest.json')
+
+    # Write manifest, one line per file entry
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2)
-    
-    print(f"Generated content manifest with {len(files)} files")
+        f.write(SPREAD_ENTRY.sub(lambda m: f"[{SPREAD_ITEM.sub(', ', m.group(1))}]",
+                                 json.dumps(manifest, indent=2)))
+
+    print(f"Generated content manifest with {len(files)} files (version {version})")
     print(f"Output: {output_path}")
-    
+
     return manifest
 
 if __name__ == '__main__':
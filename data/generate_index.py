@@ -1,60 +1,843 @@
+import gc
 import os
-import json
 import re
+import json
+import hashlib
+import time
+import shutil
+import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    from data.corpus_parser import CACHE_FILE as PARSED_CORPUS_FILE, ParsedCorpus, parse_chapter, verse_words
+    from data.precompress import brotli, brotli_bytes, gzip_bytes, write_sidecars
+except ImportError:
+    from corpus_parser import CACHE_FILE as PARSED_CORPUS_FILE, ParsedCorpus, parse_chapter, verse_words
+    from precompress import brotli, brotli_bytes, gzip_bytes, write_sidecars
 
-INPUT_DIR = 'bibles/BSB'  
+INPUT_DIR = 'bibles/BSB'
 OUTPUT_FILE = 'data/search_index.json'
+SEARCH_DIR = 'data/search'
+COLUMNAR_FILE = 'data/search_columnar.json'
+TRIGRAM_DIR = 'data/search_trigrams'
+FRAGMENT_DIR = '.cache/index_fragments'
+# The chapters the written index holds (content hash and verse id range),
+# for patching; which files changed is ParsedCorpus's to detect
+BUILD_STATE = '.cache/search_build.json'
 
-def clean_text_for_index(text):
-    text = re.sub(r'\[\[.*?\|.*?\]\]', '', text)
-    text = re.sub(r'######\s*\d+', '', text)
-    text = re.sub(r'#+ .*', '', text)
-    text = re.sub(r'-{3,}', '', text)
-    text = ' '.join(text.split())
-    return text.strip()
+SEARCH_VERSION = 2
+COLUMNAR_VERSION = 1
+TRIGRAM_VERSION = 1
 
-def generate_index():
-    index = []
-    if not os.path.exists(INPUT_DIR):
-        print(f"Error: Directory '{INPUT_DIR}' not found.")
+# Bump when the fragment format changes, so cached fragments are rebuilt
+FRAGMENT_VERSION = 1
+
+# Verses per text block; the client fetches only the blocks holding the
+# results it shows
+TEXT_BLOCK_SIZE = 128
+
+# Term shards are split by a longer prefix until they fit this size (a
+# single very common term can still exceed it)
+SHARD_TARGET_BYTES = 48 * 1024
+
+# Strong's codes per concordance shard (H7200-H7299 -> strongs/H72.json)
+CONCORDANCE_GROUP = 100
+
+# Fewer cache misses than this are parsed in-process; starting a pool
+# costs more than it saves
+POOL_MIN_CHAPTERS = 32
+
+# A search term: letters and digits, with inner apostrophes (lord's)
+TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+# Anything but letters and digits separates words in normalized text
+NON_WORD = re.compile(r'[\W_]+')
+
+# Characters outside the BMP, which take two UTF-16 code units
+ASTRAL = re.compile('[\U00010000-\U0010FFFF]')
+
+
+@lru_cache(maxsize=None)
+def tokenize(word):
+    """Search terms of one written word ("LORD’s," -> ("lord's",))."""
+    return tuple(TOKEN.findall(word.lower().replace('’', "'")))
+
+
+def chapter_sort_key(name):
+    """Sort chapters by number within a book ("Genesis 2" before "Genesis 10")."""
+    book, _, number = name.rpartition(' ')
+    return (book, int(number)) if number.isdigit() else (name, 0)
+
+
+def shard_file(key):
+    """File name of a term shard (apostrophes are not safe in every URL)."""
+    return key.replace("'", '_') + '.json'
+
+
+def shard_of(term, keys):
+    """The shard holding a term: the longest key that prefixes it, or None."""
+    for length in range(len(term), 0, -1):
+        if term[:length] in keys:
+            return term[:length]
+    return None
+
+
+def concordance_shard(code):
+    """Concordance shard of a Strong's code ("H7225" -> "H72")."""
+    return f"{code[0]}{int(code[1:]) // CONCORDANCE_GROUP}"
+
+
+def code_sort_key(code):
+    return (code[0], int(code[1:]))
+
+
+def delta_encode(ids):
+    """Sorted ids as the first id followed by the gaps between them."""
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def delta_decode(gaps):
+    ids = []
+    total = 0
+    for gap in gaps:
+        total += gap
+        ids.append(total)
+    return ids
+
+
+def split_shards(terms, sizes, prefix=''):
+    """
+    Group terms into shards keyed by prefix.
+
+    A group over SHARD_TARGET_BYTES is split by the next character; terms
+    no longer than the prefix stay in a shard keyed by the prefix itself.
+    A term belongs to the shard with the longest key that prefixes it.
+    Returns {key: [terms]}.
+    """
+    if prefix and sum(sizes[t] for t in terms) <= SHARD_TARGET_BYTES:
+        return {prefix: terms}
+
+    shards = {}
+    children = {}
+    for term in terms:
+        if len(term) > len(prefix):
+            children.setdefault(term[:len(prefix) + 1], []).append(term)
+        else:
+            shards.setdefault(prefix, []).append(term)
+    for child, child_terms in children.items():
+        shards.update(split_shards(child_terms, sizes, child))
+    return shards
+
+
+@contextmanager
+def no_gc():
+    """
+    Pause the cyclic garbage collector. The index is millions of small,
+    acyclic lists; with the collector on, allocating them triggers repeated
+    full collections that cost more than building them.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+
+# ============================================================================
+# Chapter fragments
+# ============================================================================
+
+def build_fragment(chapter):
+    """
+    Everything the index needs from one parsed chapter (see
+    corpus_parser.parse_chapter), with chapter-local verse numbering
+    (0, 1, ...):
+
+        {"verses": [[verse number, text], ...],
+         "terms": {term: [[local id, word offset, ...], ...]},
+         "codes": [[local id, code], ...]}   one entry per occurrence
+
+    Only verses with words or codes are kept.
+    """
+    verses = [v for v in chapter["verses"] if v["w"] or v["c"]]
+    terms = {}
+    for local_id, verse in enumerate(verses):
+        positions = {}
+        for offset, word in enumerate(verse_words(verse)):
+            for term in tokenize(word):
+                positions.setdefault(term, []).append(offset)
+        for term, offsets in positions.items():
+            terms.setdefault(term, []).append([local_id] + offsets)
+
+    return {
+        "verses": [[v["v"], v["w"]] for v in verses],
+        "terms": terms,
+        "codes": [[local_id, code] for local_id, v in enumerate(verses) for _, code in v["c"]]
+    }
+
+
+def parse_book(paths):
+    """
+    Pool worker: read, hash and parse one book's chapter files and build
+    their fragments. [file path, ...] ->
+    [(file path, mtime, size, hash, parsed chapter, fragment), ...]; the
+    parsed chapters go back to the main process for the parse cache.
+    """
+    results = []
+    with no_gc():
+        for file_path in paths:
+            stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            chapter = parse_chapter(raw.decode('utf-8'))
+            results.append((file_path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest(),
+                            chapter, build_fragment(chapter)))
+    return results
+
+
+class FragmentCache:
+    """
+    Chapter fragments on disk, one file per content hash (as ParsedCorpus
+    hashes the chapter), so an edit only writes (and an incremental build
+    only reads) the fragments it touches.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.join(cache_dir, f'v{FRAGMENT_VERSION}')
+
+    def _path(self, digest):
+        return os.path.join(self.cache_dir, digest + '.json')
+
+    def has(self, digest):
+        return os.path.exists(self._path(digest))
+
+    def get(self, digest):
+        try:
+            return read_json(self._path(digest))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest, fragment):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(digest) + '.tmp'
+        write_json(tmp_path, fragment)
+        os.replace(tmp_path, self._path(digest))
+
+    def prune(self, keep):
+        """Delete fragments of content that no longer exists."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.json') and filename[:-5] not in keep:
+                os.remove(os.path.join(self.cache_dir, filename))
+
+
+# ============================================================================
+# Columnar format
+# ============================================================================
+
+def utf16_length(text):
+    """Length of text in UTF-16 code units, the unit of JavaScript string indices."""
+    return len(text) + len(ASTRAL.findall(text))
+
+
+def columnar_index(index):
+    """
+    The flat index (search_index.json) in columnar form. Chapter names and
+    paths are stored once; each verse is a row across three parallel
+    arrays, and its text is a slice of one concatenated string:
+
+        {"version": 1,
+         "chapters": [name, ...], "paths": [web path, ...],
+         "chapter": [chapter id, ...], "verse": [verse number, ...],
+         "offset": [start of each verse's text, ..., end of the last],
+         "text": "..."}
+
+    Verse i's text is text[offset[i]:offset[i + 1]], with offsets counted
+    in UTF-16 code units so the client can slice the string directly.
+    """
+    chapter_ids = {}
+    chapter_column = []
+    verse_column = []
+    offsets = [0]
+    for entry in index:
+        chapter_id = chapter_ids.setdefault((entry["n"], entry["p"]), len(chapter_ids))
+        chapter_column.append(chapter_id)
+        verse_column.append(int(entry["v"]))
+        offsets.append(offsets[-1] + utf16_length(entry["t"]))
+
+    return {
+        "version": COLUMNAR_VERSION,
+        "chapters": [name for name, _ in chapter_ids],
+        "paths": [path for _, path in chapter_ids],
+        "chapter": chapter_column,
+        "verse": verse_column,
+        "offset": offsets,
+        "text": ''.join(entry["t"] for entry in index)
+    }
+
+
+def compressed_sizes(payload):
+    """{"raw", "gzip", "brotli"} sizes in bytes of a payload (brotli None if unavailable)."""
+    compressed = brotli_bytes(payload)
+    return {
+        "raw": len(payload),
+        "gzip": len(gzip_bytes(payload)),
+        "brotli": len(compressed) if compressed is not None else None
+    }
+
+
+def write_precompressed(path, payload):
+    """
+    Write payload to path along with path.gz and path.br, for servers that
+    send precompressed files as they are. Returns the sizes written.
+    """
+    with open(path, 'wb') as f:
+        f.write(payload)
+    gzip_size, brotli_size = write_sidecars(path, payload)
+    return {"raw": len(payload), "gzip": gzip_size, "brotli": brotli_size}
+
+
+def format_size(size):
+    if size is None:
+        return '-'
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.2f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def write_columnar(report=False):
+    """
+    Write COLUMNAR_FILE and its precompressed variants from the flat index.
+    With report=True, also print its sizes next to the flat format's.
+    """
+    with open(OUTPUT_FILE, 'rb') as f:
+        flat_payload = f.read()
+    columnar = columnar_index(json.loads(flat_payload))
+    payload = json.dumps(columnar, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    sizes = write_precompressed(COLUMNAR_FILE, payload)
+    print(f"Wrote {COLUMNAR_FILE} ({len(columnar['verse'])} verses, "
+          f"{len(columnar['chapters'])} chapters).")
+
+    if not report:
         return
+    if not brotli:
+        print("brotli is not installed (pip install brotli); skipping .br output.")
+    flat = compressed_sizes(flat_payload)
+    print(f"\n{'Format':<10} {'Raw':>10} {'gzip':>10} {'brotli':>10}")
+    for label, row in (('flat', flat), ('columnar', sizes)):
+        print(f"{label:<10} " + " ".join(f"{format_size(row[k]):>10}" for k in ('raw', 'gzip', 'brotli')))
+    savings = [f"{k} {100 * (1 - sizes[k] / flat[k]):.0f}%" for k in ('raw', 'gzip', 'brotli')
+               if sizes[k] is not None]
+    print("Columnar saves: " + ", ".join(savings) + "\n")
 
-    print(f"Scanning '{INPUT_DIR}'...")
 
+# ============================================================================
+# Trigram index
+# ============================================================================
+
+def normalize_text(text):
+    """
+    Verse text as the trigram index sees it: lowercase, diacritics removed
+    ("Ḵ" -> "k"), apostrophes dropped ("LORD’s" -> "lords") and every other
+    run of punctuation or space folded to one space.
+    """
+    text = text.replace('’', "'").replace("'", '')
+    if not text.isascii():
+        text = ''.join(ch for ch in unicodedata.normalize('NFKD', text)
+                       if not unicodedata.category(ch).startswith('M'))
+    return NON_WORD.sub(' ', text.lower()).strip()
+
+
+def trigrams(text):
+    """Distinct trigrams of normalized text, padded so word starts and ends count."""
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def pack_ranges(keys, sizes):
+    """
+    Split sorted keys into consecutive runs of about SHARD_TARGET_BYTES.
+    Returns [[keys], ...]; a run's first key marks where it starts.
+    """
+    runs = [[]]
+    total = 0
+    for key in keys:
+        if runs[-1] and total + sizes[key] > SHARD_TARGET_BYTES:
+            runs.append([])
+            total = 0
+        runs[-1].append(key)
+        total += sizes[key]
+    return runs
+
+
+def write_trigrams():
+    """
+    Write the trigram index to TRIGRAM_DIR from the flat index, with the
+    same verse ids as the word index:
+
+        meta.json       {"version", "verses", "shards": [first trigram of each shard]}
+        <n>.json        {trigram: delta-encoded verse ids}
+
+    Trigrams are taken from normalized text (see normalize_text). Shards
+    hold sorted runs of trigrams; a trigram is in the last shard whose
+    first trigram is not greater than it. A query's trigrams select
+    candidate verses, which are then checked against the text: a
+    substring match needs every trigram, a fuzzy match all but three per
+    edit.
+    """
+    postings = {}
+    index = read_json(OUTPUT_FILE)
+    for verse_id, entry in enumerate(index):
+        for gram in trigrams(normalize_text(entry["t"])):
+            postings.setdefault(gram, []).append(verse_id)
+
+    # Delta-encoded ids of a common trigram are mostly one or two digits
+    sizes = {gram: 3 + 3 * len(ids) for gram, ids in postings.items()}
+    shards = pack_ranges(sorted(postings), sizes)
+
+    if os.path.exists(TRIGRAM_DIR):
+        shutil.rmtree(TRIGRAM_DIR)
+    os.makedirs(TRIGRAM_DIR)
+    for number, grams in enumerate(shards):
+        write_json(os.path.join(TRIGRAM_DIR, f'{number}.json'),
+                   {gram: delta_encode(postings[gram]) for gram in grams})
+    write_json(os.path.join(TRIGRAM_DIR, 'meta.json'), {
+        "version": TRIGRAM_VERSION,
+        "verses": len(index),
+        "shards": [grams[0] for grams in shards]
+    })
+    print(f"Wrote {len(postings)} trigrams in {len(shards)} shards to {TRIGRAM_DIR}.")
+
+
+# ============================================================================
+# Index build
+# ============================================================================
+
+def find_chapters():
+    """
+    Chapter files in canonical order: books by directory name, chapters by
+    number. Verse ids follow this order. Returns [(file path, name, web path)].
+    """
+    chapters = []
     for root, dirs, files in os.walk(INPUT_DIR):
-        for file in files:
+        dirs.sort()
+        for file in sorted(files, key=lambda f: chapter_sort_key(os.path.splitext(f)[0])):
             if file.endswith(".md"):
                 file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, start='.')
-                web_path = rel_path.replace(os.sep, '/')
-                filename = os.path.splitext(file)[0]
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        chunks = re.split(r'(###### \d+)', content)
-                        for i in range(1, len(chunks), 2):
-                            header = chunks[i]
-                            verse_text = chunks[i+1] if i+1 < len(chunks) else ""
-                            v_match = re.search(r'(\d+)', header)
-                            if not v_match: continue
-                            verse_num = v_match.group(1)
-                            cleaned_text = clean_text_for_index(verse_text)
-                            if cleaned_text:
-                                index.append({
-                                    "n": filename,
-                                    "v": verse_num,
-                                    "t": cleaned_text,
-                                    "p": web_path
-                                })
-                except Exception as e:
-                    print(f"Skipping {file}: {e}")
+                web_path = os.path.relpath(file_path, start='.').replace(os.sep, '/')
+                chapters.append((file_path, os.path.splitext(file)[0], web_path))
+    return chapters
+
+
+def book_of(name):
+    return name.rpartition(' ')[0] or name
+
+
+def write_full_index(chapters):
+    """
+    Write search_index.json and the sharded index in SEARCH_DIR from
+    scratch. chapters is a list of (name, web_path, fragment) in
+    canonical order; verse ids are assigned in that order, so consecutive
+    ids within a chapter are consecutive verses.
+
+        meta.json           chapter table [name, path, first id, book index],
+                            books, term and concordance shard keys
+        terms/<key>.json    {term: [[verse id, word offset, ...], ...]}
+        strongs/<key>.json  {code: {"v": delta-encoded verse ids,
+                                    "b": [[book index, occurrences], ...],
+                                    "n": occurrences}}
+        text/<n>.json       [[verse number, text], ...] for ids n*TEXT_BLOCK_SIZE...
+
+    Word offsets index the verse's words. Strong's codes are kept out of
+    the terms and the text; they only appear in the concordance.
+    """
+    index = []
+    postings = {}
+    chapter_table = []
+    books = []
+    texts = []
+    code_verses = {}
+    code_books = {}
+
+    for name, web_path, fragment in chapters:
+        if not fragment["verses"]:
+            continue
+        book = book_of(name)
+        if not books or books[-1] != book:
+            books.append(book)
+        book_index = len(books) - 1
+        base = len(texts)
+        chapter_table.append([name, web_path, base, book_index])
+
+        for verse_num, text in fragment["verses"]:
+            texts.append([verse_num, text])
+            index.append({"n": name, "v": str(verse_num), "t": text, "p": web_path})
+
+        for term, entries in fragment["terms"].items():
+            merged = postings.setdefault(term, [])
+            for entry in entries:
+                merged.append([entry[0] + base] + entry[1:])
+
+        for local_id, code in fragment["codes"]:
+            ids = code_verses.setdefault(code, [])
+            if not ids or ids[-1] != base + local_id:
+                ids.append(base + local_id)
+            counts = code_books.setdefault(code, {})
+            counts[book_index] = counts.get(book_index, 0) + 1
 
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(index, f, separators=(',', ':'))
-        
-    print(f"Success! Indexed {len(index)} verses.")
+    write_json(OUTPUT_FILE, index)
+
+    # Rough serialized size: about six bytes per verse id or offset
+    sizes = {term: len(term) + 6 * sum(map(len, entries))
+             for term, entries in postings.items()}
+    shards = split_shards(sorted(postings), sizes)
+
+    # Replace the previous index wholesale so no stale shard survives
+    if os.path.exists(SEARCH_DIR):
+        shutil.rmtree(SEARCH_DIR)
+    os.makedirs(os.path.join(SEARCH_DIR, 'terms'))
+    os.makedirs(os.path.join(SEARCH_DIR, 'strongs'))
+    os.makedirs(os.path.join(SEARCH_DIR, 'text'))
+
+    for key, terms in shards.items():
+        write_json(os.path.join(SEARCH_DIR, 'terms', shard_file(key)),
+                   {term: postings[term] for term in terms})
+
+    concordance = {}
+    for code in sorted(code_verses, key=code_sort_key):
+        counts = code_books[code]
+        concordance.setdefault(concordance_shard(code), {})[code] = {
+            "v": delta_encode(code_verses[code]),
+            "b": sorted(counts.items()),
+            "n": sum(counts.values())
+        }
+    for key, codes in concordance.items():
+        write_json(os.path.join(SEARCH_DIR, 'strongs', f'{key}.json'), codes)
+
+    for block, start in enumerate(range(0, len(texts), TEXT_BLOCK_SIZE)):
+        write_json(os.path.join(SEARCH_DIR, 'text', f'{block}.json'),
+                   texts[start:start + TEXT_BLOCK_SIZE])
+
+    write_json(os.path.join(SEARCH_DIR, 'meta.json'), {
+        "version": SEARCH_VERSION,
+        "verses": len(texts),
+        "blockSize": TEXT_BLOCK_SIZE,
+        "chapters": chapter_table,
+        "books": books,
+        "shards": sorted(shards),
+        "strongs": sorted(concordance),
+        "strongsGroup": CONCORDANCE_GROUP
+    })
+
+    print(f"Indexed {len(index)} verses: {len(postings)} terms in {len(shards)} shards, "
+          f"{len(code_verses)} Strong's codes in {len(concordance)} concordance shards, "
+          f"{len(range(0, len(texts), TEXT_BLOCK_SIZE))} text blocks.")
+
+
+def code_occurrences(fragment):
+    """{code: [local id of each occurrence]} of a fragment."""
+    occurrences = {}
+    for local_id, code in fragment["codes"]:
+        occurrences.setdefault(code, []).append(local_id)
+    return occurrences
+
+
+def patch_index(changes):
+    """
+    Update the written index in place for chapters whose text changed but
+    whose verse count did not, so no verse id moves. Each chapter's old
+    and new fragments are compared, and only the terms, Strong's codes and
+    verses that differ are rewritten, along with the shards and text
+    blocks holding them.
+
+    changes is a list of (record, old fragment, new fragment), where record
+    is the chapter's build state entry (name, path, base, count, book).
+    Returns False, having written nothing, if the index must be rebuilt
+    instead (a new term has no shard).
+    """
+    meta = read_json(os.path.join(SEARCH_DIR, 'meta.json'))
+    shard_keys = set(meta["shards"])
+
+    # Term shards: {key: {term: [(record, new postings), ...]}}
+    term_shards = {}
+    for record, old, new in changes:
+        for term in set(old["terms"]) | set(new["terms"]):
+            if old["terms"].get(term) == new["terms"].get(term):
+                continue
+            key = shard_of(term, shard_keys)
+            if key is None:
+                return False
+            term_shards.setdefault(key, {}).setdefault(term, []).append(
+                (record, new["terms"].get(term, [])))
+
+    for key, terms in term_shards.items():
+        path = os.path.join(SEARCH_DIR, 'terms', shard_file(key))
+        shard = read_json(path)
+        for term, updates in terms.items():
+            entries = shard.get(term, [])
+            for record, postings in updates:
+                start, end = record["base"], record["base"] + record["count"]
+                entries = [e for e in entries if not start <= e[0] < end]
+                entries.extend([e[0] + start] + e[1:] for e in postings)
+            if entries:
+                entries.sort(key=lambda e: e[0])
+                shard[term] = entries
+            else:
+                shard.pop(term, None)
+        write_json(path, dict(sorted(shard.items())))
+
+    # Concordance shards: {key: {code: [(record, old occurrences, new occurrences), ...]}}
+    code_shards = {}
+    for record, old, new in changes:
+        old_codes, new_codes = code_occurrences(old), code_occurrences(new)
+        for code in set(old_codes) | set(new_codes):
+            if old_codes.get(code) != new_codes.get(code):
+                code_shards.setdefault(concordance_shard(code), {}).setdefault(code, []).append(
+                    (record, old_codes.get(code, []), new_codes.get(code, [])))
+
+    for key, codes in code_shards.items():
+        path = os.path.join(SEARCH_DIR, 'strongs', f'{key}.json')
+        shard = read_json(path) if key in meta["strongs"] else {}
+        for code, updates in codes.items():
+            entry = shard.get(code, {"v": [], "b": []})
+            ids = set(delta_decode(entry["v"]))
+            counts = dict(entry["b"])
+            for record, old_ids, new_ids in updates:
+                start, end = record["base"], record["base"] + record["count"]
+                ids = {i for i in ids if not start <= i < end}
+                ids.update(start + local_id for local_id in new_ids)
+                counts[record["book"]] = counts.get(record["book"], 0) - len(old_ids) + len(new_ids)
+            counts = {book: n for book, n in counts.items() if n > 0}
+            if ids:
+                shard[code] = {"v": delta_encode(sorted(ids)), "b": sorted(counts.items()),
+                               "n": sum(counts.values())}
+            else:
+                shard.pop(code, None)
+
+        if shard:
+            write_json(path, dict(sorted(shard.items(), key=lambda item: code_sort_key(item[0]))))
+            if key not in meta["strongs"]:
+                meta["strongs"] = sorted(meta["strongs"] + [key])
+        elif key in meta["strongs"]:
+            os.remove(path)
+            meta["strongs"].remove(key)
+
+    # Text blocks and the flat index
+    blocks = {}
+    index = None
+    for record, old, new in changes:
+        for local_id, verse in enumerate(new["verses"]):
+            if verse == old["verses"][local_id]:
+                continue
+            verse_id = record["base"] + local_id
+            block = verse_id // TEXT_BLOCK_SIZE
+            if block not in blocks:
+                blocks[block] = read_json(os.path.join(SEARCH_DIR, 'text', f'{block}.json'))
+            blocks[block][verse_id % TEXT_BLOCK_SIZE] = verse
+            if index is None:
+                index = read_json(OUTPUT_FILE)
+            index[verse_id] = {"n": record["name"], "v": str(verse[0]), "t": verse[1],
+                               "p": record["path"]}
+    for block, rows in blocks.items():
+        write_json(os.path.join(SEARCH_DIR, 'text', f'{block}.json'), rows)
+    if index is not None:
+        write_json(OUTPUT_FILE, index)
+
+    write_json(os.path.join(SEARCH_DIR, 'meta.json'), meta)
+    print(f"Patched {len(changes)} chapter(s): {sum(map(len, term_shards.values()))} terms in "
+          f"{len(term_shards)} shards, {sum(map(len, code_shards.values()))} Strong's codes, "
+          f"{sum(1 for r, o, n in changes for a, b in zip(o['verses'], n['verses']) if a != b)} verses.")
+    return True
+
+
+def load_state():
+    try:
+        state = read_json(BUILD_STATE)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != [SEARCH_VERSION, FRAGMENT_VERSION, TEXT_BLOCK_SIZE]:
+        return None
+    return state
+
+
+def save_state(chapters):
+    os.makedirs(os.path.dirname(BUILD_STATE), exist_ok=True)
+    tmp_path = BUILD_STATE + '.tmp'
+    write_json(tmp_path, {"version": [SEARCH_VERSION, FRAGMENT_VERSION, TEXT_BLOCK_SIZE],
+                          "chapters": chapters})
+    os.replace(tmp_path, BUILD_STATE)
+
+
+def generate_index(jobs=None, full=False, columnar=False, trigrams=False):
+    """
+    Build the search index, reusing whatever the last build left behind.
+
+    The shared parse cache (ParsedCorpus) gives the content hash of every
+    chapter whose mtime and size are unchanged, and the hash is looked up
+    in the fragment cache. The other chapters are read, parsed and turned
+    into fragments in a process pool, one task per book, and the parsed
+    chapters are added to the parse cache. If only chapter texts changed
+    and every verse count stayed the same, the written index is patched in
+    place (see patch_index); otherwise all fragments are merged in
+    canonical order and the index is written from scratch. With full=True,
+    every chapter is parsed again and no cache is read.
+
+    With columnar=True the columnar index (see columnar_index) is written
+    too, with a size report, and with trigrams=True the trigram index (see
+    write_trigrams). Once either exists, it is rewritten whenever the flat
+    index changes.
+    """
+    if not os.path.exists(INPUT_DIR):
+        print(f"Error: Directory '{INPUT_DIR}' not found.")
+        return
+
+    with no_gc():
+        build_index(jobs, full, columnar, trigrams)
+
+
+def is_stale(path):
+    """True if an optional output exists but predates the flat index."""
+    return os.path.exists(path) and os.path.getmtime(path) < os.path.getmtime(OUTPUT_FILE)
+
+
+def build_index(jobs, full, columnar, trigrams):
+    """See generate_index."""
+    timings = {}
+    started = time.perf_counter()
+    last = [started]
+
+    def lap(phase):
+        now = time.perf_counter()
+        timings[phase] = now - last[0]
+        last[0] = now
+
+    print(f"Scanning '{INPUT_DIR}'...")
+    state = None if full else load_state()
+    previous = state["chapters"] if state else {}
+    cache = FragmentCache(FRAGMENT_DIR)
+    # Without a cache file, ParsedCorpus knows no hashes and every chapter is parsed
+    corpus = ParsedCorpus('.') if full else ParsedCorpus('.', PARSED_CORPUS_FILE)
+
+    # Scan: content hashes of unchanged files, from the shared parse cache
+    records = []
+    pending = {}
+    misses = {}
+    for file_path, name, web_path in find_chapters():
+        digest = corpus.current(file_path)
+        records.append({"name": name, "path": web_path, "hash": digest})
+        if digest is None or not cache.has(digest):
+            pending[file_path] = records[-1]
+            misses.setdefault(book_of(name), []).append(file_path)
+    lap('scan')
+
+    # Fragments: parse the other chapters and build their fragments, one
+    # pool task per book, then add them to the parse cache
+    parsed = len(pending)
+    tasks = list(misses.values())
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    if workers > 1 and parsed >= POOL_MIN_CHAPTERS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_book, tasks))
+    else:
+        workers = 1
+        results = [parse_book(task) for task in tasks]
+    for book in results:
+        for file_path, mtime, size, digest, chapter, fragment in book:
+            corpus.add(file_path, mtime, size, digest, chapter)
+            pending[file_path]["hash"] = digest
+            cache.put(digest, fragment)
+    corpus.save()
+    lap('fragments')
+
+    # Patch when nothing but chapter text changed
+    patched = False
+    order_unchanged = state and [r["path"] for r in records] == list(previous)
+    changed = [r for r in records if r["hash"] != previous.get(r["path"], {}).get("hash")]
+    if order_unchanged and os.path.exists(OUTPUT_FILE) and \
+            os.path.exists(os.path.join(SEARCH_DIR, 'meta.json')):
+        changes = []
+        for record in changed:
+            old_record = previous[record["path"]]
+            old = cache.get(old_record["hash"])
+            new = cache.get(record["hash"])
+            if old is None or new is None or len(new["verses"]) != old_record["count"]:
+                break
+            record.update(base=old_record["base"], count=old_record["count"], book=old_record["book"])
+            changes.append((record, old, new))
+        else:
+            patched = not changes or patch_index(changes)
+            if not changes:
+                print("Search index is up to date.")
+    lap('patch')
+
+    if not patched:
+        # Merge: every fragment, in canonical order
+        fragments = [cache.get(r["hash"]) for r in records]
+        lap('load')
+        write_full_index([(r["name"], r["path"], f) for r, f in zip(records, fragments)])
+        lap('merge+write')
+
+    # Keep each chapter's verse id range for the next patch
+    if patched:
+        for record in records:
+            if "base" not in record:
+                old = previous[record["path"]]
+                record.update(base=old["base"], count=old["count"], book=old["book"])
+    else:
+        base = 0
+        books = []
+        for record, fragment in zip(records, fragments):
+            count = len(fragment["verses"])
+            if count and (not books or books[-1] != book_of(record["name"])):
+                books.append(book_of(record["name"]))
+            record.update(base=base, count=count, book=len(books) - 1)
+            base += count
+    save_state({r["path"]: {k: v for k, v in r.items() if k != "path"} for r in records})
+    cache.prune({r["hash"] for r in records})
+    lap('state')
+
+    if columnar or is_stale(COLUMNAR_FILE):
+        write_columnar(report=columnar)
+        lap('columnar')
+    if trigrams or is_stale(os.path.join(TRIGRAM_DIR, 'meta.json')):
+        write_trigrams()
+        lap('trigrams')
+
+    print(f"Parsed {parsed} chapter(s) ({len(records) - parsed} from cache, "
+          f"{workers} worker{'s' if workers != 1 else ''}).")
+    print("Timing: " + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+          + f", total {time.perf_counter() - started:.2f}s")
+
 
 if __name__ == "__main__":
-    generate_index()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Build the search index from bibles/BSB')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='Worker processes for parsing (default: CPU count)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the parse cache, fragment cache and build state; rebuild everything')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Also write the columnar index with .gz/.br variants and '
+                             'compare its size with search_index.json')
+    parser.add_argument('--trigrams', action='store_true',
+                        help='Also write the trigram index for substring and typo-tolerant search')
+    args = parser.parse_args()
+    # Paths are relative to the repository root, wherever this is run from
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    generate_index(jobs=args.jobs, full=args.full, columnar=args.columnar, trigrams=args.trigrams)
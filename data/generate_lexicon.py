@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Compile the lexicon into one indexed store, plus a lexicon bundle per chapter.
+
+    data/lexicon_store/entries.pack    every lexicon/<code>.md, back to back
+                                       (G1, G2, ..., then H1, H2, ...)
+    data/lexicon_store/index.json      {"format", "pack", "size", "hash",
+                                        "G": {"offset", "first", "lengths"}, "H": {...}}
+    data/lexicon_store/chapters/<translation>/<book dir>/<chapter>.json
+                                       {code: entry} for every Strong's code
+                                       the chapter references
+
+The index is an offset table keyed by number: the entry for G<n> is
+lengths[n - first] bytes long (0 if there is none) and starts at offset
+plus the lengths before it. The reader fetches a chapter's bundle when
+the chapter opens, so tapping a word shows its definition without
+another request.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+try:
+    from data.generate_bundles import write_if_changed
+    from data.generate_content_manifest import HASH_LENGTH
+except ImportError:
+    from generate_bundles import write_if_changed
+    from generate_content_manifest import HASH_LENGTH
+
+STORE_DIR = os.path.join('data', 'lexicon_store')
+CHAPTER_DIR = os.path.join(STORE_DIR, 'chapters')
+
+STORE_FORMAT = 1
+
+LEXICON_FILE = re.compile(r'([GH])(\d+)\.md')
+
+# A code as the reader marks it up (see Reader.render in js/app.js)
+CODE = re.compile(r'\[\[([GH]\d+)\]\]')
+
+
+def parse_code(code):
+    """("G", 26) for "G26"."""
+    return code[0], int(code[1:])
+
+
+def compile_store(lexicon_dir):
+    """
+    (index, pack bytes) of the lexicon in lexicon_dir; see the module
+    docstring for the index layout.
+    """
+    numbers = {'G': [], 'H': []}
+    for filename in os.listdir(lexicon_dir):
+        match = LEXICON_FILE.fullmatch(filename)
+        if match:
+            numbers[match.group(1)].append(int(match.group(2)))
+
+    chunks = []
+    index = {"format": STORE_FORMAT, "pack": f"{STORE_DIR}/entries.pack".replace(os.sep, '/')}
+    offset = 0
+    for prefix in ('G', 'H'):
+        present = set(numbers[prefix])
+        first = min(present, default=1)
+        lengths = []
+        for number in range(first, max(present, default=0) + 1):
+            data = b''
+            if number in present:
+                with open(os.path.join(lexicon_dir, f'{prefix}{number}.md'), 'rb') as f:
+                    data = f.read()
+            lengths.append(len(data))
+            chunks.append(data)
+        index[prefix] = {"offset": offset, "first": first, "lengths": lengths}
+        offset += sum(lengths)
+
+    pack = b''.join(chunks)
+    index["size"] = len(pack)
+    index["hash"] = hashlib.sha256(pack).hexdigest()[:HASH_LENGTH]
+    # Keep the table last, so the header fields are easy to eyeball
+    index = {key: index[key] for key in ("format", "pack", "size", "hash", "G", "H")}
+    return index, pack
+
+
+class LexiconStore:
+    """Lookups in a compiled store (see compile_store)."""
+
+    def __init__(self, index, pack):
+        self.pack = pack
+        self.offsets = {}
+        for prefix in ('G', 'H'):
+            table = index[prefix]
+            offset = table["offset"]
+            for i, length in enumerate(table["lengths"]):
+                if length:
+                    self.offsets[f'{prefix}{table["first"] + i}'] = (offset, length)
+                offset += length
+
+    @classmethod
+    def load(cls, base_dir):
+        """The store last written under base_dir."""
+        with open(os.path.join(base_dir, STORE_DIR, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        with open(os.path.join(base_dir, STORE_DIR, 'entries.pack'), 'rb') as f:
+            return cls(index, f.read())
+
+    def get(self, code):
+        """Markdown of a lexicon entry, or None if there is none."""
+        if code not in self.offsets:
+            return None
+        offset, length = self.offsets[code]
+        return self.pack[offset:offset + length].decode('utf-8')
+
+
+def chapter_codes(content):
+    """Strong's codes a chapter references, in the store's order."""
+    return sorted(set(CODE.findall(content)), key=parse_code)
+
+
+def generate_lexicon():
+    """Write the store and the chapter bundles; remove bundles of chapters that are gone."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    lexicon_dir = os.path.join(base_dir, 'lexicon')
+    bibles_dir = os.path.join(base_dir, 'bibles')
+    if not os.path.isdir(lexicon_dir):
+        print(f"Error: Directory '{lexicon_dir}' not found.")
+        return
+
+    index, pack = compile_store(lexicon_dir)
+    store = LexiconStore(index, pack)
+    os.makedirs(os.path.join(base_dir, STORE_DIR), exist_ok=True)
+    write_if_changed(os.path.join(base_dir, STORE_DIR, 'entries.pack'), pack)
+    write_if_changed(os.path.join(base_dir, STORE_DIR, 'index.json'),
+                     json.dumps(index, separators=(',', ':')).encode('utf-8'))
+    print(f"Compiled {len(store.offsets)} lexicon entries ({len(pack) / (1024 * 1024):.1f} MB).")
+
+    # One bundle per chapter, mirroring the chapter's path under bibles/
+    keep = set()
+    written = 0
+    total = 0
+    missing = set()
+    for root, dirs, filenames in os.walk(bibles_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith('.md'):
+                continue
+            with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                codes = chapter_codes(f.read())
+            entries = {}
+            for code in codes:
+                entry = store.get(code)
+                if entry is None:
+                    missing.add(code)
+                else:
+                    entries[code] = entry
+            if not entries:
+                continue
+            relative = os.path.relpath(os.path.join(root, filename[:-3] + '.json'), bibles_dir)
+            path = os.path.join(base_dir, CHAPTER_DIR, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            written += write_if_changed(path, payload)
+            total += len(payload)
+            keep.add(path)
+
+    # Bundles of chapters that no longer exist, with their precompressed
+    # sidecars (see precompress.py)
+    chapter_dir = os.path.join(base_dir, CHAPTER_DIR)
+    for root, dirs, filenames in os.walk(chapter_dir, topdown=False):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if path not in keep and re.sub(r'\.(gz|br)$', '', path) not in keep:
+                os.remove(path)
+        if root != chapter_dir and not os.listdir(root):
+            os.rmdir(root)
+
+    if missing:
+        print(f"Warning: {len(missing)} referenced code(s) have no lexicon entry: "
+              f"{', '.join(sorted(missing, key=parse_code)[:10])}")
+    print(f"Wrote lexicon bundles for {len(keep)} chapters ({total / (1024 * 1024):.1f} MB, "
+          f"{written} rewritten).")
+    print(f"Output: {os.path.join(base_dir, STORE_DIR)}")
+
+
+if __name__ == '__main__':
+    generate_lexicon()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Precompress the static text assets for hosts that serve precompressed
+files as they are (nginx gzip_static/brotli_static, Cloudflare, ...).
+
+Every file in the content manifest (the lexicon store and the columnar
+search index included) and every bundle gets a <file>.gz sidecar, and a
+<file>.br sidecar when the optional brotli package is installed. Files are compressed in a process pool. A
+file whose content hash matches the last run, and whose sidecars are
+still there, is skipped.
+
+The compressed sizes are kept in .cache/precompress.json, and
+generate_content_manifest.py copies them into the manifest. Run this
+after generate_bundles.py and before generate_content_manifest.py.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from data.generate_content_manifest import collect_files, HASH_LENGTH
+except ImportError:
+    from generate_content_manifest import collect_files, HASH_LENGTH
+
+STATE_FILE = os.path.join('.cache', 'precompress.json')
+BUNDLE_DIR = os.path.join('data', 'bundles')
+
+# Bump when compression settings change, so every sidecar is rewritten
+STATE_VERSION = 1
+
+# Fewer files than this are compressed in-process
+POOL_MIN_FILES = 64
+
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output identical between builds of the same input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data):
+    """Brotli-compressed data, or None without the brotli package."""
+    return brotli.compress(data, quality=11) if brotli else None
+
+
+def write_sidecars(path, data):
+    """
+    Write path.gz and path.br for data. Returns [gzip size, brotli size];
+    without brotli the size is None and any old path.br is removed, so it
+    cannot be served for content it no longer matches.
+    """
+    compressed = gzip_bytes(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(compressed)
+    sizes = [len(compressed), None]
+
+    compressed = brotli_bytes(data)
+    if compressed is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(compressed)
+        sizes[1] = len(compressed)
+    elif os.path.exists(path + '.br'):
+        os.remove(path + '.br')
+    return sizes
+
+
+def compress_files(tasks):
+    """Pool worker: [(full path, relative path, hash), ...] -> [(relative path, [hash, gz, br]), ...]."""
+    results = []
+    for full_path, path, digest in tasks:
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        results.append((path, [digest] + write_sidecars(full_path, data)))
+    return results
+
+
+def collect_assets(base_dir):
+    """Text assets to precompress, as paths relative to base_dir."""
+    assets = collect_files(base_dir)
+    bundle_dir = os.path.join(base_dir, BUNDLE_DIR)
+    if os.path.isdir(bundle_dir):
+        assets.extend(f"{BUNDLE_DIR}/{filename}".replace(os.sep, '/')
+                      for filename in sorted(os.listdir(bundle_dir))
+                      if filename.endswith(('.pack', '.index.json')))
+    return assets
+
+
+def load_state(base_dir):
+    """
+    {path: [hash, gzip size, brotli size]} from the last run. An entry only
+    describes the file if its hash is still the file's.
+    """
+    try:
+        with open(os.path.join(base_dir, STATE_FILE), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION or state.get("brotli") != (brotli is not None):
+        return {}
+    return state["files"]
+
+
+def save_state(base_dir, files):
+    path = os.path.join(base_dir, STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        # Sorted, so an unchanged run writes the same bytes
+        json.dump({"version": STATE_VERSION, "brotli": brotli is not None,
+                   "files": dict(sorted(files.items()))}, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+
+def precompress(jobs=None, full=False):
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    previous = {} if full else load_state(base_dir)
+    if not brotli:
+        print("brotli is not installed (pip install brotli); writing .gz sidecars only.")
+
+    state = {}
+    tasks = []
+    raw_bytes = 0
+    for path in collect_assets(base_dir):
+        full_path = os.path.join(base_dir, path)
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        raw_bytes += len(data)
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        old = previous.get(path)
+        if old and old[0] == digest and os.path.exists(full_path + '.gz') and \
+                (old[2] is None or os.path.exists(full_path + '.br')):
+            state[path] = old
+        else:
+            tasks.append((full_path, path, digest))
+
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    if workers > 1 and len(tasks) >= POOL_MIN_FILES:
+        # A few hundred files per task keeps the pool's overhead small
+        size = max(len(tasks) // (workers * 4), 1)
+        chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for chunk in pool.map(compress_files, chunks) for r in chunk]
+    else:
+        workers = 1
+        results = compress_files(tasks)
+    state.update(results)
+
+    # Sidecars of assets that are gone
+    for path in previous:
+        if path not in state and not os.path.exists(os.path.join(base_dir, path)):
+            for ext in ('.gz', '.br'):
+                if os.path.exists(os.path.join(base_dir, path + ext)):
+                    os.remove(os.path.join(base_dir, path + ext))
+
+    save_state(base_dir, state)
+
+    gz_bytes = sum(sizes[1] for sizes in state.values())
+    br_bytes = sum(sizes[2] for sizes in state.values() if sizes[2] is not None)
+    print(f"Compressed {len(tasks)} of {len(state)} files ({len(state) - len(tasks)} unchanged, "
+          f"{workers} worker{'s' if workers != 1 else ''}).")
+    print(f"Raw {raw_bytes / (1024 * 1024):.1f} MB, gzip {gz_bytes / (1024 * 1024):.1f} MB"
+          + (f", brotli {br_bytes / (1024 * 1024):.1f} MB" if brotli else ""))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write .gz and .br sidecars for the static text assets')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the previous run and recompress everything')
+    args = parser.parse_args()
+    precompress(jobs=args.jobs, full=args.full)
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Search queries outside the browser, with the same results as the app.
+
+Each engine loads one of the formats written by data/generate_index.py
+and answers a query the way js/app.js does for that format:
+
+    FlatEngine      search_index.json       linear scan (Selector.searchLinear)
+    ColumnarEngine  search_columnar.json    linear scan (Selector.searchLinear)
+    WordEngine      search/ (+ trigrams)    word index (Selector.searchIndexed),
+                                            then Selector.searchTrigram
+
+Verse text carries no Strong's codes, so every engine finds a code
+("H7225") through the concordance in search/strongs/.
+
+Results are dicts shaped like the app's: {"n", "v", "t", "p"} plus
+"matchType" and "wordDistance" for multi-word queries, "id" from the word
+index and "distance" from the trigram index. They are ranked like
+Selector.compareResults and cut to the 50 the app shows.
+
+    python3 data/search_engine.py "living water"
+    python3 data/search_engine.py --format flat "in the beginning"
+"""
+
+import os
+import re
+import json
+import bisect
+import argparse
+from typing import Dict, List, Optional
+
+try:
+    from data.generate_index import (OUTPUT_FILE, COLUMNAR_FILE, SEARCH_DIR, TRIGRAM_DIR,
+                                     CONCORDANCE_GROUP, ASTRAL, tokenize, shard_file,
+                                     delta_decode, normalize_text)
+except ImportError:
+    from generate_index import (OUTPUT_FILE, COLUMNAR_FILE, SEARCH_DIR, TRIGRAM_DIR,
+                                CONCORDANCE_GROUP, ASTRAL, tokenize, shard_file,
+                                delta_decode, normalize_text)
+
+APP_SCRIPT = 'js/app.js'
+
+# Results the app shows for a query
+RESULT_LIMIT = 50
+
+# Shortest term that matches words by prefix; shorter ones ("a", "of") only
+# match whole words, as a prefix that short would load dozens of shards
+MIN_PREFIX = 3
+
+STRONGS_CODE = re.compile(r'[gh]\d+')
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_book_order(app_script=APP_SCRIPT) -> Dict[str, int]:
+    """Canonical book order, from the BOOKS table in js/app.js."""
+    with open(app_script, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('const BOOKS = '):
+                books = json.loads(line[len('const BOOKS = '):].strip().rstrip(';'))
+                return {book["n"]: i for i, book in enumerate(books)}
+    raise ValueError(f"No BOOKS table in {app_script}")
+
+
+def is_strongs_code(term):
+    return STRONGS_CODE.fullmatch(term) is not None
+
+
+def substring_distance(pattern, text):
+    """Fewest edits that turn pattern into some substring of text."""
+    prev = list(range(len(pattern) + 1))
+    best = prev[-1]
+    for ch in text:
+        cur = [0]
+        for i, p in enumerate(pattern, 1):
+            cur.append(min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (p != ch)))
+        best = min(best, cur[-1])
+        prev = cur
+    return best
+
+
+class Concordance:
+    """
+    The Strong's concordance (search/strongs/), read a shard at a time on
+    first use. A missing shard finds nothing.
+    """
+
+    def __init__(self, directory=SEARCH_DIR, group=CONCORDANCE_GROUP):
+        self.directory = directory
+        self.group = group
+        self.shards = {}
+
+    def lookup(self, term) -> Optional[Dict]:
+        """Entry of a Strong's code ("h7225"), or None if it never occurs."""
+        number = int(term[1:])
+        code = f"{term[0].upper()}{number}"
+        key = f"{code[0]}{number // self.group}"
+        if key not in self.shards:
+            path = os.path.join(self.directory, 'strongs', f'{key}.json')
+            self.shards[key] = read_json(path) if os.path.exists(path) else {}
+        entry = self.shards[key].get(code)
+        return dict(entry, code=code) if entry else None
+
+    def verses(self, term) -> List[int]:
+        """Ids of the verses holding a Strong's code, in order."""
+        entry = self.lookup(term)
+        return delta_decode(entry["v"]) if entry else []
+
+
+class SearchEngine:
+    """Shared ranking; subclasses load a format and implement search()."""
+
+    name = ''
+
+    def __init__(self, book_order: Optional[Dict[str, int]] = None):
+        self.book_order = book_order if book_order is not None else load_book_order()
+
+    def search(self, query: str, limit: Optional[int] = RESULT_LIMIT) -> List[Dict]:
+        raise NotImplementedError
+
+    def rank_key(self, result):
+        """Sort key equivalent to Selector.compareResults."""
+        match_type = result.get("matchType")
+        book, _, chapter = result["n"].rpartition(' ')
+        return (
+            {'same-verse': 0, 'proximity': 1}.get(match_type, 0),
+            result.get("wordDistance") or 0 if match_type == 'same-verse' else 0,
+            self.book_order.get(book, 99),
+            int(chapter) if chapter.isdigit() else 0,
+            result["id"] if "id" in result else int(result["v"])
+        )
+
+
+# ============================================================================
+# Linear scan (search_index.json, search_columnar.json)
+# ============================================================================
+
+class FlatEngine(SearchEngine):
+    """
+    The app's fallback when the word index is missing: every verse is
+    scanned for the query as a substring. A multi-word query matches a
+    verse holding every word, or holding some of them with the rest in the
+    next verse of the same chapter. Strong's codes come from the
+    concordance (verse ids are positions in the index) and have no offset.
+    """
+
+    name = 'flat'
+
+    def __init__(self, path=OUTPUT_FILE, book_order=None):
+        super().__init__(book_order)
+        self.index = read_json(path)
+        self.concordance = Concordance()
+
+    def __len__(self):
+        return len(self.index)
+
+    def verse(self, i):
+        """Verse i as {"n", "v", "t", "p"}."""
+        return self.index[i]
+
+    def lower_text(self, i):
+        return self.index[i]["t"].lower()
+
+    def search(self, query, limit=RESULT_LIMIT):
+        clean = query.lower().replace('\\', '').replace('[', '').replace(']', '')
+        words = clean.split()
+        results = []
+
+        if not words:
+            return results
+        codes = {word: set(self.concordance.verses(word)) for word in words if is_strongs_code(word)}
+
+        if len(words) == 1:
+            if codes:
+                results = [dict(self.verse(i)) for i in sorted(codes[clean]) if i < len(self)]
+            else:
+                results = [dict(self.verse(i)) for i in range(len(self)) if clean in self.lower_text(i)]
+        else:
+            for i in range(len(self)):
+                text = self.lower_text(i)
+                # Keyed by word, so a repeated word counts once (as in the app)
+                positions = {}
+                for word in words:
+                    if word in codes:
+                        if i in codes[word]:
+                            positions[word] = None
+                        continue
+                    pos = text.find(word)
+                    if pos != -1:
+                        positions[word] = pos
+
+                if len(positions) == len(words):
+                    offsets = [pos for pos in positions.values() if pos is not None]
+                    results.append(dict(self.verse(i), matchType='same-verse',
+                                        wordDistance=max(offsets) - min(offsets) if offsets else 0))
+                    continue
+
+                remaining = [w for w in words if w not in positions]
+                if remaining and i + 1 < len(self):
+                    verse = self.verse(i)
+                    if self.verse(i + 1)["n"] == verse["n"]:
+                        next_text = self.lower_text(i + 1)
+                        if all(i + 1 in codes[w] if w in codes else w in next_text for w in remaining):
+                            results.append(dict(verse, matchType='proximity'))
+
+        results.sort(key=self.rank_key)
+        return results[:limit] if limit else results
+
+
+class ColumnarEngine(FlatEngine):
+    """FlatEngine over the columnar format, read in place from its columns."""
+
+    name = 'columnar'
+
+    def __init__(self, path=COLUMNAR_FILE, book_order=None):
+        SearchEngine.__init__(self, book_order)
+        self.concordance = Concordance()
+        data = read_json(path)
+        self.chapters = data["chapters"]
+        self.paths = data["paths"]
+        self.chapter = data["chapter"]
+        self.verse_numbers = data["verse"]
+        self.text = data["text"]
+        self.offsets = data["offset"]
+        if ASTRAL.search(self.text):
+            self.offsets = self._code_point_offsets(self.text, self.offsets)
+
+    @staticmethod
+    def _code_point_offsets(text, offsets):
+        """UTF-16 offsets (as written for the browser) as Python string indices."""
+        result = []
+        index = unit = 0
+        for offset in offsets:
+            while unit < offset:
+                unit += 2 if ord(text[index]) > 0xFFFF else 1
+                index += 1
+            result.append(index)
+        return result
+
+    def __len__(self):
+        return len(self.verse_numbers)
+
+    def verse(self, i):
+        chapter = self.chapter[i]
+        return {"n": self.chapters[chapter], "v": str(self.verse_numbers[i]),
+                "t": self.text[self.offsets[i]:self.offsets[i + 1]], "p": self.paths[chapter]}
+
+    def lower_text(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1]].lower()
+
+
+# ============================================================================
+# Word index (search/), with the trigram index as fallback
+# ============================================================================
+
+class WordEngine(SearchEngine):
+    """
+    The app's word index search. Shards, concordance files and text blocks
+    are read on first use and kept, as the app caches its fetches. With a
+    trigram index, a query without whole-word matches is retried as a
+    substring, then as a close spelling.
+    """
+
+    name = 'word'
+
+    def __init__(self, directory=SEARCH_DIR, trigram_dir=None, book_order=None):
+        super().__init__(book_order)
+        self.directory = directory
+        self.meta = read_json(os.path.join(directory, 'meta.json'))
+        self.shard_keys = set(self.meta["shards"])
+        self.starts = [chapter[2] for chapter in self.meta["chapters"]]
+        self.shards = {}
+        self.concordance = Concordance(directory, self.meta["strongsGroup"])
+        self.blocks = {}
+
+        self.trigram_dir = trigram_dir
+        self.trigram_meta = None
+        self.trigram_shards = {}
+        if trigram_dir and os.path.exists(os.path.join(trigram_dir, 'meta.json')):
+            self.trigram_meta = read_json(os.path.join(trigram_dir, 'meta.json'))
+            self.name = 'word+trigrams'
+
+    def _shard(self, key):
+        if key not in self.shards:
+            self.shards[key] = read_json(os.path.join(self.directory, 'terms', shard_file(key)))
+        return self.shards[key]
+
+    def _text_block(self, block):
+        if block not in self.blocks:
+            self.blocks[block] = read_json(os.path.join(self.directory, 'text', f'{block}.json'))
+        return self.blocks[block]
+
+    def chapter_of(self, verse_id):
+        return bisect.bisect_right(self.starts, verse_id) - 1
+
+    def lookup_code(self, term) -> Optional[Dict]:
+        """Concordance entry of a Strong's code ("h7225"), or None if it never occurs."""
+        return self.concordance.lookup(term)
+
+    def lookup_term(self, term) -> Dict[int, Optional[int]]:
+        """
+        Verses containing a term: {verse id: first word offset}. Words of
+        MIN_PREFIX letters or more match by prefix, shorter ones as whole
+        words; Strong's codes come from the concordance and have no word
+        offset.
+        """
+        if is_strongs_code(term):
+            return dict.fromkeys(self.concordance.verses(term))
+
+        keys = []
+        for length in range(len(term), 0, -1):
+            if term[:length] in self.shard_keys:
+                keys.append(term[:length])
+                break
+        prefix = len(term) >= MIN_PREFIX
+        if prefix:
+            keys.extend(k for k in self.meta["shards"] if len(k) > len(term) and k.startswith(term))
+
+        verses = {}
+        for key in keys:
+            for word, postings in self._shard(key).items():
+                if word.startswith(term) if prefix else word == term:
+                    for posting in postings:
+                        first = verses.get(posting[0])
+                        if first is None or posting[1] < first:
+                            verses[posting[0]] = posting[1]
+        return verses
+
+    def search(self, query, limit=RESULT_LIMIT):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        postings = [self.lookup_term(term) for term in terms]
+        results = []
+        if len(terms) == 1:
+            results = [{"id": verse_id} for verse_id in postings[0]]
+        else:
+            # Every match includes a verse of the rarest term, or the one before it
+            rarest = min(postings, key=len)
+            seen = set()
+            for hit in rarest:
+                for verse_id in (hit - 1, hit):
+                    if verse_id < 0 or verse_id in seen:
+                        continue
+                    seen.add(verse_id)
+                    in_verse = [p for p in postings if verse_id in p]
+                    if len(in_verse) == len(postings):
+                        offsets = [p[verse_id] for p in postings if p[verse_id] is not None]
+                        results.append({"id": verse_id, "matchType": 'same-verse',
+                                        "wordDistance": max(offsets) - min(offsets) if offsets else 0})
+                    elif in_verse and self.chapter_of(verse_id + 1) == self.chapter_of(verse_id) and \
+                            all(verse_id in p or verse_id + 1 in p for p in postings):
+                        results.append({"id": verse_id, "matchType": 'proximity'})
+
+        if not results and self.trigram_meta and not any(map(is_strongs_code, terms)):
+            return self.search_trigrams(query, limit)
+
+        self._describe(results)
+        results.sort(key=self.rank_key)
+        results = results[:limit] if limit else results
+        self._attach_text(results)
+        return results
+
+    def _describe(self, results):
+        for result in results:
+            chapter = self.meta["chapters"][self.chapter_of(result["id"])]
+            result["n"] = chapter[0]
+            result["p"] = chapter[1]
+
+    def _verse_text(self, verse_id):
+        size = self.meta["blockSize"]
+        return self._text_block(verse_id // size)[verse_id % size]
+
+    def _attach_text(self, results):
+        for result in results:
+            verse, text = self._verse_text(result["id"])
+            result["v"] = str(verse)
+            result["t"] = text
+
+    # Trigram index
+
+    def lookup_trigram(self, gram) -> List[int]:
+        """Verse ids holding a trigram (in the last shard starting at or before it)."""
+        shard = max(bisect.bisect_right(self.trigram_meta["shards"], gram) - 1, 0)
+        if shard not in self.trigram_shards:
+            self.trigram_shards[shard] = read_json(os.path.join(self.trigram_dir, f'{shard}.json'))
+        return delta_decode(self.trigram_shards[shard].get(gram, []))
+
+    def search_trigrams(self, query, limit=RESULT_LIMIT):
+        """
+        Verses containing the normalized query, or failing that, within one
+        edit of it (two for queries over seven letters).
+        """
+        q = normalize_text(query)
+        if len(q) < 3:
+            return []
+
+        # Unpadded: the query may start or end mid-word
+        grams = list({q[i:i + 3] for i in range(len(q) - 2)})
+        postings = sorted((self.lookup_trigram(g) for g in grams), key=len)
+
+        def verify(ids, distance_of):
+            verified = []
+            for verse_id in ids:
+                verse, text = self._verse_text(verse_id)
+                distance = distance_of(normalize_text(text))
+                if distance is not None:
+                    verified.append({"id": verse_id, "v": str(verse), "t": text, "distance": distance})
+            return verified
+
+        candidates = set(postings[0]).intersection(*postings[1:])
+        results = verify(sorted(candidates), lambda text: 0 if q in text else None)
+
+        # An edit changes at most three trigrams
+        if not results:
+            max_edits = 2 if len(q) > 7 else 1
+            needed = len(grams) - 3 * max_edits
+            if needed < 1:
+                return []
+            counts = {}
+            for ids in postings:
+                for verse_id in ids:
+                    counts[verse_id] = counts.get(verse_id, 0) + 1
+
+            def within(text):
+                distance = substring_distance(q, text)
+                return distance if distance <= max_edits else None
+
+            results = verify(sorted(i for i, n in counts.items() if n >= needed), within)
+
+        self._describe(results)
+        results.sort(key=lambda r: (r["distance"], self.rank_key(r)))
+        return results[:limit] if limit else results
+
+
+FORMATS = {
+    'flat': lambda: FlatEngine(),
+    'columnar': lambda: ColumnarEngine(),
+    'word': lambda: WordEngine(),
+    'word+trigrams': lambda: WordEngine(trigram_dir=TRIGRAM_DIR),
+}
+
+
+def available_formats() -> List[str]:
+    """Formats whose files data/generate_index.py has written."""
+    present = {
+        'flat': os.path.exists(OUTPUT_FILE),
+        'columnar': os.path.exists(COLUMNAR_FILE),
+        'word': os.path.exists(os.path.join(SEARCH_DIR, 'meta.json')),
+        'word+trigrams': os.path.exists(os.path.join(SEARCH_DIR, 'meta.json')) and
+                         os.path.exists(os.path.join(TRIGRAM_DIR, 'meta.json')),
+    }
+    return [name for name in FORMATS if present[name]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Search the generated index like the app does')
+    parser.add_argument('query', help='Words, a phrase or a Strong\'s code (H7225)')
+    parser.add_argument('--format', choices=list(FORMATS), default='word+trigrams',
+                        help='Index format to search (default: word+trigrams)')
+    parser.add_argument('--all', action='store_true', help='Show every result, not just the first 50')
+    args = parser.parse_args()
+
+    if args.format not in available_formats():
+        print(f"Error: the {args.format} index has not been generated (see data/generate_index.py).")
+        raise SystemExit(1)
+
+    engine = FORMATS[args.format]()
+    results = engine.search(args.query, limit=None if args.all else RESULT_LIMIT)
+    for result in results:
+        tag = {'proximity': ' (+1)'}.get(result.get("matchType"), '')
+        print(f"{result['n']}:{result['v']}{tag}  {result['t']}")
+    print(f"{len(results)} result(s)")
@@ -10,26 +10,43 @@ Usage:
     python generate_audio.py --voice "en-US-JennyNeural"
     python generate_audio.py --voice "en-US-JennyNeural" --book "Matthew"
     python generate_audio.py --voice "en-US-JennyNeural" --book "Matthew" --chapter 1
+    python generate_audio.py --voice "en-US-JennyNeural" --workers 4
+    python generate_audio.py --backend fake --benchmark --benchmark-workers 1,4,16
 
 Requirements:
     pip install azure-cognitiveservices-speech python-dotenv tqdm
+    (the Azure SDK is not needed with --backend fake)
 """
 
 import argparse
+import copy
+import cProfile
+import hashlib
 import json
 import os
+import pstats
+import random
 import re
+import shutil
+import struct
+import subprocess
 import sys
+import tempfile
+import threading
 import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterator
 
 try:
     import azure.cognitiveservices.speech as speechsdk
 except ImportError:
-    print("Error: azure-cognitiveservices-speech not installed.")
-    print("Install with: pip install azure-cognitiveservices-speech")
-    sys.exit(1)
+    # Only the Azure backend needs the SDK; checked in AzureTTSClient.initialize
+    speechsdk = None
+
+from data.corpus_parser import CACHE_FILE as PARSED_CORPUS_FILE, ParsedCorpus, parse_chapter, verse_tts_text
 
 try:
     from dotenv import load_dotenv
@@ -60,15 +77,45 @@ class Config:
         self.subscription_key = os.getenv('AZURE_TTS_KEY', '')
         self.region = os.getenv('AZURE_TTS_REGION', 'eastus')
         
+        # Optional JSON list of endpoints to spread requests over (see Endpoint.load)
+        endpoints_path = os.getenv('AZURE_TTS_ENDPOINTS', '')
+        self.endpoints_path: Optional[Path] = Path(endpoints_path) if endpoints_path else None
+        
         # Paths
         self.base_dir = Path(__file__).parent
         self.audio_dir = self.base_dir / 'audio'
         self.bibles_dir = self.base_dir / 'bibles'
         self.content_manifest_path = self.base_dir / 'data' / 'content_manifest.json'
+        self.parsed_corpus_path = self.base_dir / PARSED_CORPUS_FILE
+        self.plans_dir = self.base_dir / 'plans'
         
         # Default settings
         self.default_voice = 'en-US-JennyNeural'
         self.speech_rate = 0.9  # Slightly slower for clarity
+        self.workers = 1  # Concurrent synthesis requests (1 = sequential)
+        self.backend = 'azure'
+        # SDK SpeechSynthesisOutputFormat name. It must be an MP3 format: chunks
+        # are appended into one .mp3 (the SDK default is RIFF/WAV, whose
+        # headers don't survive that) and renditions are transcoded from it
+        self.output_format = 'Audio24Khz48KBitRateMonoMp3'
+        self.renditions = ['standard']  # See RenditionEncoder.PRESETS
+        self.max_retries = 6  # Per chunk, for throttled or transient failures
+        self.backoff_base = 0.5  # Seconds; doubles per retry, with jitter
+        self.backoff_max = 30.0
+        self.job_order = 'demand'  # 'demand' (reading plans first) or 'manifest'
+        self.shard = (1, 1)  # (index, count), 1-based
+        self.metrics_out: Optional[Path] = None  # JSONL telemetry (see MetricsRecorder)
+        
+        # Chunk audio cache (None disables it)
+        self.cache_dir: Optional[Path] = self.base_dir / '.cache' / 'tts'
+        self.cache_max_bytes = 2 * 1024 ** 3
+        
+        # Fake backend behaviour (see FakeTTSBackend)
+        self.fake_latency_ms = 200
+        self.fake_throttle_rate = 0.0
+        self.fake_error_rate = 0.0
+        self.fake_seed = 0
+        self.fake_capacity = 0  # Concurrent requests accepted before throttling (0 = no limit)
         
     def validate_credentials(self) -> bool:
         """Check if Azure credentials are configured."""
@@ -89,22 +136,8 @@ class Config:
 class TextProcessor:
     """Process markdown text for TTS synthesis."""
     
-    # Pattern to match lexicon references like [[G976]], [[G1078]], [[H1234]], etc.
-    LEXICON_PATTERN = re.compile(r'\[\[[GH]\d+\]\]')
-    
-    # Pattern to match incomplete lexicon references
-    LEXICON_INCOMPLETE_PATTERN = re.compile(r'\[\[[GH]?\d*|\]\]')
-    
-    # Pattern to match verse markers (###### N)
-    VERSE_MARKER_PATTERN = re.compile(r'^######\s+(\d+)\s*$', re.MULTILINE)
-    
-    # Pattern to match markdown links [[text|link]] or [[link]]
-    LINK_PATTERN = re.compile(r'\[\[[^\]]+\]\]')
-    
-    # Pattern to match navigation arrows and separators
-    NAV_PATTERN = re.compile(r'[\←\→\•]|---')
-    
-    # Maximum characters per SSML chunk (Azure TTS has limits)
+    # Maximum size of a chunk's SSML body (escaped text plus bookmarks);
+    # Azure TTS has limits
     MAX_CHUNK_CHARS = 3000
     
     @classmethod
@@ -115,85 +148,42 @@ class TextProcessor:
         Returns:
             Tuple of (chapter_title, list of (verse_number, verse_text))
         """
-        lines = content.split('\n')
-        
-        # Extract chapter title (first # heading)
-        chapter_title = ''
-        for line in lines:
-            if line.startswith('# '):
-                chapter_title = line[2:].strip()
-                break
-        
-        # Remove YAML front matter
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                content = '---'.join(parts[2:])
+        return cls.chapter_text(parse_chapter(content))
+    
+    @classmethod
+    def chapter_text(cls, parsed: Dict) -> Tuple[str, List[Tuple[int, str]]]:
+        """
+        Spoken text of a parsed chapter (see data/corpus_parser.py).
         
-        # Split into verses
+        Returns:
+            Tuple of (chapter_title, list of (verse_number, verse_text))
+        """
         verses = []
-        current_verse_num = 0
-        current_verse_text = []
-        
-        for line in content.split('\n'):
-            # Check for verse marker
-            verse_match = cls.VERSE_MARKER_PATTERN.match(line.strip())
-            if verse_match:
-                # Save previous verse if exists
-                if current_verse_num > 0 and current_verse_text:
-                    verse_text = ' '.join(current_verse_text)
-                    cleaned = cls.clean_text(verse_text)
-                    if cleaned:
-                        verses.append((current_verse_num, cleaned))
-                
-                current_verse_num = int(verse_match.group(1))
-                current_verse_text = []
-            elif current_verse_num > 0:
-                # Add line to current verse
-                cleaned_line = cls.clean_text(line)
-                if cleaned_line:
-                    current_verse_text.append(cleaned_line)
-        
-        # Don't forget the last verse
-        if current_verse_num > 0 and current_verse_text:
-            verse_text = ' '.join(current_verse_text)
-            cleaned = cls.clean_text(verse_text)
-            if cleaned:
-                verses.append((current_verse_num, cleaned))
-        
-        return chapter_title, verses
+        for verse in parsed['verses']:
+            text = verse_tts_text(verse)
+            if text:
+                verses.append((verse['v'], text))
+        return parsed['title'], verses
     
     @classmethod
-    def clean_text(cls, text: str) -> str:
-        """
-        Clean text for TTS by removing lexicon references and formatting.
+    def hash_chapter_text(cls, chapter_title: str, verses: List[Tuple[int, str]]) -> str:
+        """Hash the extracted text of a chapter (what actually gets spoken)."""
+        h = hashlib.sha256(chapter_title.encode('utf-8'))
+        for verse_num, verse_text in verses:
+            h.update(f"\n{verse_num}\t{verse_text}".encode('utf-8'))
+        return h.hexdigest()
+    
+    @classmethod
+    def split_verses_into_segments(cls, chapter_title: str,
+                                   verses: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
         """
-        # Remove lexicon references [[G####]] first (double brackets)
-        text = cls.LEXICON_PATTERN.sub('', text)
-        
-        # Remove any remaining incomplete double brackets
-        text = cls.LEXICON_INCOMPLETE_PATTERN.sub('', text)
-        
-        # Remove other wiki-style double bracket links
-        text = cls.LINK_PATTERN.sub('', text)
-        
-        # Remove single square brackets around words (e.g., [are], [the])
-        # These are interpreted as SSML paralinguistic notation by Azure TTS
-        text = re.sub(r'\[([^\]]+)\]', r'\1', text)
-        
-        # Remove navigation symbols
-        text = cls.NAV_PATTERN.sub('', text)
-        
-        # Remove markdown formatting
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # Bold
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)  # Italic
-        text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)  # Links
-        
-        # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
+        Split verses into chunks that fit within Azure TTS limits, keeping
+        verse boundaries. The chapter title opens the first chunk as verse 0.
+        See ChunkPlanner for how chunks are balanced and oversize verses split.
         
-        return text
+        Returns list of chunks, each a list of (verse_number, text).
+        """
+        return ChunkPlanner.plan(chapter_title, verses)
     
     @classmethod
     def split_verses_into_chunks(cls, chapter_title: str, verses: List[Tuple[int, str]]) -> List[str]:
@@ -202,51 +192,60 @@ class TextProcessor:
         
         Returns list of text chunks.
         """
-        chunks = []
-        current_chunk = f"{chapter_title}."
-        current_length = len(current_chunk)
-        
-        for verse_num, verse_text in verses:
-            verse_with_space = f" {verse_text}"
-            verse_length = len(verse_with_space)
-            
-            # If adding this verse would exceed the limit, start a new chunk
-            if current_length + verse_length > cls.MAX_CHUNK_CHARS and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = verse_text
-                current_length = len(verse_text)
-            else:
-                current_chunk += verse_with_space
-                current_length += verse_length
-        
-        # Don't forget the last chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
+        segments = cls.split_verses_into_segments(chapter_title, verses)
+        return [' '.join(text for _, text in chunk).strip() for chunk in segments]
     
     @classmethod
-    def generate_ssml_for_chunk(cls, text: str, voice_name: str, rate: float = 0.9) -> str:
-        """
-        Generate SSML for a single text chunk.
-        """
-        # Escape XML special characters
+    def escape_ssml_text(cls, text: str) -> str:
+        """Escape XML special characters for SSML."""
         text = text.replace('&', '&amp;')
         text = text.replace('<', '&lt;')
         text = text.replace('>', '&gt;')
         text = text.replace('"', '&quot;')
         text = text.replace("'", '&apos;')
-        
-        # Generate SSML
-        ssml = f'''<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
+        return text
+    
+    @classmethod
+    def wrap_ssml(cls, body: str, voice_name: str, rate: float = 0.9) -> str:
+        """Wrap escaped SSML body content in the speak/voice/prosody envelope."""
+        return f'''<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
     <voice name="{voice_name}">
         <prosody rate="{rate}">
-            {text}
+            {body}
         </prosody>
     </voice>
 </speak>'''
+    
+    @classmethod
+    def generate_ssml_for_chunk(cls, text: str, voice_name: str, rate: float = 0.9) -> str:
+        """
+        Generate SSML for a single text chunk.
+        """
+        return cls.wrap_ssml(cls.escape_ssml_text(text), voice_name, rate)
+    
+    @classmethod
+    def ssml_segment(cls, verse_num: int, text: str, bookmark: bool = True) -> str:
+        """SSML body for one segment: its verse bookmark (named "v<number>") and escaped text."""
+        mark = f'<bookmark mark="v{verse_num}"/>' if bookmark and verse_num > 0 else ''
+        return mark + cls.escape_ssml_text(text)
+    
+    @classmethod
+    def generate_ssml_for_segments(cls, segments: List[Tuple[int, str]],
+                                   voice_name: str, rate: float = 0.9,
+                                   previous_verse: Optional[int] = None) -> str:
+        """
+        Generate SSML for a chunk of verses, with a bookmark at the start of
+        each verse so verse timings can be captured.
+        
+        A verse split across segments is bookmarked only where it starts;
+        previous_verse is the verse the preceding chunk ended with.
+        """
+        parts = []
+        for verse_num, text in segments:
+            parts.append(cls.ssml_segment(verse_num, text, bookmark=verse_num != previous_verse))
+            previous_verse = verse_num
         
-        return ssml
+        return cls.wrap_ssml(' '.join(parts), voice_name, rate)
     
     @classmethod
     def generate_ssml(cls, chapter_title: str, verses: List[Tuple[int, str]], 
@@ -265,15 +264,217 @@ class TextProcessor:
         return cls.generate_ssml_for_chunk(full_text, voice_name, rate)
 
 
+# ============================================================================
+# Chunk Planning
+# ============================================================================
+
+class ChunkPlanner:
+    """
+    Plan how a chapter is split into synthesis requests.
+    
+    Chunk size is measured on the SSML body that is actually sent (escaped
+    text plus verse bookmarks), not on raw text. A chapter gets the fewest
+    chunks that fit TextProcessor.MAX_CHUNK_CHARS, with verses spread so the
+    largest chunk is as small as possible; concurrent requests then take
+    about the same time instead of one long chunk and a short tail.
+    
+    A verse that does not fit in a chunk by itself is split at sentence
+    boundaries, then clause boundaries, then between words. Its pieces keep
+    the verse number; only the first carries the verse bookmark.
+    """
+    
+    # Break points, tried in order: sentence ends, then clauses, then words
+    SPLIT_PATTERNS = [
+        re.compile(r'(?<=[.!?])\s+|(?<=[.!?]["\'\u201d\u2019)])\s+'),
+        re.compile(r'(?<=[,;:\u2014])\s+'),
+        re.compile(r'\s+'),
+    ]
+    
+    @classmethod
+    def segment_cost(cls, verse_num: int, text: str) -> int:
+        """SSML characters a segment adds to a chunk, including the joining space."""
+        return len(TextProcessor.ssml_segment(verse_num, text)) + 1
+    
+    @classmethod
+    def chunk_cost(cls, segments: List[Tuple[int, str]]) -> int:
+        """SSML body size of a chunk."""
+        return sum(cls.segment_cost(v, t) for v, t in segments) - 1
+    
+    @classmethod
+    def split_oversize(cls, verse_num: int, text: str, limit: int,
+                       level: int = 0) -> List[str]:
+        """Split a verse's text into pieces whose SSML fits within limit."""
+        if cls.segment_cost(verse_num, text) <= limit:
+            return [text]
+        
+        if level >= len(cls.SPLIT_PATTERNS):
+            # A single unbreakable word; cut it on escaped-size bounds
+            pieces = []
+            piece = ''
+            for ch in text:
+                if piece and cls.segment_cost(verse_num, piece + ch) > limit:
+                    pieces.append(piece)
+                    piece = ''
+                piece += ch
+            return pieces + [piece] if piece else pieces
+        
+        pieces = []
+        current = ''
+        for part in cls.SPLIT_PATTERNS[level].split(text):
+            if not part:
+                continue
+            candidate = f"{current} {part}" if current else part
+            if cls.segment_cost(verse_num, candidate) <= limit:
+                current = candidate
+                continue
+            if current:
+                pieces.append(current)
+            if cls.segment_cost(verse_num, part) <= limit:
+                current = part
+            else:
+                pieces.extend(cls.split_oversize(verse_num, part, limit, level + 1))
+                current = ''
+        if current:
+            pieces.append(current)
+        return pieces
+    
+    @classmethod
+    def segments(cls, chapter_title: str, verses: List[Tuple[int, str]],
+                 limit: int) -> List[Tuple[int, str]]:
+        """The title (as verse 0) and verses, with oversize verses split."""
+        segments = [(0, f"{chapter_title}.")]
+        for verse_num, verse_text in verses:
+            for piece in cls.split_oversize(verse_num, verse_text, limit + 1):
+                segments.append((verse_num, piece))
+        return segments
+    
+    @classmethod
+    def _pack(cls, costs: List[int], cap: int) -> List[int]:
+        """Greedily pack segment costs under cap; returns the start index of each chunk."""
+        starts = [0]
+        size = 0
+        for i, cost in enumerate(costs):
+            if size and size + cost > cap:
+                starts.append(i)
+                size = 0
+            size += cost
+        return starts
+    
+    @classmethod
+    def plan(cls, chapter_title: str, verses: List[Tuple[int, str]],
+             limit: Optional[int] = None) -> List[List[Tuple[int, str]]]:
+        """
+        Split a chapter into balanced chunks.
+        
+        Returns list of chunks, each a list of (verse_number, text), with the
+        chapter title as verse 0 at the start of the first chunk.
+        """
+        limit = limit or TextProcessor.MAX_CHUNK_CHARS
+        segments = cls.segments(chapter_title, verses, limit)
+        
+        # Costs include a joining space, so a chunk of cost <= limit + 1 fits
+        costs = [cls.segment_cost(v, t) for v, t in segments]
+        cap = limit + 1
+        count = len(cls._pack(costs, cap))
+        
+        # Greedy packing gives the fewest chunks; now find the smallest cap
+        # that still needs no more chunks than that
+        low, high = max(costs), cap
+        while low < high:
+            mid = (low + high) // 2
+            if len(cls._pack(costs, mid)) <= count:
+                high = mid
+            else:
+                low = mid + 1
+        
+        starts = cls._pack(costs, low) + [len(segments)]
+        return [segments[a:b] for a, b in zip(starts, starts[1:])]
+    
+    @classmethod
+    def greedy_plan(cls, chapter_title: str, verses: List[Tuple[int, str]],
+                    limit: Optional[int] = None) -> List[List[Tuple[int, str]]]:
+        """Fill each chunk up to the limit in turn (the previous strategy, for comparison)."""
+        limit = limit or TextProcessor.MAX_CHUNK_CHARS
+        segments = cls.segments(chapter_title, verses, limit)
+        starts = cls._pack([cls.segment_cost(v, t) for v, t in segments], limit + 1)
+        starts.append(len(segments))
+        return [segments[a:b] for a, b in zip(starts, starts[1:])]
+    
+    @classmethod
+    def report(cls, chapters: List[Tuple[str, List[Tuple[int, str]]]],
+               limit: Optional[int] = None, bucket: int = 250):
+        """Print a chunk size histogram and balance summary for a set of chapters."""
+        limit = limit or TextProcessor.MAX_CHUNK_CHARS
+        sizes = []
+        greedy_sizes = []
+        split_verses = 0
+        balanced_max = []
+        greedy_max = []
+        chunks_per_chapter = defaultdict(int)
+        
+        for chapter_title, verses in chapters:
+            split_verses += sum(1 for v, t in verses if cls.segment_cost(v, t) > limit + 1)
+            planned = [cls.chunk_cost(c) for c in cls.plan(chapter_title, verses, limit)]
+            greedy = [cls.chunk_cost(c) for c in cls.greedy_plan(chapter_title, verses, limit)]
+            sizes.extend(planned)
+            greedy_sizes.extend(greedy)
+            chunks_per_chapter[len(planned)] += 1
+            if len(planned) > 1:
+                balanced_max.append(max(planned) / min(planned))
+                greedy_max.append(max(greedy) / min(greedy))
+        
+        if not sizes:
+            print("No chapters to plan.")
+            return
+        
+        print(f"\n{'='*60}")
+        print(f"Chunk plan (limit {limit} SSML characters)")
+        print(f"{'='*60}")
+        print(f"  Chapters: {len(chapters)}")
+        print(f"  Requests: {len(sizes)}")
+        print(f"  Oversize verses split: {split_verses}")
+        print(f"  Chunk size: min {min(sizes)}, mean {sum(sizes) // len(sizes)}, max {max(sizes)}")
+        if balanced_max:
+            print(f"  Largest/smallest chunk in multi-chunk chapters: "
+                  f"{sum(balanced_max) / len(balanced_max):.2f}x "
+                  f"(greedy fill: {sum(greedy_max) / len(greedy_max):.2f}x)")
+        
+        print("\n  Chunks per chapter:")
+        for count in sorted(chunks_per_chapter):
+            print(f"    {count:>3}: {chunks_per_chapter[count]}")
+        
+        print(f"\n  {'SSML chars':<13} {'Chunks':>7} {'Greedy':>7}")
+        histogram = defaultdict(int)
+        greedy_histogram = defaultdict(int)
+        for size in sizes:
+            histogram[(size - 1) // bucket] += 1
+        for size in greedy_sizes:
+            greedy_histogram[(size - 1) // bucket] += 1
+        peak = max(histogram.values())
+        for b in range(max(max(histogram), max(greedy_histogram)) + 1):
+            bar = '#' * round(40 * histogram[b] / peak)
+            print(f"  {b * bucket + 1:>5}-{(b + 1) * bucket:<6} {histogram[b]:>7} {greedy_histogram[b]:>7} {bar}")
+        print(f"{'='*60}")
+
+
 # ============================================================================
 # Chapter Discovery
 # ============================================================================
 
 class ChapterDiscovery:
-    """Discover and filter Bible chapters."""
+    """Discover, filter and read Bible chapters."""
     
     def __init__(self, config: Config):
         self.config = config
+        self.corpus = ParsedCorpus(config.base_dir, str(config.parsed_corpus_path))
+    
+    def read_chapter(self, chapter_info: Dict) -> Tuple[str, List[Tuple[int, str]]]:
+        """
+        Read a chapter's spoken text through the parsed-corpus cache.
+        
+        Raises OSError if the file can't be read.
+        """
+        return TextProcessor.chapter_text(self.corpus.get(chapter_info['path']))
     
     def get_all_chapters(self) -> List[Dict]:
         """
@@ -332,85 +533,1765 @@ class ChapterDiscovery:
         book_from_filename = match.group(1)
         chapter_num = int(match.group(2))
         
-        # Generate output filename
-        output_name = f"{book_from_filename.replace(' ', '_')}_{chapter_num}.mp3"
-        output_path = self.config.audio_dir / output_name
+        # Generate output filename
+        output_name = f"{book_from_filename.replace(' ', '_')}_{chapter_num}.mp3"
+        output_path = self.config.audio_dir / output_name
+        
+        return {
+            'path': self.config.base_dir / file_path,
+            'book': book_from_filename,
+            'chapter': chapter_num,
+            'output_path': output_path,
+            'source_path': file_path
+        }
+    
+    def _scan_bibles_directory(self) -> List[Dict]:
+        """Fallback method to scan bibles directory directly."""
+        chapters = []
+        
+        if not self.config.bibles_dir.exists():
+            return chapters
+        
+        for book_dir in self.config.bibles_dir.rglob('BER-*'):
+            if not book_dir.is_dir():
+                continue
+            
+            for chapter_file in book_dir.glob('*.md'):
+                chapter_info = self._parse_chapter_path(str(chapter_file.relative_to(self.config.base_dir)))
+                if chapter_info:
+                    chapters.append(chapter_info)
+        
+        return chapters
+    
+    def filter_chapters(self, chapters: List[Dict], 
+                        book: Optional[str] = None,
+                        chapter: Optional[int] = None,
+                        skip_existing: bool = True) -> List[Dict]:
+        """
+        Filter chapters based on criteria.
+        """
+        filtered = []
+        
+        for ch in chapters:
+            # Filter by book
+            if book and ch['book'].lower() != book.lower():
+                continue
+            
+            # Filter by chapter number
+            if chapter is not None and ch['chapter'] != chapter:
+                continue
+            
+            # Skip existing files
+            if skip_existing and ch['output_path'].exists():
+                continue
+            
+            filtered.append(ch)
+        
+        return filtered
+
+
+# ============================================================================
+# Job Planning
+# ============================================================================
+
+class JobPlanner:
+    """
+    Order chapters by reader demand and split them into shards.
+    
+    Demand comes from the reading plans registered in plans/index.json: a
+    chapter's priority is the earliest day any plan reads it, so day 1 of
+    every plan is generated first. Chapters no plan reads follow in
+    manifest order.
+    
+    Shards are balanced by spoken character count. Every machine builds
+    the same job list from the content manifest and the plans, so
+    `--shard i/N` needs no coordination; shards are assigned before
+    existing or up-to-date files are skipped, so local state on one
+    machine never moves chapters between shards.
+    """
+    
+    def __init__(self, config: Config, discovery: ChapterDiscovery):
+        self.config = config
+        self.discovery = discovery
+    
+    def load_demand(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Map "Book N" references to a priority key (day, plan order, position
+        in the plan); lower sorts first.
+        """
+        demand: Dict[str, Tuple[int, int, int]] = {}
+        index_path = self.config.plans_dir / 'index.json'
+        if not index_path.exists():
+            return demand
+        
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                plan_ids = [plan['id'] for plan in json.load(f)]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: could not read {index_path}: {e}")
+            return demand
+        
+        for plan_order, plan_id in enumerate(plan_ids):
+            plan_path = self.config.plans_dir / f"{plan_id}.json"
+            try:
+                with open(plan_path, 'r', encoding='utf-8') as f:
+                    readings = json.load(f).get('readings', [])
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not read {plan_path}: {e}")
+                continue
+            
+            position = 0
+            for reading in readings:
+                for section in reading.get('sections', []):
+                    key = (reading.get('day', 0), plan_order, position)
+                    reference = section.get('reference', '')
+                    position += 1
+                    if reference not in demand or key < demand[reference]:
+                        demand[reference] = key
+        
+        return demand
+    
+    def estimate_chars(self, chapter_info: Dict) -> int:
+        """Spoken characters in a chapter (0 if it can't be read)."""
+        try:
+            chapter_title, verses = self.discovery.read_chapter(chapter_info)
+        except OSError:
+            return 0
+        return len(chapter_title) + sum(len(text) + 1 for _, text in verses)
+    
+    def order(self, chapters: List[Dict]) -> List[Dict]:
+        """Sort chapters by demand (see load_demand); stable for ties."""
+        if self.config.job_order != 'demand':
+            return list(chapters)
+        
+        demand = self.load_demand()
+        unplanned = (float('inf'), 0, 0)
+        return sorted(chapters, key=lambda ch: demand.get(f"{ch['book']} {ch['chapter']}", unplanned))
+    
+    def shard(self, chapters: List[Dict], index: int, count: int) -> Tuple[List[Dict], Dict]:
+        """
+        Select shard index of count (1-based) from an ordered job list.
+        
+        Jobs are dealt in priority order to whichever shard has the fewest
+        characters so far (lowest index on ties). Every prefix of the list
+        stays balanced, so shards work through high-demand chapters at the
+        same pace and finish within about one chapter of each other.
+        
+        Returns (chapters in this shard, stats dict).
+        """
+        loads = [0] * count
+        selected = []
+        
+        for ch in chapters:
+            chars = self.estimate_chars(ch)
+            target = min(range(count), key=lambda i: loads[i])
+            loads[target] += chars
+            if target == index - 1:
+                selected.append(ch)
+        
+        self.discovery.corpus.save()
+        
+        total = sum(loads)
+        return selected, {
+            'chars': loads[index - 1],
+            'totalChars': total,
+            'share': loads[index - 1] / total if total else 0.0,
+            'spread': (max(loads) - min(loads)) / max(loads) if max(loads) else 0.0
+        }
+    
+    def plan(self, chapters: List[Dict]) -> List[Dict]:
+        """Order chapters and keep this machine's shard, printing a summary."""
+        chapters = self.order(chapters)
+        index, count = self.config.shard
+        if count == 1:
+            return chapters
+        
+        chapters, stats = self.shard(chapters, index, count)
+        print(f"Shard {index}/{count}: {len(chapters)} chapters, "
+              f"{stats['chars']:,} of {stats['totalChars']:,} characters "
+              f"({stats['share']:.1%}; shards differ by at most {stats['spread']:.1%})")
+        return chapters
+
+
+# ============================================================================
+# Chapter Output
+# ============================================================================
+
+class SynthesisResult:
+    """Audio for one synthesized chunk, with the verse bookmarks reached in it."""
+    
+    def __init__(self, audio_data: bytes, duration_ms: int = 0,
+                 bookmarks: Optional[List[Tuple[int, int]]] = None):
+        self.audio_data = audio_data
+        self.duration_ms = duration_ms
+        self.bookmarks = bookmarks or []  # (verse_number, ms offset within the chunk)
+    
+    def timing(self) -> Dict:
+        """Timing record for checkpoints and the timing sidecar."""
+        return {
+            "size": len(self.audio_data),
+            "durationMs": self.duration_ms,
+            "bookmarks": [list(b) for b in self.bookmarks]
+        }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize as a length-prefixed JSON header followed by the audio."""
+        header = json.dumps({
+            "durationMs": self.duration_ms,
+            "bookmarks": self.bookmarks
+        }, separators=(',', ':')).encode('utf-8')
+        return struct.pack('>I', len(header)) + header + self.audio_data
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SynthesisResult':
+        """Inverse of to_bytes."""
+        (header_len,) = struct.unpack_from('>I', data)
+        header = json.loads(data[4:4 + header_len].decode('utf-8'))
+        bookmarks = [tuple(b) for b in header.get('bookmarks', [])]
+        return cls(data[4 + header_len:], header.get('durationMs', 0), bookmarks)
+
+
+class ChapterWriter:
+    """
+    Streams a chapter's audio to disk chunk by chunk.
+    
+    Chunks are appended to `<output>.part` as they arrive and the file is
+    renamed over the final path only once every chunk is written, so the
+    final path never holds a truncated file. After each chunk a checkpoint
+    (`<output>.part.json`) records the chunk plan and how much has been
+    written; a later run with the same plan resumes from the last finished
+    chunk instead of starting the chapter over.
+    
+    On commit a timing sidecar (`<output stem>.timing.json`) is written next
+    to the audio, giving each verse's start in milliseconds and bytes so a
+    player can seek straight to it.
+    """
+    
+    TIMING_VERSION = 2
+    
+    def __init__(self, output_path: Path, chunk_keys: List[str]):
+        self.output_path = output_path
+        self.part_path = output_path.with_name(output_path.name + '.part')
+        self.checkpoint_path = output_path.with_name(output_path.name + '.part.json')
+        self.timing_path = self.timing_path_for(output_path)
+        self.chunk_keys = chunk_keys
+        self.chunk_timings: List[Dict] = []
+        self.completed = 0
+        self.bytes_written = 0
+        self._file = None
+    
+    @staticmethod
+    def timing_path_for(output_path: Path) -> Path:
+        """Timing sidecar path for an audio file (Genesis_1.mp3 -> Genesis_1.timing.json)."""
+        return output_path.with_name(f"{output_path.stem}.timing.json")
+    
+    def open(self) -> int:
+        """
+        Open the temp file, resuming from a matching checkpoint if present.
+        
+        Returns the number of chunks already written.
+        """
+        checkpoint = self._load_checkpoint()
+        
+        if (checkpoint
+                and checkpoint.get('chunks') == self.chunk_keys
+                and self.part_path.exists()
+                and self.part_path.stat().st_size >= checkpoint.get('size', 0)):
+            self.completed = checkpoint['completed']
+            self.bytes_written = checkpoint['size']
+            self.chunk_timings = checkpoint.get('timings', [])[:self.completed]
+            self._file = open(self.part_path, 'r+b')
+            # Discard anything written after the last checkpoint
+            self._file.truncate(self.bytes_written)
+            self._file.seek(self.bytes_written)
+        else:
+            self.completed = 0
+            self.bytes_written = 0
+            self.chunk_timings = []
+            self._file = open(self.part_path, 'wb')
+        
+        return self.completed
+    
+    def _load_checkpoint(self) -> Optional[Dict]:
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def write_chunk(self, index: int, result: SynthesisResult):
+        """Append the next chunk's audio and checkpoint it."""
+        if index != self.completed:
+            raise ValueError(f"Chunk {index} written out of order (expected {self.completed})")
+        
+        self._file.write(result.audio_data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        
+        self.completed += 1
+        self.bytes_written += len(result.audio_data)
+        self.chunk_timings.append(result.timing())
+        
+        checkpoint = {
+            "chunks": self.chunk_keys,
+            "completed": self.completed,
+            "size": self.bytes_written,
+            "timings": self.chunk_timings
+        }
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def build_timing(self) -> Dict:
+        """
+        Combine per-chunk bookmarks into chapter-wide verse offsets.
+        
+        Each verse is [verse_number, start_ms]; the player seeks by time and
+        lets the browser request the byte range it needs.
+        """
+        verses = []
+        base_ms = 0
+        base_byte = 0
+        
+        for timing in self.chunk_timings:
+            for verse_num, offset_ms in timing['bookmarks']:
+                verses.append([verse_num, base_ms + offset_ms])
+            base_ms += timing['durationMs']
+            base_byte += timing['size']
+        
+        return {
+            "version": self.TIMING_VERSION,
+            "durationMs": base_ms,
+            "size": base_byte,
+            "verses": verses
+        }
+    
+    def commit(self):
+        """Move the finished file into place and drop the checkpoint."""
+        self._file.close()
+        self._file = None
+        
+        # Sidecar first, so an audio file never appears without its timings
+        tmp_path = self.timing_path.with_name(self.timing_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.build_timing(), f, separators=(',', ':'))
+        os.replace(tmp_path, self.timing_path)
+        
+        os.replace(self.part_path, self.output_path)
+        try:
+            self.checkpoint_path.unlink()
+        except OSError:
+            pass
+    
+    def abort(self):
+        """Close the temp file, keeping it and its checkpoint for a later resume."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ============================================================================
+# Audio Renditions
+# ============================================================================
+
+class RenditionEncoder:
+    """
+    Derive extra renditions of a chapter from its synthesized audio.
+    
+    Each chapter is synthesized once; the MP3 written by ChapterWriter is
+    the "standard" rendition, and the others (e.g. a low-bitrate Opus file
+    for metered connections) are transcoded from it with ffmpeg and
+    written under their own suffix. A rendition index
+    (`<output stem>.renditions.json`) then lists every rendition with its
+    MIME type and byte size so the client can pick the cheapest one it can
+    play. Verse timings are by time, so one timing sidecar serves them all.
+    """
+    
+    INDEX_VERSION = 1
+    STANDARD = 'standard'
+    
+    PRESETS = {
+        'standard': {'suffix': '.mp3', 'mime': 'audio/mpeg'},
+        'mobile': {'suffix': '.mobile.ogg', 'mime': 'audio/ogg; codecs=opus', 'format': 'ogg',
+                   'args': ['-c:a', 'libopus', '-b:a', '16k', '-application', 'voip']},
+        'mobile-mp3': {'suffix': '.mobile.mp3', 'mime': 'audio/mpeg', 'format': 'mp3',
+                       'args': ['-c:a', 'libmp3lame', '-b:a', '24k', '-ar', '22050']},
+    }
+    
+    def __init__(self, names: List[str]):
+        # The standard rendition always exists: it is what gets synthesized
+        self.names = [self.STANDARD] + [n for n in names if n != self.STANDARD]
+    
+    @property
+    def derived(self) -> List[str]:
+        """Renditions transcoded from the standard one."""
+        return self.names[1:]
+    
+    @classmethod
+    def path_for(cls, output_path: Path, name: str) -> Path:
+        """File of a rendition (Genesis_1.mp3, mobile -> Genesis_1.mobile.ogg)."""
+        return output_path.with_name(output_path.stem + cls.PRESETS[name]['suffix'])
+    
+    @staticmethod
+    def index_path_for(output_path: Path) -> Path:
+        """Rendition index of a chapter (Genesis_1.mp3 -> Genesis_1.renditions.json)."""
+        return output_path.with_name(f"{output_path.stem}.renditions.json")
+    
+    def check(self) -> bool:
+        """Check that derived renditions can be encoded; prints why not."""
+        if self.derived and not shutil.which('ffmpeg'):
+            print("Error: ffmpeg is required for the renditions: " + ', '.join(self.derived))
+            print("Install it (e.g. apt install ffmpeg / brew install ffmpeg) or use --renditions standard")
+            return False
+        return True
+    
+    def encode(self, output_path: Path, duration_ms: int) -> Optional[Dict[str, int]]:
+        """
+        Transcode the derived renditions of a chapter and write its index.
+        
+        Returns {rendition name: size in bytes} for the derived renditions
+        ({} if there are none), or None if encoding failed.
+        """
+        if not self.derived:
+            return {}
+        
+        sizes = {}
+        for name in self.derived:
+            preset = self.PRESETS[name]
+            path = self.path_for(output_path, name)
+            tmp_path = path.with_name(path.name + '.tmp')
+            command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+                       '-i', str(output_path), '-map', '0:a', '-ac', '1',
+                       *preset['args'], '-f', preset['format'], str(tmp_path)]
+            try:
+                subprocess.run(command, check=True, capture_output=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                stderr = getattr(e, 'stderr', b'') or b''
+                print(f"Error encoding {path.name}: {stderr.decode('utf-8', 'replace').strip() or e}")
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return None
+            os.replace(tmp_path, path)
+            sizes[name] = path.stat().st_size
+        
+        renditions = []
+        for name in self.names:
+            path = self.path_for(output_path, name)
+            size = path.stat().st_size
+            renditions.append({
+                "name": name,
+                "file": path.name,
+                "mime": self.PRESETS[name]['mime'],
+                "size": size,
+                "bitrate": round(size * 8000 / duration_ms) if duration_ms else 0
+            })
+        
+        index_path = self.index_path_for(output_path)
+        tmp_path = index_path.with_name(index_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.INDEX_VERSION, "durationMs": duration_ms,
+                       "renditions": renditions}, f, separators=(',', ':'))
+        os.replace(tmp_path, index_path)
+        return sizes
+
+
+# ============================================================================
+# Build Manifest
+# ============================================================================
+
+class BuildManifest:
+    """
+    Record of how each MP3 in the audio directory was produced.
+    
+    For every chapter it stores the hash of the extracted verse text, the
+    voice, the rate, the output format and the size of the written file,
+    plus the sizes of any derived renditions. Comparing it with the current
+    corpus and settings tells exactly which chapters need regenerating.
+    """
+    
+    FILENAME = 'build_manifest.json'
+    VERSION = 1
+    
+    # Delta categories, in report order
+    NEW = 'new'            # No audio and no record
+    STALE = 'stale'        # Recorded, but text/voice/rate/format/renditions changed or file is missing/altered
+    ORPHANED = 'orphaned'  # Audio exists with no record of how it was built
+    CURRENT = 'current'    # Up to date
+    
+    def __init__(self, audio_dir: Path):
+        self.path = audio_dir / self.FILENAME
+        self.chapters: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        """Load the manifest from disk, starting empty if missing or invalid."""
+        if not self.path.exists():
+            return
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable build manifest {self.path}: {e}")
+            return
+        
+        if data.get('version') == self.VERSION:
+            self.chapters = data.get('chapters', {})
+    
+    def save(self):
+        """Write the manifest atomically."""
+        # Serialize whole saves: concurrent chapters share the temp file
+        with self._save_lock:
+            with self._lock:
+                data = {
+                    "version": self.VERSION,
+                    "generated": __import__('datetime').datetime.now().isoformat(),
+                    "chapters": dict(sorted(self.chapters.items()))
+                }
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+    
+    def record(self, chapter_info: Dict, text_hash: str, voice_name: str, rate: float,
+               output_format: Optional[str] = None,
+               renditions: Optional[Dict[str, int]] = None):
+        """
+        Record a freshly written chapter and persist the manifest.
+        
+        renditions maps derived rendition names to their sizes.
+        """
+        output_path = chapter_info['output_path']
+        entry = {
+            "source": chapter_info['source_path'],
+            "textHash": text_hash,
+            "voice": voice_name,
+            "rate": rate,
+            "size": output_path.stat().st_size
+        }
+        if output_format:
+            entry["outputFormat"] = output_format
+        if renditions:
+            entry["renditions"] = renditions
+        
+        with self._lock:
+            self.chapters[output_path.name] = entry
+        self.save()
+    
+    def classify(self, chapter_info: Dict, text_hash: str, voice_name: str, rate: float,
+                 output_format: Optional[str] = None,
+                 renditions: Optional[List[str]] = None) -> str:
+        """
+        Return the delta category of one chapter. renditions lists the
+        derived renditions that must exist.
+        """
+        output_path = chapter_info['output_path']
+        entry = self.chapters.get(output_path.name)
+        exists = output_path.exists()
+        
+        if entry is None:
+            return self.ORPHANED if exists else self.NEW
+        
+        if (not exists
+                or entry.get('textHash') != text_hash
+                or entry.get('voice') != voice_name
+                or entry.get('rate') != rate
+                or entry.get('outputFormat') != output_format
+                or entry.get('size') != output_path.stat().st_size):
+            return self.STALE
+        
+        recorded = entry.get('renditions', {})
+        for name in renditions or []:
+            path = RenditionEncoder.path_for(output_path, name)
+            if name not in recorded or not path.exists() or path.stat().st_size != recorded[name]:
+                return self.STALE
+        
+        return self.CURRENT
+    
+    def prune(self, all_chapters: List[Dict]) -> List[str]:
+        """Drop records for chapters no longer in the corpus. Returns their names."""
+        known = {ch['output_path'].name for ch in all_chapters}
+        with self._lock:
+            removed = sorted(name for name in self.chapters if name not in known)
+            for name in removed:
+                del self.chapters[name]
+        return removed
+
+
+# ============================================================================
+# Chunk Cache
+# ============================================================================
+
+class ChunkCache:
+    """
+    Content-addressed on-disk cache of synthesized chunk audio.
+    
+    Entries are keyed by a hash of everything that affects the audio (the
+    chunk's SSML, voice, rate and output format), so a re-run only pays for
+    chunks whose text actually changed. The cache is bounded by total size
+    and evicts least recently used entries; file mtimes record recency so
+    the order survives between runs.
+    """
+    
+    SUFFIX = '.chunk'
+    
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        
+        self._load()
+    
+    @staticmethod
+    def make_key(ssml: str, voice_name: str, rate: float, output_format: Optional[str]) -> str:
+        """Hash the inputs that determine a chunk's audio."""
+        h = hashlib.sha256()
+        for part in (ssml, voice_name, str(rate), output_format or 'default'):
+            h.update(part.encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.SUFFIX}"
+    
+    def _load(self):
+        """Index existing entries in least-recently-used order."""
+        if not self.cache_dir.exists():
+            return
+        
+        found = []
+        for path in self.cache_dir.glob(f'*/*{self.SUFFIX}'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path.stem, stat.st_size))
+        
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+    
+    def get(self, key: str) -> Optional[SynthesisResult]:
+        """Return the cached result for a key, or None."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        
+        path = self._path(key)
+        try:
+            result = SynthesisResult.from_bytes(path.read_bytes())
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, struct.error):
+            # Removed behind our back; forget it
+            with self._lock:
+                size = self._entries.pop(key, 0)
+                self._total_bytes -= size
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(result.audio_data)
+        return result
+    
+    def put(self, key: str, result: SynthesisResult):
+        """Store a result for a key, evicting old entries if over the limit."""
+        data = result.to_bytes()
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write cache entry {path}: {e}")
+            return
+        
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            evicted = self._evict()
+        
+        for old_key in evicted:
+            try:
+                self._path(old_key).unlink()
+            except OSError:
+                pass
+    
+    def _evict(self) -> List[str]:
+        """Drop oldest entries until under the size limit. Caller holds the lock."""
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(key)
+        return evicted
+    
+    def print_stats(self):
+        """Print hit rate and cache size."""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        
+        print("Chunk cache:")
+        print(f"  Hits: {self.hits}/{lookups} ({self.hits / lookups:.0%}), "
+              f"{self.bytes_saved / (1024 * 1024):.1f} MB not re-synthesized")
+        print(f"  Size: {self._total_bytes / (1024 * 1024):.1f} MB in {len(self._entries)} entries "
+              f"(limit {self.max_bytes / (1024 * 1024):.0f} MB)")
+
+
+# ============================================================================
+# Telemetry
+# ============================================================================
+
+class ChapterMetrics:
+    """
+    Phase timings and counters for one chapter.
+    
+    Phases are wall-clock seconds spent in each stage of generate_audio:
+    read, plan (chunking and SSML), synthesize (all chunks, including
+    writes), write, commit, renditions and manifest. Per-chunk records
+    add cache lookups, waiting for an endpoint slot (queue), network wait
+    (synthesis), retry sleeps (backoff) and the disk write; with
+    concurrent chunks their sums can exceed the chapter's wall time.
+    """
+    
+    def __init__(self, chapter_info: Dict, recorder: Optional['MetricsRecorder'] = None):
+        self.chapter = f"{chapter_info['book']} {chapter_info['chapter']}"
+        self.recorder = recorder
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.chunks: List[Dict] = []
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+    
+    def add_chunk(self, index: int, stats: Dict, result: Optional[SynthesisResult]):
+        """Record a finished chunk (stats come from TTSBackend._synthesize_chunk)."""
+        record = {"chunk": index}
+        for name, value in stats.items():
+            record[name] = round(value, 6) if isinstance(value, float) else value
+        if result is not None:
+            record["bytes"] = len(result.audio_data)
+            record["audioMs"] = result.duration_ms
+        self.chunks.append(record)
+        if self.recorder:
+            self.recorder.write("chunk", {"chapter": self.chapter, **record})
+    
+    def finish(self, ok: bool):
+        """Record the chapter's totals."""
+        if not self.recorder:
+            return
+        chunks = self.chunks
+        self.recorder.write("chapter", {
+            "chapter": self.chapter,
+            "ok": ok,
+            "wallSeconds": round(time.perf_counter() - self._started, 4),
+            "phases": {k: round(v, 4) for k, v in self.phases.items()},
+            "chunks": len(chunks),
+            "cachedChunks": sum(1 for c in chunks if c['cached']),
+            "chars": sum(c['chars'] for c in chunks),
+            "bytes": sum(c.get('bytes', 0) for c in chunks),
+            "audioMs": sum(c.get('audioMs', 0) for c in chunks),
+            "attempts": sum(c['attempts'] for c in chunks),
+            "retries": sum(c['retries'] for c in chunks),
+            "throttled": sum(c['throttled'] for c in chunks),
+            "backoffSeconds": round(sum(c['backoffSeconds'] for c in chunks), 4)
+        })
+
+
+class MetricsRecorder:
+    """
+    Write telemetry as JSON lines, one record per chunk and per chapter
+    (see ChapterMetrics), and keep totals for a Prometheus textfile summary.
+    
+    Lines are flushed as they are written, so a long run can be followed
+    with `tail -f`.
+    """
+    
+    PREFIX = 'bible_audio'
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.prom_path = path.with_suffix('.prom')
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._file = None
+        
+        # Totals for the summary
+        self.chapters: Dict[str, int] = defaultdict(int)
+        self.chunks: Dict[str, int] = defaultdict(int)
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.latencies: List[float] = []
+    
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.write("run", {"event": "start", "pid": os.getpid()})
+    
+    def write(self, kind: str, record: Dict):
+        """Append one record and update the totals."""
+        line = json.dumps({"type": kind, "time": round(time.time(), 3), **record},
+                          separators=(',', ':'))
+        with self._lock:
+            if kind == "chunk":
+                self.chunks["cache" if record['cached'] else "service"] += 1
+                self.totals['chars'] += record['chars']
+                self.totals['bytes'] += record.get('bytes', 0)
+                self.totals['audio_seconds'] += record.get('audioMs', 0) / 1000
+                self.totals['retries'] += record['retries']
+                self.totals['throttled'] += record['throttled']
+                for phase in ('cache', 'queue', 'synthesis', 'backoff', 'write'):
+                    self.phases['chunk_' + phase] += record[phase + 'Seconds']
+                if not record['cached']:
+                    self.latencies.append(record['synthesisSeconds'] + record['backoffSeconds'])
+            elif kind == "chapter":
+                self.chapters["ok" if record['ok'] else "failed"] += 1
+                for phase, seconds in record['phases'].items():
+                    self.phases[phase] += seconds
+            
+            if self._file:
+                self._file.write(line + '\n')
+                self._file.flush()
+    
+    def close(self):
+        """Finish the JSONL file and write the Prometheus summary."""
+        self.write("run", {"event": "end", "seconds": round(time.perf_counter() - self._started, 3)})
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        self.write_prometheus()
+    
+    @staticmethod
+    def _number(value: float) -> str:
+        """Format a sample without exponent notation (which loses precision)."""
+        return f"{value:.6f}".rstrip('0').rstrip('.')
+    
+    def write_prometheus(self):
+        """Write totals in the node_exporter textfile format, atomically."""
+        p = self.PREFIX
+        lines = []
+        
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{p}_{name}{labels} {self._number(value)}")
+        
+        with self._lock:
+            metric('chapters_total', 'counter', 'Chapters processed, by outcome.',
+                   [(f'{{status="{k}"}}', self.chapters[k]) for k in ('ok', 'failed')])
+            metric('chunks_total', 'counter', 'Chunks written, by where the audio came from.',
+                   [(f'{{source="{k}"}}', self.chunks[k]) for k in ('service', 'cache')])
+            metric('chars_total', 'counter', 'SSML characters in written chunks.',
+                   [('', self.totals['chars'])])
+            metric('bytes_written_total', 'counter', 'Audio bytes written.',
+                   [('', self.totals['bytes'])])
+            metric('audio_seconds_total', 'counter', 'Seconds of audio written.',
+                   [('', self.totals['audio_seconds'])])
+            metric('retries_total', 'counter', 'Synthesis requests retried.',
+                   [('', self.totals['retries'])])
+            metric('throttled_total', 'counter', 'Synthesis requests throttled.',
+                   [('', self.totals['throttled'])])
+            metric('phase_seconds_total', 'counter', 'Seconds spent per pipeline phase.',
+                   [(f'{{phase="{k}"}}', v) for k, v in sorted(self.phases.items())])
+            
+            latencies = sorted(self.latencies)
+            samples = [(f'{{quantile="{q}"}}', percentile(latencies, q * 100))
+                       for q in (0.5, 0.9, 0.99)] if latencies else []
+            metric('chunk_latency_seconds', 'summary',
+                   'Synthesis latency per chunk, including retries.', samples)
+            lines.append(f"{p}_chunk_latency_seconds_sum {self._number(sum(latencies))}")
+            lines.append(f"{p}_chunk_latency_seconds_count {len(latencies)}")
+            
+            metric('run_seconds', 'gauge', 'Duration of the last run.',
+                   [('', time.perf_counter() - self._started)])
+            metric('last_run_timestamp_seconds', 'gauge', 'When the last run finished.',
+                   [('', time.time())])
+        
+        tmp_path = self.prom_path.with_name(self.prom_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.prom_path)
+
+
+class RunProfiler:
+    """
+    cProfile over a whole run, worker threads included.
+    
+    Before Python 3.12, cProfile only sees the thread that enabled it, so a
+    thread profile hook starts a separate profiler in each new thread; the
+    results are merged for the report. From 3.12, cProfile is built on
+    sys.monitoring, which allows one active profiler per interpreter, so
+    only the main thread's profiler is started.
+    """
+    
+    PER_THREAD = sys.version_info < (3, 12)
+    
+    def __init__(self):
+        self.profiles = [cProfile.Profile()]
+        self._lock = threading.Lock()
+    
+    def _start_thread(self, frame, event, arg):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        # Replaces this hook for the rest of the thread
+        profile.enable()
+    
+    def start(self):
+        if self.PER_THREAD:
+            threading.setprofile(self._start_thread)
+        self.profiles[0].enable()
+    
+    def stop(self):
+        self.profiles[0].disable()
+        if self.PER_THREAD:
+            threading.setprofile(None)
+    
+    def report(self, limit: int = 25, path: Optional[str] = None):
+        """Print the hottest functions; optionally dump the stats for other tools."""
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        
+        if path:
+            stats.dump_stats(path)
+            print(f"Profile written to {path} (open with snakeviz or pstats)")
+        
+        print(f"\n{'='*60}")
+        threads = f"{len(self.profiles)} threads" if self.PER_THREAD else "one profiler"
+        print(f"Profile: top {limit} by cumulative time ({threads})")
+        print(f"{'='*60}")
+        stats.sort_stats('cumulative').print_stats(limit)
+        print(f"Profile: top {limit} by own time")
+        stats.sort_stats('tottime').print_stats(limit)
+
+
+# ============================================================================
+# Endpoint Pool
+# ============================================================================
+
+class SynthesisError(Exception):
+    """
+    A failed synthesis request, classified by what a retry can do about it.
+    """
+    
+    THROTTLED = 'throttled'  # Too many requests; back off and send fewer at once
+    TRANSIENT = 'transient'  # Timeouts, connection or service errors; retry
+    FATAL = 'fatal'          # Bad request or credentials; retrying won't help
+    
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+class Endpoint:
+    """
+    One speech resource requests can be sent to: a subscription key with its
+    region (or the host of a local container) and how many requests it may
+    have in flight at once.
+    """
+    
+    def __init__(self, name: str, key: str = '', region: str = '',
+                 max_concurrency: int = 1, host: Optional[str] = None,
+                 options: Optional[Dict] = None):
+        self.name = name
+        self.key = key
+        self.region = region
+        self.host = host
+        self.max_concurrency = max(1, max_concurrency)
+        self.options = options or {}  # Backend-specific settings (see FakeTTSBackend)
+        
+        # Scheduling state (guarded by the owning EndpointPool)
+        self.in_flight = 0
+        self.limit = float(self.max_concurrency)  # Adaptive concurrency (AIMD)
+        self.last_decrease = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        
+        # Statistics
+        self.requests = 0
+        self.failures = 0
+        self.throttled = 0
+        self.min_limit = self.limit
+        self.chars = 0
+        self.audio_ms = 0
+        self.busy_seconds = 0.0
+    
+    @classmethod
+    def load(cls, path: Path) -> List['Endpoint']:
+        """
+        Load endpoints from a JSON file: a list of objects with "region" (or
+        "host"), "key" (or "keyEnv", naming an environment variable that
+        holds it), "maxConcurrency" and an optional "name". Other fields
+        are kept as backend options.
+        
+        Raises ValueError if the file is malformed.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if not isinstance(entries, list) or not entries:
+            raise ValueError(f"{path}: expected a non-empty list of endpoints")
+        
+        endpoints = []
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not (entry.get('region') or entry.get('host')):
+                raise ValueError(f"{path}: endpoint {i + 1} needs a region or host")
+            
+            key = entry.get('key', '')
+            if entry.get('keyEnv'):
+                key = os.getenv(entry['keyEnv'], '')
+            
+            known = {'name', 'key', 'keyEnv', 'region', 'host', 'maxConcurrency'}
+            endpoints.append(cls(
+                name=entry.get('name') or entry.get('region') or entry['host'],
+                key=key,
+                region=entry.get('region', ''),
+                max_concurrency=int(entry.get('maxConcurrency', 1)),
+                host=entry.get('host'),
+                options={k: v for k, v in entry.items() if k not in known}
+            ))
+        
+        names = [e.name for e in endpoints]
+        if len(set(names)) != len(names):
+            raise ValueError(f"{path}: endpoint names must be unique")
+        return endpoints
+
+
+class EndpointPool:
+    """
+    Spread requests over several endpoints.
+    
+    Each request goes to the endpoint with the most free request slots
+    (its concurrency limit minus requests in flight), so endpoints fill in
+    proportion to their quotas. An endpoint whose request fails with a
+    transient error is cooled down for 1s, then 2s, 4s ... up to a minute
+    while it keeps failing. Cooling endpoints are only used when nothing
+    else is left.
+    
+    Each endpoint's concurrency limit adapts to throttling (AIMD): every
+    successful request raises it by 1/limit, about one slot per round of
+    requests, up to its quota; a throttled request halves it, at most once
+    per DECREASE_INTERVAL so a burst of rejections counts once. The pool
+    settles on the highest rate the service accepts.
+    """
+    
+    MAX_COOLDOWN_SECONDS = 60
+    DECREASE_INTERVAL = 1.0
+    
+    def __init__(self, endpoints: List[Endpoint]):
+        self.endpoints = endpoints
+        self.failovers = 0
+        self.retries = 0
+        self._cond = threading.Condition()
+        self._started = time.perf_counter()
+    
+    @property
+    def capacity(self) -> int:
+        """Total requests that may be in flight across all endpoints."""
+        return sum(e.max_concurrency for e in self.endpoints)
+    
+    def acquire(self, exclude: Optional[List[Endpoint]] = None) -> Optional[Endpoint]:
+        """
+        Reserve a request slot, waiting for one to free up if necessary.
+        
+        Endpoints in `exclude` (already tried for this request) are skipped;
+        returns None once every endpoint has been excluded.
+        """
+        exclude = exclude or []
+        with self._cond:
+            while True:
+                candidates = [e for e in self.endpoints if e not in exclude]
+                if not candidates:
+                    return None
+                
+                now = time.monotonic()
+                free = [e for e in candidates if e.in_flight < int(e.limit)]
+                ready = [e for e in free if e.cooldown_until <= now]
+                if not ready and free and all(e.cooldown_until > now for e in candidates):
+                    # Everything left is cooling down; probe the one due back first
+                    ready = [min(free, key=lambda e: e.cooldown_until)]
+                
+                if ready:
+                    endpoint = max(ready, key=lambda e: (int(e.limit) - e.in_flight,
+                                                         -e.requests))
+                    endpoint.in_flight += 1
+                    return endpoint
+                
+                self._cond.wait(timeout=1.0)
+    
+    def release(self, endpoint: Endpoint, error: Optional[str], seconds: float,
+                chars: int = 0, audio_ms: int = 0):
+        """
+        Return a request slot and record how the request went: error is
+        None on success, else a SynthesisError kind.
+        """
+        with self._cond:
+            # Whether this request was one of a full set of slots
+            saturated = endpoint.in_flight >= int(endpoint.limit)
+            endpoint.in_flight -= 1
+            endpoint.requests += 1
+            endpoint.busy_seconds += seconds
+            now = time.monotonic()
+            
+            if error is None:
+                endpoint.chars += chars
+                endpoint.audio_ms += audio_ms
+                endpoint.consecutive_failures = 0
+                endpoint.cooldown_until = 0.0
+                # Additive increase only when the limit was actually reached;
+                # a limit raised while idle has never been tested
+                if saturated:
+                    endpoint.limit = min(float(endpoint.max_concurrency),
+                                         endpoint.limit + 1 / endpoint.limit)
+            elif error == SynthesisError.THROTTLED:
+                endpoint.failures += 1
+                endpoint.throttled += 1
+                if now - endpoint.last_decrease >= self.DECREASE_INTERVAL:
+                    endpoint.limit = max(1.0, endpoint.limit / 2)
+                    endpoint.min_limit = min(endpoint.min_limit, endpoint.limit)
+                    endpoint.last_decrease = now
+            else:
+                endpoint.failures += 1
+                if error == SynthesisError.TRANSIENT:
+                    endpoint.consecutive_failures += 1
+                    cooldown = min(self.MAX_COOLDOWN_SECONDS,
+                                   2 ** (endpoint.consecutive_failures - 1))
+                    endpoint.cooldown_until = now + cooldown
+            self._cond.notify_all()
+    
+    def record_failover(self):
+        with self._cond:
+            self.failovers += 1
+    
+    def record_retry(self):
+        with self._cond:
+            self.retries += 1
+    
+    @property
+    def throttled(self) -> int:
+        return sum(e.throttled for e in self.endpoints)
+    
+    def print_stats(self):
+        """Print per-endpoint throughput."""
+        if not any(e.requests for e in self.endpoints):
+            return
+        
+        elapsed = time.perf_counter() - self._started
+        print("Endpoints:")
+        print(f"  {'Name':<16} {'Quota':>5} {'Limit':>9} {'Requests':>8} {'Failed':>6} "
+              f"{'Throttled':>9} {'Share':>6} {'Chars/s':>8} {'Audio min':>9}")
+        total = sum(e.requests - e.failures for e in self.endpoints) or 1
+        for e in self.endpoints:
+            share = (e.requests - e.failures) / total
+            rate = e.chars / elapsed if elapsed else 0
+            # Final adaptive limit, and the lowest it fell to
+            limit = f"{e.limit:.1f}/{e.min_limit:.0f}"
+            print(f"  {e.name:<16} {e.max_concurrency:>5} {limit:>9} {e.requests:>8} "
+                  f"{e.failures:>6} {e.throttled:>9} {share:>6.1%} {rate:>8.0f} "
+                  f"{e.audio_ms / 60000:>9.1f}")
+        if self.retries:
+            print(f"  Retried {self.retries} time(s), {self.failovers} on another endpoint")
+
+
+# ============================================================================
+# TTS Backend Interface
+# ============================================================================
+
+class TTSBackend:
+    """
+    Base class for speech synthesis backends.
+    
+    Subclasses implement initialize() and synthesize_on(); chunk
+    preparation, caching, routing requests across endpoints and ordered,
+    optionally concurrent, delivery to a ChapterWriter are shared here so
+    every backend runs the same pipeline.
+    """
+    
+    name = ''
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.cache: Optional[ChunkCache] = None
+        if config.cache_dir:
+            self.cache = ChunkCache(config.cache_dir, config.cache_max_bytes)
+        
+        # Wall-clock seconds per synthesized (non-cached) chunk
+        self.chunk_latencies: List[float] = []
+        self._latency_lock = threading.Lock()
+        
+        self.endpoints: Optional[EndpointPool] = None
+    
+    def initialize(self) -> bool:
+        """Prepare the backend for synthesis. Returns False if unusable."""
+        raise NotImplementedError
+    
+    def default_endpoint(self) -> Endpoint:
+        """The endpoint used when no endpoints file is configured."""
+        return Endpoint(self.name, max_concurrency=self.config.workers)
+    
+    def load_endpoints(self) -> bool:
+        """
+        Set up the endpoint pool from the configured endpoints file, or the
+        backend's default endpoint. Returns False if the file is unusable.
+        """
+        if self.config.endpoints_path:
+            try:
+                endpoints = Endpoint.load(self.config.endpoints_path)
+            except (OSError, ValueError) as e:
+                print(f"Error loading endpoints: {e}")
+                return False
+        else:
+            endpoints = [self.default_endpoint()]
+        
+        self.endpoints = EndpointPool(endpoints)
+        return True
+    
+    def synthesize_on(self, endpoint: Endpoint, ssml: str,
+                      voice_name: str) -> SynthesisResult:
+        """
+        Synthesize one SSML document on an endpoint.
+        
+        Raises SynthesisError if the service rejects or fails the request.
+        """
+        raise NotImplementedError
+    
+    def backoff_delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (1-based), with jitter."""
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * 2 ** (attempt - 1))
+        # Half fixed, half random, so simultaneous failures don't retry in lockstep
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+    
+    def synthesize(self, ssml: str, voice_name: str,
+                   stats: Optional[Dict] = None) -> Optional[SynthesisResult]:
+        """
+        Synthesize one SSML document, retrying failures.
+        
+        Throttled requests are retried after a jittered exponential backoff
+        (and lower the endpoint's concurrency, see EndpointPool). Transient
+        errors move to another endpoint if one is left untried, otherwise
+        back off as well. Fatal errors are not retried.
+        
+        If a stats dict is given, attempts, retries, throttled responses,
+        the endpoint used and seconds spent queueing for a slot, waiting
+        on the service and backing off are added to it.
+        
+        Returns None if the request failed for good.
+        """
+        if self.endpoints is None and not self.initialize():
+            return None
+        
+        if stats is None:
+            stats = {}
+        for name in ('attempts', 'retries', 'throttled'):
+            stats.setdefault(name, 0)
+        for name in ('queueSeconds', 'synthesisSeconds', 'backoffSeconds'):
+            stats.setdefault(name, 0.0)
+        
+        attempt = 0
+        failed: List[Endpoint] = []  # Endpoints with a transient error on this request
+        while True:
+            queued = time.perf_counter()
+            endpoint = self.endpoints.acquire(exclude=failed)
+            stats['queueSeconds'] += time.perf_counter() - queued
+            stats['endpoint'] = endpoint.name
+            stats['attempts'] += 1
+            
+            start = time.perf_counter()
+            try:
+                result = self.synthesize_on(endpoint, ssml, voice_name)
+                error = None
+            except SynthesisError as e:
+                result, error, message = None, e.kind, str(e)
+            except Exception as e:
+                result, error, message = None, SynthesisError.TRANSIENT, str(e)
+            elapsed = time.perf_counter() - start
+            stats['synthesisSeconds'] += elapsed
+            self.endpoints.release(endpoint, error, elapsed,
+                                   chars=len(ssml), audio_ms=result.duration_ms if result else 0)
+            
+            if error is None:
+                return result
+            if error == SynthesisError.THROTTLED:
+                stats['throttled'] += 1
+            
+            if error == SynthesisError.FATAL:
+                print(f"Synthesis failed on {endpoint.name}: {message}")
+                return None
+            
+            attempt += 1
+            if attempt > self.config.max_retries:
+                print(f"Synthesis failed on {endpoint.name} after {attempt} attempts: {message}")
+                return None
+            self.endpoints.record_retry()
+            stats['retries'] += 1
+            
+            if error == SynthesisError.TRANSIENT:
+                failed.append(endpoint)
+                if len(failed) < len(self.endpoints.endpoints):
+                    self.endpoints.record_failover()
+                    print(f"Transient error on {endpoint.name} ({message}); "
+                          f"retrying on another endpoint")
+                    continue
+                failed = []
+            
+            delay = self.backoff_delay(attempt)
+            print(f"{error.capitalize()} on {endpoint.name} ({message}); "
+                  f"retry {attempt}/{self.config.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            stats['backoffSeconds'] += delay
+    
+    def list_voices(self) -> List[Dict]:
+        """List available voices (dicts with ShortName, Gender, Locale, VoiceType)."""
+        return []
+    
+    def warm_up(self, voice_name: str):
+        """Prepare connections for a voice before a run starts."""
+    
+    def close(self):
+        """Release any resources held by the backend."""
+    
+    def print_stats(self):
+        """Print end-of-run statistics."""
+        if self.endpoints and (len(self.endpoints.endpoints) > 1 or self.endpoints.retries):
+            self.endpoints.print_stats()
+        if self.cache:
+            self.cache.print_stats()
+    
+    def prepare_chunks(self, chunks: List[List[Tuple[int, str]]], voice_name: str,
+                       rate: float = 0.9) -> List[Tuple[str, str]]:
+        """
+        Build the SSML for each chunk of verses (see
+        TextProcessor.split_verses_into_segments) along with its content key.
+        
+        The key (see ChunkCache.make_key) identifies the chunk's audio and is
+        used both for the chunk cache and for chapter checkpoints.
         
-        return {
-            'path': self.config.base_dir / file_path,
-            'book': book_from_filename,
-            'chapter': chapter_num,
-            'output_path': output_path,
-            'source_path': file_path
-        }
+        Returns list of (ssml, key).
+        """
+        prepared = []
+        previous_verse = None
+        for segments in chunks:
+            ssml = TextProcessor.generate_ssml_for_segments(segments, voice_name, rate,
+                                                            previous_verse=previous_verse)
+            previous_verse = segments[-1][0]
+            key = ChunkCache.make_key(ssml, voice_name, rate, self.config.output_format)
+            prepared.append((ssml, key))
+        return prepared
     
-    def _scan_bibles_directory(self) -> List[Dict]:
-        """Fallback method to scan bibles directory directly."""
-        chapters = []
+    def synthesize_chunks(self, chunks: List[Tuple[str, str]], voice_name: str,
+                          writer: ChapterWriter,
+                          executor: Optional[Executor] = None,
+                          metrics: Optional[ChapterMetrics] = None) -> bool:
+        """
+        Synthesize prepared chunks (see prepare_chunks) and stream the audio
+        to a chapter writer in chunk order, starting after the chunks the
+        writer already has.
         
-        if not self.config.bibles_dir.exists():
-            return chapters
+        When an executor is given, chunks are synthesized concurrently on it;
+        they are still written in order. Each chunk is recorded in metrics,
+        if given.
         
-        for book_dir in self.config.bibles_dir.rglob('BER-*'):
-            if not book_dir.is_dir():
-                continue
+        Returns True if every chunk was written.
+        """
+        if executor is not None:
+            return self._synthesize_chunks_concurrent(chunks, voice_name, writer, executor, metrics)
+        
+        for i in range(writer.completed, len(chunks)):
+            ssml, key = chunks[i]
+            result, stats = self._synthesize_chunk(ssml, key, voice_name)
             
-            for chapter_file in book_dir.glob('*.md'):
-                chapter_info = self._parse_chapter_path(str(chapter_file.relative_to(self.config.base_dir)))
-                if chapter_info:
-                    chapters.append(chapter_info)
+            if result is None:
+                print(f"Failed to synthesize chunk {i+1}/{len(chunks)}")
+                if metrics:
+                    metrics.add_chunk(i, stats, None)
+                return False
+            
+            self._write_chunk(writer, i, result, stats, metrics)
         
-        return chapters
+        return True
     
-    def filter_chapters(self, chapters: List[Dict], 
-                        book: Optional[str] = None,
-                        chapter: Optional[int] = None,
-                        skip_existing: bool = True) -> List[Dict]:
+    def _write_chunk(self, writer: ChapterWriter, index: int, result: SynthesisResult,
+                     stats: Dict, metrics: Optional[ChapterMetrics]):
+        """Write a chunk to the chapter, timing the write for the metrics."""
+        start = time.perf_counter()
+        writer.write_chunk(index, result)
+        stats['writeSeconds'] = time.perf_counter() - start
+        if metrics:
+            metrics.add_chunk(index, stats, result)
+    
+    def _synthesize_chunk(self, ssml: str, key: str,
+                          voice_name: str) -> Tuple[Optional[SynthesisResult], Dict]:
         """
-        Filter chapters based on criteria.
+        Synthesize one chunk, going through the chunk cache if enabled.
+        
+        Returns (result, stats), where stats describes how the chunk was
+        obtained (see synthesize; plus cached, chars and cacheSeconds).
         """
-        filtered = []
+        stats = {'cached': False, 'chars': len(ssml), 'attempts': 0, 'retries': 0,
+                 'throttled': 0, 'cacheSeconds': 0.0, 'queueSeconds': 0.0,
+                 'synthesisSeconds': 0.0, 'backoffSeconds': 0.0, 'writeSeconds': 0.0}
+        
+        if self.cache:
+            start = time.perf_counter()
+            result = self.cache.get(key)
+            stats['cacheSeconds'] += time.perf_counter() - start
+            if result is not None:
+                stats['cached'] = True
+                return result, stats
+        
+        start = time.perf_counter()
+        result = self.synthesize(ssml, voice_name, stats)
+        with self._latency_lock:
+            self.chunk_latencies.append(time.perf_counter() - start)
+        
+        if result is not None and self.cache:
+            start = time.perf_counter()
+            self.cache.put(key, result)
+            stats['cacheSeconds'] += time.perf_counter() - start
+        
+        return result, stats
+    
+    def _synthesize_chunks_concurrent(self, chunks: List[Tuple[str, str]], voice_name: str,
+                                      writer: ChapterWriter, executor: Executor,
+                                      metrics: Optional[ChapterMetrics] = None) -> bool:
+        """
+        Synthesize chunks on a shared executor, writing them in order.
         
-        for ch in chapters:
-            # Filter by book
-            if book and ch['book'].lower() != book.lower():
-                continue
+        At most `workers` chunks of the chapter are in flight or waiting to be
+        written, so memory stays bounded however long the chapter is.
+        """
+        window = max(1, self.config.workers)
+        pending: Dict[int, Future] = {}
+        next_submit = writer.completed
+        
+        def fill():
+            nonlocal next_submit
+            while next_submit < len(chunks) and len(pending) < window:
+                ssml, key = chunks[next_submit]
+                pending[next_submit] = executor.submit(self._synthesize_chunk, ssml, key, voice_name)
+                next_submit += 1
+        
+        fill()
+        for i in range(writer.completed, len(chunks)):
+            future = pending.pop(i)
+            try:
+                result, stats = future.result()
+            except Exception as e:
+                print(f"Error synthesizing chunk {i+1}/{len(chunks)}: {e}")
+                result, stats = None, None
             
-            # Filter by chapter number
-            if chapter is not None and ch['chapter'] != chapter:
-                continue
+            if result is None:
+                print(f"Failed to synthesize chunk {i+1}/{len(chunks)}")
+                if metrics and stats:
+                    metrics.add_chunk(i, stats, None)
+                # Drop chunks that have not started yet; they would be discarded anyway
+                for other in pending.values():
+                    other.cancel()
+                return False
             
-            # Skip existing files
-            if skip_existing and ch['output_path'].exists():
+            self._write_chunk(writer, i, result, stats, metrics)
+            fill()
+        
+        return True
+
+
+# ============================================================================
+# Synthesizer Pool
+# ============================================================================
+
+class PooledSynthesizer:
+    """A long-lived SpeechSynthesizer bound to one voice, with its connection."""
+    
+    def __init__(self, voice_name: str, synthesizer, connection):
+        self.voice_name = voice_name
+        self.synthesizer = synthesizer
+        self.connection = connection
+        self.healthy = True
+        self.uses = 0
+        self.bookmarks: List[Tuple[int, int]] = []  # Reached during the current request
+        
+        synthesizer.bookmark_reached.connect(self._on_bookmark)
+    
+    def _on_bookmark(self, evt):
+        """Record verse bookmarks ("v<number>"); audio_offset is in 100ns ticks."""
+        if evt.text and evt.text.startswith('v') and evt.text[1:].isdigit():
+            self.bookmarks.append((int(evt.text[1:]), evt.audio_offset // 10000))
+    
+    def close(self):
+        """Close the underlying connection, ignoring SDK errors."""
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class SynthesizerPool:
+    """
+    Pool of long-lived synthesizers for one endpoint, keyed by voice.
+    
+    Each voice gets its own SpeechConfig, so no shared state is mutated per
+    request. Synthesizers are checked out for exclusive use and returned
+    afterwards; any synthesizer whose request failed is evicted and replaced
+    on the next checkout. At most `max_per_voice` synthesizers exist per voice.
+    
+    Connection setup time (synthesizer creation plus connection open) is
+    tracked separately from synthesis time so the savings of reuse are visible.
+    """
+    
+    def __init__(self, endpoint: Endpoint, max_per_voice: int = 1,
+                 output_format: Optional[str] = None):
+        self.endpoint = endpoint
+        self.output_format = output_format
+        self.max_per_voice = max(1, max_per_voice)
+        self._idle: Dict[str, List[PooledSynthesizer]] = defaultdict(list)
+        self._created: Dict[str, int] = defaultdict(int)
+        self._cond = threading.Condition()
+        
+        # Statistics
+        self.connections_opened = 0
+        self.evictions = 0
+        self.requests = 0
+        self.connect_seconds = 0.0
+        self.synthesis_seconds = 0.0
+    
+    def _create(self, voice_name: str) -> PooledSynthesizer:
+        """Create a synthesizer for a voice and open its connection."""
+        start = time.perf_counter()
+        
+        speech_config = AzureTTSClient.make_speech_config(self.endpoint, self.output_format)
+        speech_config.speech_synthesis_voice_name = voice_name
+        
+        # No audio output (we want raw data)
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config,
+            audio_config=None
+        )
+        
+        # Open the connection up front so the first request doesn't pay for it
+        connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        connection.open(True)
+        
+        elapsed = time.perf_counter() - start
+        with self._cond:
+            self.connections_opened += 1
+            self.connect_seconds += elapsed
+        
+        return PooledSynthesizer(voice_name, synthesizer, connection)
+    
+    def warm(self, voice_name: str, count: Optional[int] = None):
+        """Pre-create and connect synthesizers for a voice."""
+        count = min(count or self.max_per_voice, self.max_per_voice)
+        
+        with self._cond:
+            needed = count - self._created[voice_name]
+            self._created[voice_name] += max(0, needed)
+        
+        for _ in range(max(0, needed)):
+            try:
+                entry = self._create(voice_name)
+            except Exception as e:
+                print(f"Warning: could not pre-warm synthesizer for {voice_name}: {e}")
+                with self._cond:
+                    self._created[voice_name] -= 1
+                    self._cond.notify()
                 continue
-            
-            filtered.append(ch)
+            self._release(entry)
+    
+    def _acquire(self, voice_name: str) -> PooledSynthesizer:
+        """Take an idle synthesizer, creating one if under the limit."""
+        with self._cond:
+            while True:
+                if self._idle[voice_name]:
+                    return self._idle[voice_name].pop()
+                if self._created[voice_name] < self.max_per_voice:
+                    # Reserve the slot, then connect outside the lock
+                    self._created[voice_name] += 1
+                    break
+                self._cond.wait()
         
-        return filtered
+        try:
+            return self._create(voice_name)
+        except Exception:
+            with self._cond:
+                self._created[voice_name] -= 1
+                self._cond.notify()
+            raise
+    
+    def _release(self, entry: PooledSynthesizer):
+        """Return a synthesizer to the pool, evicting it if unhealthy."""
+        with self._cond:
+            if entry.healthy:
+                self._idle[entry.voice_name].append(entry)
+            else:
+                self._created[entry.voice_name] -= 1
+                self.evictions += 1
+            self._cond.notify()
+        
+        if not entry.healthy:
+            entry.close()
+    
+    @contextmanager
+    def checkout(self, voice_name: str) -> Iterator[PooledSynthesizer]:
+        """
+        Check out a synthesizer for exclusive use.
+        
+        Set `entry.healthy = False` to evict it on return; an exception
+        raised inside the block evicts it as well.
+        """
+        entry = self._acquire(voice_name)
+        try:
+            yield entry
+        except Exception:
+            entry.healthy = False
+            raise
+        finally:
+            entry.uses += 1
+            self._release(entry)
+    
+    def record_synthesis(self, seconds: float):
+        """Account time spent waiting on a synthesis request."""
+        with self._cond:
+            self.requests += 1
+            self.synthesis_seconds += seconds
+    
+    def close(self):
+        """Close all idle synthesizers."""
+        with self._cond:
+            entries = [e for idle in self._idle.values() for e in idle]
+            self._idle.clear()
+            self._created.clear()
+        
+        for entry in entries:
+            entry.close()
+    
+    def print_stats(self):
+        """Print connection setup vs synthesis timing."""
+        if not self.requests:
+            return
+        
+        print(f"Synthesizer pool ({self.endpoint.name}):")
+        print(f"  Requests: {self.requests} over {self.connections_opened} connections "
+              f"({self.evictions} evicted)")
+        print(f"  Connection setup: {self.connect_seconds:.1f}s total, "
+              f"{self.connect_seconds / max(1, self.connections_opened) * 1000:.0f}ms each")
+        print(f"  Synthesis: {self.synthesis_seconds:.1f}s total, "
+              f"{self.synthesis_seconds / self.requests * 1000:.0f}ms per request")
 
 
 # ============================================================================
 # Azure TTS Client
 # ============================================================================
 
-class AzureTTSClient:
+class AzureTTSClient(TTSBackend):
     """Wrapper for Azure Cognitive Services TTS."""
     
+    name = 'azure'
+    
     def __init__(self, config: Config):
-        self.config = config
+        super().__init__(config)
         self.speech_config = None
+        self.pools: Dict[str, SynthesizerPool] = {}
+    
+    @classmethod
+    def make_speech_config(cls, endpoint: Endpoint, output_format: Optional[str] = None):
+        """
+        SpeechConfig for an endpoint (a region, or the host of a local
+        container), producing the named SpeechSynthesisOutputFormat.
+        """
+        if endpoint.host:
+            if endpoint.key:
+                speech_config = speechsdk.SpeechConfig(subscription=endpoint.key, host=endpoint.host)
+            else:
+                speech_config = speechsdk.SpeechConfig(host=endpoint.host)
+        else:
+            speech_config = speechsdk.SpeechConfig(subscription=endpoint.key, region=endpoint.region)
         
+        if output_format:
+            speech_config.set_speech_synthesis_output_format(
+                getattr(speechsdk.SpeechSynthesisOutputFormat, output_format))
+        return speech_config
+    
+    def default_endpoint(self) -> Endpoint:
+        """The key and region from the environment or command line."""
+        return Endpoint(self.config.region, key=self.config.subscription_key,
+                        region=self.config.region, max_concurrency=self.config.workers)
+    
     def initialize(self) -> bool:
         """Initialize the Azure speech client."""
-        if not self.config.validate_credentials():
+        if speechsdk is None:
+            print("Error: azure-cognitiveservices-speech not installed.")
+            print("Install with: pip install azure-cognitiveservices-speech")
             return False
         
-        self.speech_config = speechsdk.SpeechConfig(
-            subscription=self.config.subscription_key,
-            region=self.config.region
-        )
+        if not self.config.endpoints_path and not self.config.validate_credentials():
+            return False
+        
+        if not self.load_endpoints():
+            return False
+        
+        for endpoint in self.endpoints.endpoints:
+            if not endpoint.key and not endpoint.host:
+                print(f"Error: no subscription key for endpoint {endpoint.name}")
+                return False
+        
+        output_format = self.config.output_format
+        if output_format and not hasattr(speechsdk.SpeechSynthesisOutputFormat, output_format):
+            print(f"Error: unknown output format {output_format} "
+                  f"(see SpeechSynthesisOutputFormat in the Speech SDK)")
+            return False
+        
+        self.speech_config = self.make_speech_config(self.endpoints.endpoints[0])
+        # One synthesizer per request slot, per voice, on each endpoint
+        self.pools = {e.name: SynthesizerPool(e, max_per_voice=e.max_concurrency,
+                                              output_format=output_format)
+                      for e in self.endpoints.endpoints}
         return True
     
+    def warm_up(self, voice_name: str):
+        """Open the pools' connections for a voice before the run starts."""
+        for pool in self.pools.values():
+            pool.warm(voice_name)
+    
+    def close(self):
+        """Release pooled synthesizers and their connections."""
+        for pool in self.pools.values():
+            pool.close()
+    
+    def print_stats(self):
+        """Print pool timing along with the endpoint and cache summaries."""
+        for pool in self.pools.values():
+            pool.print_stats()
+        super().print_stats()
+    
     def list_voices(self) -> List[Dict]:
         """
         List available voices from Azure TTS.
@@ -425,10 +2306,17 @@ class AzureTTSClient:
         import urllib.request
         import urllib.error
         
-        url = f"https://{self.config.region}.tts.speech.microsoft.com/cognitiveservices/voices/list"
+        # Any endpoint serves the same voices; ask the first hosted one
+        endpoint = next((e for e in self.endpoints.endpoints if e.region and e.key),
+                        self.endpoints.endpoints[0])
+        if endpoint.host:
+            url = f"{endpoint.host.replace('ws', 'http', 1).rstrip('/')}/cognitiveservices/voices/list"
+        else:
+            url = f"https://{endpoint.region}.tts.speech.microsoft.com/cognitiveservices/voices/list"
         
         req = urllib.request.Request(url)
-        req.add_header('Ocp-Apim-Subscription-Key', self.config.subscription_key)
+        if endpoint.key:
+            req.add_header('Ocp-Apim-Subscription-Key', endpoint.key)
         
         try:
             with urllib.request.urlopen(req) as response:
@@ -443,63 +2331,167 @@ class AzureTTSClient:
             print(f"Error fetching voices: {e}")
             return []
     
-    def synthesize(self, ssml: str, voice_name: str) -> Optional[bytes]:
+    @classmethod
+    def classify_cancellation(cls, cancellation) -> str:
+        """Map a cancellation to a SynthesisError kind by its error code."""
+        codes = speechsdk.CancellationErrorCode
+        code = getattr(cancellation, 'error_code', None)
+        details = getattr(cancellation, 'error_details', '') or ''
+        
+        if code == codes.TooManyRequests or '429' in details:
+            return SynthesisError.THROTTLED
+        if code in (codes.AuthenticationFailure, codes.BadRequest, codes.Forbidden):
+            return SynthesisError.FATAL
+        # Connection failures, timeouts, service errors, and anything unknown
+        return SynthesisError.TRANSIENT
+    
+    def synthesize_on(self, endpoint: Endpoint, ssml: str,
+                      voice_name: str) -> SynthesisResult:
         """
-        Synthesize speech from SSML.
+        Synthesize speech from SSML on one endpoint.
         
-        Returns audio data as bytes, or None on failure.
+        Returns the audio with any verse bookmarks reached. Raises
+        SynthesisError if the request is canceled.
         """
-        if not self.speech_config:
-            if not self.initialize():
-                return None
-        
-        self.speech_config.speech_synthesis_voice_name = voice_name
-        
-        # Create synthesizer with no audio output (we want raw data)
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=self.speech_config,
-            audio_config=None
-        )
-        
-        # Synthesize
-        result = synthesizer.speak_ssml_async(ssml).get()
+        pool = self.pools[endpoint.name]
+        with pool.checkout(voice_name) as entry:
+            entry.bookmarks = []
+            start = time.perf_counter()
+            result = entry.synthesizer.speak_ssml_async(ssml).get()
+            pool.record_synthesis(time.perf_counter() - start)
+            bookmarks = entry.bookmarks
+            
+            # A failed request may leave the connection in a bad state
+            if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                entry.healthy = False
         
         if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            return result.audio_data
+            duration = getattr(result, 'audio_duration', None)
+            duration_ms = int(duration.total_seconds() * 1000) if duration else 0
+            return SynthesisResult(result.audio_data, duration_ms, bookmarks)
         elif result.reason == speechsdk.ResultReason.Canceled:
             cancellation = result.cancellation_details
-            print(f"Synthesis canceled: {cancellation.reason}")
+            message = f"canceled: {cancellation.reason}"
             if cancellation.reason == speechsdk.CancellationReason.Error:
-                print(f"Error details: {cancellation.error_details}")
-            return None
+                message += f" ({cancellation.error_details})"
+            raise SynthesisError(self.classify_cancellation(cancellation), message)
         else:
-            print(f"Unexpected result: {result.reason}")
-            return None
+            raise SynthesisError(SynthesisError.TRANSIENT, f"unexpected result: {result.reason}")
+
+
+# ============================================================================
+# Fake TTS Backend
+# ============================================================================
+
+class FakeTTSBackend(TTSBackend):
+    """
+    Local, deterministic stand-in for a TTS service.
     
-    def synthesize_chunks(self, chunks: List[str], voice_name: str, rate: float = 0.9) -> Optional[bytes]:
-        """
-        Synthesize multiple text chunks and concatenate the audio.
-        
-        Returns concatenated audio data as bytes, or None on failure.
-        """
-        audio_parts = []
+    Returns synthetic audio sized like real constant-bitrate speech, with
+    verse bookmarks at plausible offsets, after a configurable latency.
+    Requests can be made to fail as throttled or errored at given rates,
+    and a capacity makes it throttle requests beyond that many in flight,
+    like a service enforcing a concurrency quota. Outcomes are derived from
+    a seed and the request content (plus the endpoint and attempt number,
+    so retries can succeed), so runs are reproducible.
+    
+    With an endpoints file, each endpoint can override the latency,
+    failure rates and capacity ("latencyMs", "throttleRate", "errorRate",
+    "capacity"), standing in for a slow, failing or busy region.
+    """
+    
+    name = 'fake'
+    
+    MS_PER_CHAR = 60       # ~16 characters of speech per second
+    BYTES_PER_MS = 6       # 48 kbit/s
+    BOOKMARK_PATTERN = re.compile(r'<bookmark mark="([^"]+)"/>')
+    TAG_PATTERN = re.compile(r'<[^>]+>')
+    
+    VOICES = [
+        {'ShortName': 'en-US-FakeNeural', 'Gender': 'Female', 'Locale': 'en-US', 'VoiceType': 'Fake'},
+        {'ShortName': 'en-GB-FakeNeural', 'Gender': 'Male', 'Locale': 'en-GB', 'VoiceType': 'Fake'},
+    ]
+    
+    def __init__(self, config: Config):
+        super().__init__(config)
+        self.latency_ms = config.fake_latency_ms
+        self.throttle_rate = config.fake_throttle_rate
+        self.error_rate = config.fake_error_rate
+        self.seed = config.fake_seed
+        self.capacity = config.fake_capacity
+        self._attempts: Dict[Tuple[str, bytes], int] = defaultdict(int)
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def initialize(self) -> bool:
+        return self.load_endpoints()
+    
+    def list_voices(self) -> List[Dict]:
+        return list(self.VOICES)
+    
+    def synthesize_on(self, endpoint: Endpoint, ssml: str,
+                      voice_name: str) -> SynthesisResult:
+        """Simulate a synthesis request on an endpoint."""
+        latency_ms = endpoint.options.get('latencyMs', self.latency_ms)
+        throttle_rate = endpoint.options.get('throttleRate', self.throttle_rate)
+        error_rate = endpoint.options.get('errorRate', self.error_rate)
+        capacity = endpoint.options.get('capacity', self.capacity)
+        
+        digest = hashlib.sha256(ssml.encode('utf-8')).digest()
+        with self._lock:
+            attempt = self._attempts[(endpoint.name, digest)]
+            self._attempts[(endpoint.name, digest)] += 1
+            self._in_flight[endpoint.name] += 1
+            over_capacity = capacity and self._in_flight[endpoint.name] > capacity
+        
+        rng = random.Random(f"{self.seed}:{endpoint.name}:{digest.hex()}:{attempt}")
         
-        for i, chunk_text in enumerate(chunks):
-            ssml = TextProcessor.generate_ssml_for_chunk(chunk_text, voice_name, rate)
-            audio_data = self.synthesize(ssml, voice_name)
-            
-            if audio_data is None:
-                print(f"Failed to synthesize chunk {i+1}/{len(chunks)}")
-                return None
-            
-            audio_parts.append(audio_data)
+        try:
+            if over_capacity:
+                # Rejections come back quickly
+                time.sleep(latency_ms * 0.1 / 1000)
+                raise SynthesisError(SynthesisError.THROTTLED, "fake throttling (429), over capacity")
             
-            # Small delay between chunks to avoid rate limiting
-            if i < len(chunks) - 1:
-                time.sleep(0.5)
-        
-        # Concatenate all audio parts
-        return b''.join(audio_parts)
+            # Latency jitters +/-50% around the configured mean
+            time.sleep(latency_ms * rng.uniform(0.5, 1.5) / 1000)
+        finally:
+            with self._lock:
+                self._in_flight[endpoint.name] -= 1
+        
+        roll = rng.random()
+        if roll < throttle_rate:
+            raise SynthesisError(SynthesisError.THROTTLED, "fake throttling (429)")
+        if roll < throttle_rate + error_rate:
+            raise SynthesisError(SynthesisError.TRANSIENT, "fake service error")
+        
+        # Bookmark offsets follow the spoken (tag-free) text
+        bookmarks = []
+        spoken_chars = 0
+        position = 0
+        for match in self.BOOKMARK_PATTERN.finditer(ssml):
+            spoken_chars += len(self.TAG_PATTERN.sub('', ssml[position:match.start()]).strip())
+            position = match.end()
+            mark = match.group(1)
+            if mark.startswith('v') and mark[1:].isdigit():
+                bookmarks.append((int(mark[1:]), spoken_chars * self.MS_PER_CHAR))
+        spoken_chars += len(self.TAG_PATTERN.sub('', ssml[position:]).strip())
+        
+        duration_ms = spoken_chars * self.MS_PER_CHAR
+        size = duration_ms * self.BYTES_PER_MS
+        audio_data = (digest * (size // len(digest) + 1))[:size]
+        
+        return SynthesisResult(audio_data, duration_ms, bookmarks)
+
+
+BACKENDS = {
+    AzureTTSClient.name: AzureTTSClient,
+    FakeTTSBackend.name: FakeTTSBackend,
+}
+
+
+def create_backend(config: Config) -> TTSBackend:
+    """Instantiate the backend selected in the configuration."""
+    return BACKENDS[config.backend](config)
 
 
 # ============================================================================
@@ -511,25 +2503,40 @@ class AudioGenerator:
     
     def __init__(self, config: Config):
         self.config = config
-        self.tts_client = AzureTTSClient(config)
+        self.tts_client = create_backend(config)
         self.discovery = ChapterDiscovery(config)
+        self.manifest = BuildManifest(config.audio_dir)
+        self.renditions = RenditionEncoder(config.renditions)
+        self.metrics: Optional[MetricsRecorder] = None
     
     def generate_audio(self, chapter_info: Dict, voice_name: str, 
-                       dry_run: bool = False) -> bool:
+                       dry_run: bool = False,
+                       executor: Optional[Executor] = None) -> bool:
         """
         Generate audio for a single chapter.
+        
+        If an executor is given, the chapter's chunks are synthesized on it
+        concurrently (see TTSBackend.synthesize_chunks). With --metrics-out,
+        the chapter's phase timings and counters are recorded when it finishes.
         """
-        # Read markdown file
+        metrics = ChapterMetrics(chapter_info, self.metrics)
+        success = self._generate_chapter(chapter_info, voice_name, metrics, dry_run, executor)
+        if not dry_run:
+            metrics.finish(success)
+        return success
+    
+    def _generate_chapter(self, chapter_info: Dict, voice_name: str,
+                          metrics: ChapterMetrics, dry_run: bool,
+                          executor: Optional[Executor]) -> bool:
+        """Read, synthesize, write and record one chapter (see generate_audio)."""
+        # Read markdown file and extract text
         try:
-            with open(chapter_info['path'], 'r', encoding='utf-8') as f:
-                content = f.read()
+            with metrics.phase('read'):
+                chapter_title, verses = self.discovery.read_chapter(chapter_info)
         except Exception as e:
             print(f"Error reading {chapter_info['path']}: {e}")
             return False
         
-        # Extract text
-        chapter_title, verses = TextProcessor.extract_text_from_markdown(content)
-        
         if not verses:
             print(f"No verses found in {chapter_info['path']}")
             return False
@@ -542,39 +2549,127 @@ class AudioGenerator:
         # Ensure output directory exists
         self.config.audio_dir.mkdir(parents=True, exist_ok=True)
         
-        # Split into chunks and synthesize
-        chunks = TextProcessor.split_verses_into_chunks(chapter_title, verses)
+        # Split into chunks (keeping verse boundaries for bookmarks) and synthesize
+        with metrics.phase('plan'):
+            chunks = TextProcessor.split_verses_into_segments(chapter_title, verses)
+            prepared = self.tts_client.prepare_chunks(chunks, voice_name, self.config.speech_rate)
         
         if len(chunks) > 1:
             print(f"  Splitting into {len(chunks)} chunks for {chapter_info['book']} {chapter_info['chapter']}...")
         
-        audio_data = self.tts_client.synthesize_chunks(chunks, voice_name, self.config.speech_rate)
-        
-        if audio_data is None:
-            return False
+        writer = ChapterWriter(chapter_info['output_path'], [key for _, key in prepared])
         
-        # Write MP3 file
+        # Stream chunks to a temp file, then rename it into place
         try:
-            with open(chapter_info['output_path'], 'wb') as f:
-                f.write(audio_data)
-            return True
+            resumed = writer.open()
+            if resumed:
+                print(f"  Resuming {chapter_info['book']} {chapter_info['chapter']} "
+                      f"after chunk {resumed}/{len(chunks)}")
+            
+            with metrics.phase('synthesize'):
+                written = self.tts_client.synthesize_chunks(prepared, voice_name, writer,
+                                                            executor=executor, metrics=metrics)
+            if not written:
+                writer.abort()
+                return False
+            
+            with metrics.phase('commit'):
+                writer.commit()
         except Exception as e:
+            writer.abort()
             print(f"Error writing {chapter_info['output_path']}: {e}")
             return False
+        
+        # Transcode the other renditions from the synthesized audio
+        with metrics.phase('renditions'):
+            renditions = self.renditions.encode(chapter_info['output_path'],
+                                                writer.build_timing()['durationMs'])
+        if renditions is None:
+            return False
+        
+        with metrics.phase('manifest'):
+            text_hash = TextProcessor.hash_chapter_text(chapter_title, verses)
+            self.manifest.record(chapter_info, text_hash, voice_name, self.config.speech_rate,
+                                 output_format=self.config.output_format, renditions=renditions)
+        return True
+    
+    def plan_incremental(self, all_chapters: List[Dict], chapters: List[Dict],
+                         voice_name: str) -> List[Dict]:
+        """
+        Compare chapters against the build manifest and report the delta.
+        
+        Returns the chapters that are new, stale or orphaned, in input order.
+        """
+        delta: Dict[str, List[Dict]] = {
+            BuildManifest.NEW: [],
+            BuildManifest.STALE: [],
+            BuildManifest.ORPHANED: [],
+            BuildManifest.CURRENT: [],
+        }
+        queued = []
+        
+        for ch in chapters:
+            try:
+                chapter_title, verses = self.discovery.read_chapter(ch)
+            except Exception as e:
+                print(f"Error reading {ch['path']}: {e}")
+                continue
+            
+            text_hash = TextProcessor.hash_chapter_text(chapter_title, verses)
+            status = self.manifest.classify(ch, text_hash, voice_name, self.config.speech_rate,
+                                            output_format=self.config.output_format,
+                                            renditions=self.renditions.derived)
+            delta[status].append(ch)
+            if status != BuildManifest.CURRENT:
+                queued.append(ch)
+        
+        self.discovery.corpus.save()
+        
+        # Records whose source chapter is gone (only meaningful for a full run)
+        removed = []
+        if len(chapters) == len(all_chapters):
+            removed = self.manifest.prune(all_chapters)
+            if removed:
+                self.manifest.save()
+        
+        print("\nIncremental build:")
+        for status, chs in delta.items():
+            print(f"  {status.capitalize():<9} {len(chs)}")
+            if status != BuildManifest.CURRENT:
+                for ch in chs[:10]:
+                    print(f"    {ch['output_path'].name}")
+                if len(chs) > 10:
+                    print(f"    ... and {len(chs) - 10} more")
+        if removed:
+            print(f"  Removed   {len(removed)} (source no longer exists, dropped from manifest)")
+            for name in removed[:10]:
+                print(f"    {name}")
+        
+        return queued
     
     def generate_all(self, voice_name: str,
                      book: Optional[str] = None,
                      chapter: Optional[int] = None,
                      skip_existing: bool = True,
                      dry_run: bool = False,
-                     force: bool = False) -> Tuple[int, int]:
+                     force: bool = False,
+                     workers: Optional[int] = None,
+                     incremental: bool = False) -> Tuple[int, int]:
         """
         Generate audio for all matching chapters.
         
+        With workers > 1, chapters are processed by the concurrent pipeline
+        (see _generate_concurrent) instead of one after another. In
+        incremental mode, only chapters the build manifest reports as new,
+        stale or orphaned are generated.
+        
         Returns (success_count, failure_count)
         """
+        workers = workers or self.config.workers
+        self.config.workers = workers
+        
         # Initialize TTS client
-        if not dry_run and not self.tts_client.initialize():
+        if not dry_run and not (self.renditions.check() and self.tts_client.initialize()):
             return 0, 0
         
         # Get chapters
@@ -584,14 +2679,27 @@ class AudioGenerator:
             print("No chapters found!")
             return 0, 0
         
-        # Filter chapters
+        # Filter chapters, order them by demand and keep this machine's
+        # shard; existing files are skipped only after sharding so every
+        # machine agrees on the split
         chapters = self.discovery.filter_chapters(
             all_chapters, 
             book=book, 
             chapter=chapter,
-            skip_existing=skip_existing and not force
+            skip_existing=False
+        )
+        planned = JobPlanner(self.config, self.discovery).plan(chapters)
+        chapters = self.discovery.filter_chapters(
+            planned,
+            skip_existing=skip_existing and not force and not incremental
         )
         
+        if incremental and chapters:
+            chapters = self.plan_incremental(all_chapters, chapters, voice_name)
+            if not chapters:
+                print("All audio files are up to date.")
+                return 0, 0
+        
         if not chapters:
             if book or chapter:
                 print("No matching chapters found.")
@@ -601,9 +2709,9 @@ class AudioGenerator:
         
         # Show summary
         total = len(chapters)
-        skipped = len(all_chapters) - total
+        skipped = len(planned) - total
         print(f"\nFound {total} chapters to process")
-        if skipped > 0:
+        if skipped > 0 and not incremental:
             print(f"({skipped} chapters skipped - audio already exists)")
         
         if dry_run:
@@ -612,7 +2720,30 @@ class AudioGenerator:
                 self.generate_audio(ch, voice_name, dry_run=True)
             return total, 0
         
-        # Process chapters
+        # Connect the synthesizers before the clock starts on the first chapter
+        self.tts_client.warm_up(voice_name)
+        
+        if self.config.metrics_out:
+            self.metrics = MetricsRecorder(self.config.metrics_out)
+            self.metrics.open()
+        
+        try:
+            if workers > 1:
+                return self._generate_concurrent(chapters, voice_name, workers)
+            return self._generate_sequential(chapters, voice_name)
+        finally:
+            self.tts_client.close()
+            self.discovery.corpus.save()
+            if self.metrics:
+                self.metrics.close()
+                print(f"Metrics written to {self.metrics.path} and {self.metrics.prom_path}")
+    
+    def _generate_sequential(self, chapters: List[Dict], voice_name: str) -> Tuple[int, int]:
+        """
+        Process chapters one after another.
+        
+        Returns (success_count, failure_count)
+        """
         success_count = 0
         failure_count = 0
         
@@ -635,6 +2766,141 @@ class AudioGenerator:
                     print("✗")
         
         return success_count, failure_count
+    
+    def _generate_concurrent(self, chapters: List[Dict], voice_name: str,
+                             workers: int) -> Tuple[int, int]:
+        """
+        Process chapters with a bounded, pipelined worker pool.
+        
+        Up to `workers` chapters are in flight at once, each reading, parsing
+        and writing on its own thread. Their chunks all share a second pool of
+        `workers` synthesis threads, so chunks of one long chapter (e.g.
+        Psalms 119) are synthesized in parallel while other chapters are being
+        parsed or written.
+        
+        Returns (success_count, failure_count)
+        """
+        success_count = 0
+        failure_count = 0
+        
+        print(f"Using {workers} concurrent workers")
+        progress = tqdm(total=len(chapters), desc="Generating audio") if tqdm else None
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts') as chunk_pool, \
+             ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chapter') as chapter_pool:
+            futures = {
+                chapter_pool.submit(self.generate_audio, ch, voice_name, executor=chunk_pool): ch
+                for ch in chapters
+            }
+            
+            # Progress is reported from this thread only, as chapters complete
+            for done, future in enumerate(as_completed(futures), start=1):
+                ch = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    print(f"Error generating {ch['book']} {ch['chapter']}: {e}")
+                    success = False
+                
+                if success:
+                    success_count += 1
+                else:
+                    failure_count += 1
+                
+                if progress is not None:
+                    progress.update(1)
+                else:
+                    mark = "✓" if success else "✗"
+                    print(f"[{done}/{len(chapters)}] {ch['book']} {ch['chapter']} {mark}")
+        
+        if progress is not None:
+            progress.close()
+        
+        return success_count, failure_count
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class PipelineBenchmark:
+    """
+    Measure end-to-end pipeline throughput (read, parse, chunk, synthesize,
+    write) for one or more concurrency settings.
+    
+    Each run writes into a throwaway directory with the chunk cache disabled,
+    so every chunk goes to the backend. Use with --backend fake to measure
+    the pipeline itself without a live service.
+    """
+    
+    def __init__(self, config: Config):
+        self.config = config
+    
+    def run(self, voice_name: str, workers_list: List[int],
+            book: Optional[str] = None, chapter: Optional[int] = None) -> List[Dict]:
+        """Run the pipeline once per worker count. Returns one result dict per run."""
+        discovery = ChapterDiscovery(self.config)
+        chapters = discovery.filter_chapters(discovery.get_all_chapters(), book=book,
+                                             chapter=chapter, skip_existing=False)
+        
+        # Characters sent for synthesis, counted outside the timed runs
+        total_chars = 0
+        for ch in chapters:
+            chapter_title, verses = discovery.read_chapter(ch)
+            total_chars += sum(len(chunk) for chunk in
+                               TextProcessor.split_verses_into_chunks(chapter_title, verses))
+        discovery.corpus.save()
+        
+        results = []
+        for workers in workers_list:
+            with tempfile.TemporaryDirectory(prefix='tts-bench-') as tmp_dir:
+                config = copy.copy(self.config)
+                config.audio_dir = Path(tmp_dir)
+                config.cache_dir = None
+                config.workers = workers
+                
+                generator = AudioGenerator(config)
+                start = time.perf_counter()
+                success, failures = generator.generate_all(voice_name, book=book, chapter=chapter,
+                                                           force=True, workers=workers)
+                elapsed = time.perf_counter() - start
+                latencies = generator.tts_client.chunk_latencies
+            
+            results.append({
+                "workers": workers,
+                "chapters": success,
+                "failures": failures,
+                "seconds": elapsed,
+                "chaptersPerSec": success / elapsed if elapsed else 0.0,
+                "charsPerSec": total_chars / elapsed if elapsed and not failures else 0.0,
+                "chunks": len(latencies),
+                "p50Ms": percentile(latencies, 50) * 1000,
+                "p99Ms": percentile(latencies, 99) * 1000,
+            })
+        
+        return results
+    
+    @staticmethod
+    def print_report(results: List[Dict]):
+        """Print a table of benchmark results."""
+        print(f"\n{'='*78}")
+        print(f"{'Workers':>7} {'Chapters':>9} {'Failed':>7} {'Seconds':>9} "
+              f"{'Ch/s':>7} {'Chars/s':>9} {'Chunks':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        print("-" * 78)
+        for r in results:
+            print(f"{r['workers']:>7} {r['chapters']:>9} {r['failures']:>7} {r['seconds']:>9.1f} "
+                  f"{r['chaptersPerSec']:>7.2f} {r['charsPerSec']:>9.0f} {r['chunks']:>7} "
+                  f"{r['p50Ms']:>8.0f} {r['p99Ms']:>8.0f}")
+        print(f"{'='*78}")
 
 
 # ============================================================================
@@ -675,16 +2941,45 @@ def main():
             %(prog)s --voice "en-US-JennyNeural"      Generate all chapters
             %(prog)s --voice "en-US-JennyNeural" --book "Matthew"  Generate specific book
             %(prog)s --voice "en-US-JennyNeural" --dry-run         Preview without generating
+            %(prog)s --voice "en-US-JennyNeural" --workers 4       Synthesize 4 requests at a time
+            %(prog)s --voice "en-US-JennyNeural" --incremental     Regenerate only changed chapters
+            %(prog)s --plan                                         Show how chapters split into requests
+            %(prog)s --voice "en-US-JennyNeural" --shard 2/4       Generate the second of four shards
+            %(prog)s --voice "en-US-JennyNeural" --renditions standard,mobile
+                                                      Also write a low-bitrate Opus file per chapter
+            %(prog)s --backend fake --benchmark --benchmark-workers 1,4,16
+                                                      Measure pipeline throughput offline
+            %(prog)s --voice "en-US-JennyNeural" --metrics-out logs/run.jsonl --profile
+                                                      Record per-chunk timings and profile the run
 
             Environment Variables:
             AZURE_TTS_KEY      Your Azure Speech Services subscription key
             AZURE_TTS_REGION   Azure region (default: eastus)
+            AZURE_TTS_ENDPOINTS  Endpoints file (same as --endpoints)
             '''
     )
     
+    # Backend selection
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='azure',
+                        help='Speech synthesis backend (default: azure)')
+    parser.add_argument('--fake-latency', type=int, default=200, metavar='MS',
+                        help='Mean request latency of the fake backend (default: 200)')
+    parser.add_argument('--fake-throttle-rate', type=float, default=0.0, metavar='P',
+                        help='Fraction of fake requests rejected as throttled (default: 0)')
+    parser.add_argument('--fake-error-rate', type=float, default=0.0, metavar='P',
+                        help='Fraction of fake requests failing with an error (default: 0)')
+    parser.add_argument('--fake-capacity', type=int, default=0, metavar='N',
+                        help='Concurrent requests the fake backend accepts before '
+                             'throttling (default: 0, no limit)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed for the fake backend (default: 0)')
+    
     # Azure credentials
     parser.add_argument('--key', help='Azure TTS subscription key')
     parser.add_argument('--region', default='eastus', help='Azure region (default: eastus)')
+    parser.add_argument('--endpoints', metavar='FILE',
+                        help='JSON list of endpoints (key, region or host, maxConcurrency) '
+                             'to spread requests over, instead of --key/--region')
     
     # Voice selection
     parser.add_argument('--list-voices', action='store_true', 
@@ -703,6 +2998,50 @@ def main():
                         help='Show what would be done without generating files')
     parser.add_argument('--force', action='store_true',
                         help='Regenerate files even if they exist')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Regenerate only chapters whose text, voice or rate changed '
+                             'since the build manifest was written')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Number of concurrent synthesis requests (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=6, metavar='N',
+                        help='Retries per chunk for throttled or transient failures (default: 6)')
+    parser.add_argument('--order', choices=['demand', 'manifest'], default='demand',
+                        help='Chapter order: reading-plan demand first, or manifest order '
+                             '(default: demand)')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='Generate only shard I of N (e.g. 2/4), balanced by character count')
+    parser.add_argument('--plan', action='store_true',
+                        help='Report how chapters are split into synthesis requests and exit')
+    
+    # Output options
+    parser.add_argument('--output-format', metavar='NAME',
+                        help='Speech SDK MP3 output format, e.g. Audio16Khz32KBitRateMonoMp3 '
+                             '(default: Audio24Khz48KBitRateMonoMp3)')
+    parser.add_argument('--renditions', metavar='LIST', default='standard',
+                        help='Comma-separated renditions to produce from each synthesis: '
+                             + ', '.join(RenditionEncoder.PRESETS) + ' (default: standard)')
+    
+    # Cache options
+    parser.add_argument('--cache-dir', metavar='PATH',
+                        help='Chunk audio cache directory (default: .cache/tts)')
+    parser.add_argument('--cache-max-mb', type=int, default=2048, metavar='MB',
+                        help='Maximum chunk cache size in MB (default: 2048)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always synthesize, bypassing the chunk cache')
+    
+    # Benchmark options
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Measure pipeline throughput into a temporary directory and exit')
+    parser.add_argument('--benchmark-workers', metavar='LIST',
+                        help='Comma-separated worker counts to benchmark (default: --workers)')
+    
+    # Telemetry options
+    parser.add_argument('--metrics-out', metavar='FILE',
+                        help='Append per-chunk and per-chapter timings to FILE as JSON lines, '
+                             'and write a Prometheus textfile summary next to it (.prom)')
+    parser.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                        help='Profile the run with cProfile and print the hottest functions; '
+                             'also save the stats to FILE if given')
     
     args = parser.parse_args()
     
@@ -714,6 +3053,36 @@ def main():
         config.subscription_key = args.key
     if args.region:
         config.region = args.region
+    if args.endpoints:
+        config.endpoints_path = Path(args.endpoints)
+    config.workers = args.workers
+    config.max_retries = args.max_retries
+    config.job_order = args.order
+    config.backend = args.backend
+    config.fake_latency_ms = args.fake_latency
+    config.fake_throttle_rate = args.fake_throttle_rate
+    config.fake_error_rate = args.fake_error_rate
+    config.fake_seed = args.seed
+    config.fake_capacity = args.fake_capacity
+    if args.no_cache:
+        config.cache_dir = None
+    elif args.cache_dir:
+        config.cache_dir = Path(args.cache_dir)
+    config.cache_max_bytes = args.cache_max_mb * 1024 * 1024
+    if args.metrics_out:
+        config.metrics_out = Path(args.metrics_out)
+    
+    config.renditions = [r.strip() for r in args.renditions.split(',') if r.strip()]
+    unknown = [r for r in config.renditions if r not in RenditionEncoder.PRESETS]
+    if unknown:
+        parser.error(f"unknown rendition(s): {', '.join(unknown)} "
+                     f"(choose from {', '.join(RenditionEncoder.PRESETS)})")
+    
+    if args.output_format:
+        # The standard rendition is written as .mp3
+        if 'Mp3' not in args.output_format:
+            parser.error("--output-format must be an MP3 format (e.g. Audio24Khz48KBitRateMonoMp3)")
+        config.output_format = args.output_format
     
     # Create generator
     generator = AudioGenerator(config)
@@ -727,26 +3096,69 @@ def main():
         print_voices_table(voices)
         sys.exit(0)
     
-    # Require --voice for generation
-    if not args.voice:
-        parser.error("--voice is required for audio generation. Use --list-voices to see available options.")
-    
     # Validate --chapter requires --book
     if args.chapter and not args.book:
         parser.error("--chapter requires --book to be specified")
     
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    if args.shard:
+        match = re.match(r'^(\d+)/(\d+)$', args.shard)
+        if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+            parser.error("--shard must be I/N with 1 <= I <= N, e.g. 2/4")
+        config.shard = (int(match.group(1)), int(match.group(2)))
+    
+    # Handle --plan
+    if args.plan:
+        discovery = generator.discovery
+        chapters = discovery.filter_chapters(discovery.get_all_chapters(), book=args.book,
+                                             chapter=args.chapter, skip_existing=False)
+        ChunkPlanner.report([discovery.read_chapter(ch) for ch in chapters])
+        discovery.corpus.save()
+        sys.exit(0)
+    
+    # Handle --benchmark
+    if args.benchmark:
+        try:
+            workers_list = ([int(w) for w in args.benchmark_workers.split(',')]
+                            if args.benchmark_workers else [args.workers])
+        except ValueError:
+            parser.error("--benchmark-workers must be a comma-separated list of integers")
+        if any(w < 1 for w in workers_list):
+            parser.error("--benchmark-workers values must be at least 1")
+        
+        benchmark = PipelineBenchmark(config)
+        results = benchmark.run(args.voice or config.default_voice, workers_list,
+                                book=args.book, chapter=args.chapter)
+        benchmark.print_report(results)
+        sys.exit(0 if all(r['failures'] == 0 for r in results) else 1)
+    
+    # Require --voice for generation
+    if not args.voice:
+        parser.error("--voice is required for audio generation. Use --list-voices to see available options.")
+    
     # Run generation
     print(f"Using voice: {args.voice}")
     print(f"Output directory: {config.audio_dir}")
     
-    success, failures = generator.generate_all(
-        voice_name=args.voice,
-        book=args.book,
-        chapter=args.chapter,
-        skip_existing=True,
-        dry_run=args.dry_run,
-        force=args.force
-    )
+    profiler = RunProfiler() if args.profile is not None else None
+    if profiler:
+        profiler.start()
+    try:
+        success, failures = generator.generate_all(
+            voice_name=args.voice,
+            book=args.book,
+            chapter=args.chapter,
+            skip_existing=True,
+            dry_run=args.dry_run,
+            force=args.force,
+            incremental=args.incremental
+        )
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.report(path=args.profile or None)
     
     # Print summary
     if not args.dry_run and (success > 0 or failures > 0):
@@ -754,6 +3166,7 @@ def main():
         print(f"Generation complete!")
         print(f"  Success: {success}")
         print(f"  Failures: {failures}")
+        generator.tts_client.print_stats()
         print(f"{'='*50}")
     
     sys.exit(0 if failures == 0 else 1)
@@ -355,7 +355,15 @@ const Settings = {
 
 const Selector = {
     isSearch: false,
-    searchIndex: null,
+    searchIndex: null,      // Full index (data/search_index.json), only without the word index
+    searchMeta: null,       // Word index: chapter table and shard keys
+    searchShards: {},       // Shard key -> promise of {term: postings}
+    searchBlocks: {},       // Text block -> promise of [[verse, text], ...]
+    strongsShards: {},      // Concordance shard -> promise of {code: entry}
+    concordanceGroup: 100,  // Codes per concordance shard (CONCORDANCE_GROUP in data/generate_index.py)
+    minPrefix: 3,           // Shorter terms match whole words only (MIN_PREFIX in data/search_engine.py)
+    trigramMeta: null,      // Promise of the trigram index meta, or of null if not generated
+    trigramShards: {},      // Trigram shard -> promise of {trigram: delta-encoded ids}
     
     init: () => Selector.renderBooks(BOOKS),
     
@@ -480,27 +488,368 @@ const Selector = {
         const loader = document.getElementById('loader');
         list.innerHTML = ''; loader.classList.add('visible');
         
-        if (!Selector.searchIndex) {
+        // Prefer the sharded word index; fall back to scanning the full
+        // index if it has not been generated
+        if (!Selector.searchMeta) {
             try {
-                const res = await fetch('data/search_index.json');
-                if(!res.ok) throw new Error();
-                Selector.searchIndex = await res.json();
-            } catch(e) {
-                loader.classList.remove('visible');
-                list.innerHTML = '<div style="text-align:center;margin-top:20px">Search index not found.<br>Run generation script.</div>';
-                return;
+                Selector.searchMeta = Selector.prepareMeta(await Selector.fetchJSON('data/search/meta.json'));
+            } catch(e) {}
+        }
+        
+        let results, usage = null, fuzzy = false, noConcordance = false;
+        try {
+            if (Selector.searchMeta) {
+                ({results, usage} = await Selector.searchIndexed(query));
+                // No whole-word match: try the query as a substring, then close spellings
+                if (results.length === 0 && !Selector.tokenize(query).some(Selector.isStrongsCode)) {
+                    const partial = await Selector.searchTrigram(query);
+                    if (partial) ({results, fuzzy} = partial);
+                }
+            } else {
+                if (!Selector.searchIndex) Selector.searchIndex = await Selector.loadFlatIndex();
+                let codes;
+                ({codes, usage, noConcordance} = await Selector.linearCodes(query));
+                results = Selector.searchLinear(query, codes);
+            }
+        } catch(e) {
+            loader.classList.remove('visible');
+            list.innerHTML = '<div style="text-align:center;margin-top:20px">Search index not found.<br>Run generation script.</div>';
+            return;
+        }
+
+        loader.classList.remove('visible');
+        if(usage) Selector.renderUsage(usage);
+        if(fuzzy && results.length) list.innerHTML = '<div style="text-align:center;opacity:0.5;margin:10px 0">No exact matches. Showing close spellings.</div>';
+        if(results.length === 0 && noConcordance) list.innerHTML = '<div style="text-align:center;margin-top:20px">Strong\'s concordance not found.<br>Run generation script.</div>';
+        else if(results.length === 0) list.innerHTML = '<div style="text-align:center;margin-top:20px">No results found.</div>';
+        else Selector.renderResults(results);
+    },
+
+    fetchJSON: async (url) => {
+        const res = await fetch(url);
+        if(!res.ok) throw new Error(`${url}: ${res.status}`);
+        const data = await res.json();
+        // The service worker answers uncached content with an error body while offline
+        if(data && data.error === 'offline') throw new Error(data.message);
+        return data;
+    },
+
+    // Verse list for the linear scan: the columnar index when it has been
+    // generated (smaller to fetch), otherwise search_index.json
+    loadFlatIndex: async () => {
+        let c;
+        try {
+            c = await Selector.fetchJSON('data/search_columnar.json');
+        } catch(e) {
+            return Selector.fetchJSON('data/search_index.json');
+        }
+        return c.verse.map((v, i) => ({
+            n: c.chapters[c.chapter[i]],
+            v: String(v),
+            t: c.text.slice(c.offset[i], c.offset[i + 1]),
+            p: c.paths[c.chapter[i]]
+        }));
+    },
+
+    prepareMeta: (meta) => {
+        meta.shardSet = new Set(meta.shards);
+        meta.starts = meta.chapters.map(c => c[2]);
+        return meta;
+    },
+
+    // Index of the chapter holding a verse id (chapters are in id order)
+    chapterOf: (id) => {
+        const starts = Selector.searchMeta.starts;
+        let lo = 0, hi = starts.length - 1;
+        while (lo < hi) {
+            const mid = (lo + hi + 1) >> 1;
+            if (starts[mid] <= id) lo = mid; else hi = mid - 1;
+        }
+        return lo;
+    },
+
+    // Same tokenizer as data/generate_index.py
+    tokenize: (text) => text.toLowerCase().replace(/’/g, "'").match(/[a-z0-9]+(?:'[a-z0-9]+)*/g) || [],
+
+    isStrongsCode: (term) => /^[gh]\d+$/.test(term),
+
+    loadShard: (key) => {
+        if (!Selector.searchShards[key]) {
+            Selector.searchShards[key] = Selector.fetchJSON(`data/search/terms/${key.replace(/'/g, '_')}.json`)
+                .catch(e => { delete Selector.searchShards[key]; throw e; });
+        }
+        return Selector.searchShards[key];
+    },
+
+    loadTextBlock: (block) => {
+        if (!Selector.searchBlocks[block]) {
+            Selector.searchBlocks[block] = Selector.fetchJSON(`data/search/text/${block}.json`)
+                .catch(e => { delete Selector.searchBlocks[block]; throw e; });
+        }
+        return Selector.searchBlocks[block];
+    },
+
+    // Concordance entry of a Strong's code ("h7225"), or null if it never occurs:
+    // {code, v: delta-encoded verse ids, b: [[book index, occurrences], ...], n: occurrences}
+    // Without the word index's meta, the shard is found by the builder's
+    // grouping and a missing shard finds nothing
+    lookupCode: async (term) => {
+        const meta = Selector.searchMeta;
+        const code = term[0].toUpperCase() + parseInt(term.slice(1), 10);
+        const group = meta ? meta.strongsGroup : Selector.concordanceGroup;
+        const key = code[0] + Math.floor(parseInt(term.slice(1), 10) / group);
+        if (meta && !meta.strongs.includes(key)) return null;
+        
+        if (!Selector.strongsShards[key]) {
+            Selector.strongsShards[key] = Selector.fetchJSON(`data/search/strongs/${key}.json`)
+                .catch(e => { delete Selector.strongsShards[key]; throw e; });
+        }
+        const entry = (await Selector.strongsShards[key])[code];
+        return entry ? {code, ...entry} : null;
+    },
+
+    // Verses containing a term, as a Map of verse id -> first word offset.
+    // Words match by prefix ("lov" finds love, loved, loving), except that
+    // terms shorter than minPrefix ("a", "of") match whole words, which keeps
+    // them to one shard; Strong's codes (h1234) come from the concordance
+    // and have no word offset.
+    lookupTerm: async (term) => {
+        const meta = Selector.searchMeta;
+        const verses = new Map();
+        
+        if (Selector.isStrongsCode(term)) {
+            const entry = await Selector.lookupCode(term);
+            let id = 0;
+            if (entry) entry.v.forEach(gap => { id += gap; verses.set(id, null); });
+            return verses;
+        }
+        
+        // A term lives in the shard with the longest key that prefixes it;
+        // longer words starting with the term may sit in longer-keyed shards
+        const keys = [];
+        for (let len = term.length; len > 0; len--) {
+            if (meta.shardSet.has(term.slice(0, len))) { keys.push(term.slice(0, len)); break; }
+        }
+        const prefix = term.length >= Selector.minPrefix;
+        if (prefix) meta.shards.forEach(k => { if (k.length > term.length && k.startsWith(term)) keys.push(k); });
+        
+        const shards = await Promise.all(keys.map(Selector.loadShard));
+        shards.forEach(shard => {
+            Object.keys(shard).filter(t => prefix ? t.startsWith(term) : t === term).forEach(t => shard[t].forEach(posting => {
+                const first = verses.get(posting[0]);
+                if (first === undefined || posting[1] < first) verses.set(posting[0], posting[1]);
+            }));
+        });
+        return verses;
+    },
+
+    searchIndexed: async (query) => {
+        const terms = [...new Set(Selector.tokenize(query))];
+        if (terms.length === 0) return {results: [], usage: null};
+        
+        // A lone Strong's code (from "Find usage") also reports where it occurs
+        const usage = terms.length === 1 && Selector.isStrongsCode(terms[0]) ? await Selector.lookupCode(terms[0]) : null;
+        
+        const postings = await Promise.all(terms.map(Selector.lookupTerm));
+        const meta = Selector.searchMeta;
+        let results = [];
+        
+        if (terms.length === 1) {
+            postings[0].forEach((_, id) => results.push({id}));
+        } else {
+            // Walk the rarest term's verses: every match includes one of them
+            // (in the verse itself, or in the next verse for a proximity match)
+            const rarest = postings.reduce((a, b) => a.size <= b.size ? a : b);
+            const seen = new Set();
+            rarest.forEach((_, hit) => [hit - 1, hit].forEach(id => {
+                if (id < 0 || seen.has(id)) return;
+                seen.add(id);
+                
+                const inVerse = postings.filter(p => p.has(id));
+                if (inVerse.length === postings.length) {
+                    // Same verse: rank by the span between the words' first occurrences
+                    // (Strong's codes have no offset)
+                    const offsets = postings.map(p => p.get(id)).filter(o => o !== null);
+                    const wordDistance = offsets.length ? Math.max(...offsets) - Math.min(...offsets) : 0;
+                    results.push({id, matchType: 'same-verse', wordDistance});
+                } else if (inVerse.length > 0 && Selector.chapterOf(id + 1) === Selector.chapterOf(id) &&
+                           postings.every(p => p.has(id) || p.has(id + 1))) {
+                    // The remaining words are in the next verse of the same chapter
+                    results.push({id, matchType: 'proximity'});
+                }
+            }));
+        }
+        
+        results.forEach(r => {
+            const chapter = meta.chapters[Selector.chapterOf(r.id)];
+            r.n = chapter[0];
+            r.p = chapter[1];
+        });
+        results.sort(Selector.compareResults);
+        results = results.slice(0, 50);
+        
+        // Fetch text only for the verses shown
+        const blocks = [...new Set(results.map(r => Math.floor(r.id / meta.blockSize)))];
+        const texts = {};
+        await Promise.all(blocks.map(async b => { texts[b] = await Selector.loadTextBlock(b); }));
+        results.forEach(r => {
+            const [v, t] = texts[Math.floor(r.id / meta.blockSize)][r.id % meta.blockSize];
+            r.v = String(v);
+            r.t = t;
+        });
+        return {results, usage};
+    },
+
+    // Verse text as the trigram index sees it (generate_index.normalize_text):
+    // lowercase, no diacritics or apostrophes, other punctuation folded to spaces
+    normalizeText: (text) => text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase()
+        .replace(/['’]/g, '').replace(/[^\p{L}\p{N}]+/gu, ' ').trim(),
+
+    // Distinct trigrams of normalized text; padded, word starts and ends count
+    trigramsOf: (text, padded) => {
+        const s = padded ? ` ${text} ` : text;
+        const grams = new Set();
+        for (let i = 0; i + 3 <= s.length; i++) grams.add(s.slice(i, i + 3));
+        return grams;
+    },
+
+    loadTrigramMeta: () => {
+        if (!Selector.trigramMeta) {
+            Selector.trigramMeta = Selector.fetchJSON('data/search_trigrams/meta.json').catch(() => null);
+        }
+        return Selector.trigramMeta;
+    },
+
+    // Verse ids holding a trigram. Shards hold sorted runs of trigrams; a
+    // trigram is in the last shard starting at or before it.
+    lookupTrigram: async (gram) => {
+        const starts = (await Selector.loadTrigramMeta()).shards;
+        let lo = 0, hi = starts.length - 1;
+        while (lo < hi) {
+            const mid = (lo + hi + 1) >> 1;
+            if (starts[mid] <= gram) lo = mid; else hi = mid - 1;
+        }
+        if (!Selector.trigramShards[lo]) {
+            Selector.trigramShards[lo] = Selector.fetchJSON(`data/search_trigrams/${lo}.json`)
+                .catch(e => { delete Selector.trigramShards[lo]; throw e; });
+        }
+        const ids = [];
+        let id = 0;
+        ((await Selector.trigramShards[lo])[gram] || []).forEach(gap => { id += gap; ids.push(id); });
+        return ids;
+    },
+
+    // Fewest edits that turn the pattern into some substring of the text
+    substringDistance: (pattern, text) => {
+        let prev = Array.from({length: pattern.length + 1}, (_, i) => i);
+        let best = prev[pattern.length];
+        for (let j = 0; j < text.length; j++) {
+            const cur = [0];
+            for (let i = 1; i <= pattern.length; i++) {
+                cur[i] = Math.min(prev[i] + 1, cur[i - 1] + 1,
+                                  prev[i - 1] + (pattern[i - 1] === text[j] ? 0 : 1));
             }
+            best = Math.min(best, cur[pattern.length]);
+            prev = cur;
         }
+        return best;
+    },
+
+    // Search the trigram index: verses containing the normalized query
+    // ("otten" finds begotten), or failing that, verses within one edit
+    // (two for queries over seven letters) of it ("Nebuchadnezer").
+    // Candidates come from the trigram postings and are checked against
+    // the text. Returns {results, fuzzy}, or null without a trigram index.
+    searchTrigram: async (query) => {
+        const q = Selector.normalizeText(query);
+        if (q.length < 3 || !(await Selector.loadTrigramMeta())) return null;
+        
+        const grams = [...Selector.trigramsOf(q, false)];
+        const postings = await Promise.all(grams.map(Selector.lookupTrigram));
+        const meta = Selector.searchMeta;
+        
+        // Verses whose normalized text passes a check: {id, distance}
+        const verify = async (ids, distanceOf) => {
+            const blocks = [...new Set(ids.map(id => Math.floor(id / meta.blockSize)))];
+            const texts = {};
+            await Promise.all(blocks.map(async b => { texts[b] = await Selector.loadTextBlock(b); }));
+            return ids.map(id => {
+                const [v, t] = texts[Math.floor(id / meta.blockSize)][id % meta.blockSize];
+                return {id, v: String(v), t, distance: distanceOf(Selector.normalizeText(t))};
+            }).filter(r => r.distance !== null);
+        };
         
+        // Substring: every trigram, rarest first
+        postings.sort((a, b) => a.length - b.length);
+        let candidates = postings[0];
+        postings.slice(1).forEach(ids => {
+            const set = new Set(ids);
+            candidates = candidates.filter(id => set.has(id));
+        });
+        let results = await verify(candidates, text => text.includes(q) ? 0 : null);
+        let fuzzy = false;
+        
+        // Fuzzy: an edit changes at most three trigrams
+        if (results.length === 0) {
+            const maxEdits = q.length > 7 ? 2 : 1;
+            const needed = grams.length - 3 * maxEdits;
+            if (needed < 1) return {results, fuzzy};
+            const counts = new Map();
+            postings.forEach(ids => ids.forEach(id => counts.set(id, (counts.get(id) || 0) + 1)));
+            candidates = [...counts].filter(([, n]) => n >= needed).map(([id]) => id);
+            results = await verify(candidates, text => {
+                const d = Selector.substringDistance(q, text);
+                return d <= maxEdits ? d : null;
+            });
+            fuzzy = true;
+        }
+        
+        results.forEach(r => {
+            const chapter = meta.chapters[Selector.chapterOf(r.id)];
+            r.n = chapter[0];
+            r.p = chapter[1];
+        });
+        results.sort((a, b) => a.distance - b.distance || Selector.compareResults(a, b));
+        return {results: results.slice(0, 50), fuzzy};
+    },
+
+    linearWords: (query) => {
         const cleanQ = query.toLowerCase().replace(/[\\]/g, "").replace(/\[/g, "").replace(/\]/g, "");
-        const searchWords = cleanQ.split(/\s+/).filter(w => w.length > 0);
+        return {cleanQ, searchWords: cleanQ.split(/\s+/).filter(w => w.length > 0)};
+    },
+
+    // Verse text carries no Strong's codes, so the linear scan takes them from
+    // the concordance: a Map of code -> Set of verse ids (positions in the
+    // flat index), the usage of a lone code, and whether a concordance shard
+    // could not be loaded (so "no results" isn't mistaken for an unused code)
+    linearCodes: async (query) => {
+        const {searchWords} = Selector.linearWords(query);
+        const codes = new Map();
+        let usage = null, noConcordance = false;
+        for (const word of searchWords.filter(Selector.isStrongsCode)) {
+            const entry = await Selector.lookupCode(word).catch(() => { noConcordance = true; return null; });
+            const ids = new Set();
+            let id = 0;
+            if (entry) entry.v.forEach(gap => { id += gap; ids.add(id); });
+            codes.set(word, ids);
+            if (searchWords.length === 1) usage = entry;
+        }
+        return {codes, usage, noConcordance};
+    },
+
+    searchLinear: (query, codes = new Map()) => {
+        const {cleanQ, searchWords} = Selector.linearWords(query);
         
         let results = [];
         const index = Selector.searchIndex;
+        // Whether verse i holds a word: codes by verse id, words as substrings
+        const holds = (i, word) => codes.has(word) ? codes.get(word).has(i) : index[i].t.toLowerCase().includes(word);
         
         if (searchWords.length === 1) {
             // Single word: use simple search
-            results = index.filter(item => item.t.toLowerCase().includes(cleanQ));
+            results = codes.has(cleanQ)
+                ? [...codes.get(cleanQ)].filter(i => i < index.length).map(i => index[i])
+                : index.filter(item => item.t.toLowerCase().includes(cleanQ));
         } else {
             // Multi-word: proximity search (current verse + next verse only)
             for (let i = 0; i < index.length; i++) {
@@ -508,8 +857,13 @@ const Selector = {
                 const text = verse.t.toLowerCase();
                 
                 // Find positions of each word in current verse
+                // (Strong's codes have none)
                 const wordPositions = {};
                 searchWords.forEach(word => {
+                    if (codes.has(word)) {
+                        if (codes.get(word).has(i)) wordPositions[word] = null;
+                        return;
+                    }
                     const pos = text.indexOf(word);
                     if (pos !== -1) {
                         wordPositions[word] = pos;
@@ -519,9 +873,9 @@ const Selector = {
                 // All words found in current verse
                 if (Object.keys(wordPositions).length === searchWords.length) {
                     // Calculate word proximity (distance between first and last word)
-                    const positions = Object.values(wordPositions);
-                    const minPos = Math.min(...positions);
-                    const maxPos = Math.max(...positions);
+                    const positions = Object.values(wordPositions).filter(p => p !== null);
+                    const minPos = positions.length ? Math.min(...positions) : 0;
+                    const maxPos = positions.length ? Math.max(...positions) : 0;
                     const wordDistance = maxPos - minPos;
                     
                     results.push({...verse, matchType: 'same-verse', wordDistance: wordDistance});
@@ -536,8 +890,7 @@ const Selector = {
                     
                     // Must be same chapter
                     if (nextVerse.n === verse.n) {
-                        const nextText = nextVerse.t.toLowerCase();
-                        const allInNext = remainingWords.every(w => nextText.includes(w));
+                        const allInNext = remainingWords.every(w => holds(i + 1, w));
                         
                         if (allInNext) {
                             results.push({...verse, matchType: 'proximity'});
@@ -547,36 +900,54 @@ const Selector = {
             }
         }
         
-        // Sort results: same-verse first (by word proximity), then proximity matches
-        results.sort((a, b) => {
-            // Primary: matchType (same-verse before proximity)
-            if (a.matchType !== b.matchType) {
-                return a.matchType === 'same-verse' ? -1 : 1;
-            }
-            
-            // For same-verse matches, sort by word distance (closer = higher rank)
-            if (a.matchType === 'same-verse' && a.wordDistance !== b.wordDistance) {
-                return (a.wordDistance || 0) - (b.wordDistance || 0);
-            }
-            
-            // Secondary: book order
-            const lastSpaceA = a.n.lastIndexOf(' ');
-            const bookA = a.n.substring(0, lastSpaceA);
-            const chapA = parseInt(a.n.substring(lastSpaceA + 1));
-            const lastSpaceB = b.n.lastIndexOf(' ');
-            const bookB = b.n.substring(0, lastSpaceB);
-            const chapB = parseInt(b.n.substring(lastSpaceB + 1));
-            
-            if (bookA !== bookB) {
-                return (BOOK_ORDER[bookA] || 99) - (BOOK_ORDER[bookB] || 99);
-            }
-            if (chapA !== chapB) return chapA - chapB;
-            return parseInt(a.v) - parseInt(b.v);
-        });
+        results.sort(Selector.compareResults);
+        return results.slice(0, 50);
+    },
 
-        loader.classList.remove('visible');
-        if(results.length === 0) list.innerHTML = '<div style="text-align:center;margin-top:20px">No results found.</div>';
-        else Selector.renderResults(results.slice(0, 50));
+    // Sort results: same-verse first (by word proximity), then proximity matches
+    compareResults: (a, b) => {
+        // Primary: matchType (same-verse before proximity)
+        if (a.matchType !== b.matchType) {
+            return a.matchType === 'same-verse' ? -1 : 1;
+        }
+        
+        // For same-verse matches, sort by word distance (closer = higher rank)
+        if (a.matchType === 'same-verse' && a.wordDistance !== b.wordDistance) {
+            return (a.wordDistance || 0) - (b.wordDistance || 0);
+        }
+        
+        // Secondary: book order
+        const lastSpaceA = a.n.lastIndexOf(' ');
+        const bookA = a.n.substring(0, lastSpaceA);
+        const chapA = parseInt(a.n.substring(lastSpaceA + 1));
+        const lastSpaceB = b.n.lastIndexOf(' ');
+        const bookB = b.n.substring(0, lastSpaceB);
+        const chapB = parseInt(b.n.substring(lastSpaceB + 1));
+        
+        if (bookA !== bookB) {
+            // Genesis is 0, so test for unknown books explicitly
+            const orderA = bookA in BOOK_ORDER ? BOOK_ORDER[bookA] : 99;
+            const orderB = bookB in BOOK_ORDER ? BOOK_ORDER[bookB] : 99;
+            return orderA - orderB;
+        }
+        if (chapA !== chapB) return chapA - chapB;
+        // Verse ids of the word index follow verse order within a chapter
+        if (a.id !== undefined) return a.id - b.id;
+        return parseInt(a.v) - parseInt(b.v);
+    },
+
+    renderUsage: (usage) => {
+        const meta = Selector.searchMeta;
+        const verses = usage.v.length;
+        const books = usage.b
+            .map(([book, count]) => ({name: meta.books[book], count}))
+            .sort((a, b) => BOOK_ORDER[a.name] - BOOK_ORDER[b.name])
+            .map(b => `${b.name} ${b.count}`)
+            .join(' · ');
+        
+        const el = document.createElement('div'); el.className = 'result-card';
+        el.innerHTML = `<div class="res-title"><span>${usage.code}</span><span class="res-badge">${usage.n} in ${verses} verse${verses === 1 ? '' : 's'}</span></div><div class="res-snippet">${books}</div>`;
+        document.getElementById('searchList').appendChild(el);
     },
 
     renderResults: (results) => {
@@ -732,6 +1103,8 @@ const Reader = {
     highlightData: {},
     selectionIds: new Set(),
     selectedType: null,
+    lexiconPrefetch: null, // Promise of the open chapter's lexicon bundle ({code: entry})
+    lexiconStoreMissing: false, // A bundle came back 404: the store isn't published, stop asking
 
     load: async (path, name, skipRouteUpdate = false) => {
         // End any previous session before starting new one
@@ -783,10 +1156,33 @@ const Reader = {
         Reader.highlightData = hlRaw ? JSON.parse(hlRaw) : {};
 
         Reader.render(md);
+        Reader.prefetchLexicon(path, md);
         document.getElementById('readerLoading').classList.add('hidden');
         ReaderAudio.initForChapter(name);
     },
 
+    /**
+     * Fetch every lexicon entry the chapter references in one request
+     * (built by data/generate_lexicon.py), so tapping a word doesn't wait
+     * on the network. getDefinition falls back to lexicon/<code>.md.
+     * If the store hasn't been built, the first 404 stops the prefetching
+     * for the rest of the session.
+     */
+    prefetchLexicon: (path, md) => {
+        Reader.lexiconPrefetch = null;
+        if (Reader.lexiconStoreMissing) return;
+        if (!path.startsWith("bibles/") || !/\[\[[HG]\d+]\]/.test(md)) return;
+        const bundlePath = "data/lexicon_store/chapters/" + path.slice("bibles/".length).replace(/\.md$/, ".json");
+        Reader.lexiconPrefetch = fetch(bundlePath)
+            .then(res => {
+                if (res.status === 404) Reader.lexiconStoreMissing = true;
+                return res.ok ? res.json() : {};
+            })
+            // The service worker answers uncached content with an error body while offline
+            .then(entries => (entries && !entries.error) ? entries : {})
+            .catch(() => ({}));
+    },
+
     render: (md) => {
         let text = md.replace(/^\s*\[\[[\s\S]*?---/m, "").replace(/^---[\s\S]*?---/g, "").replace(/^# .*$/gm, "").replace(/^\s*---\s*$/gm, "").trim();
         const chunks = text.split(/(?=###### \d+)/);
@@ -892,7 +1288,12 @@ const Reader = {
         AppAPI.setGlobal("BibleHistory", JSON.stringify(h));
     },
 
-    verseClick: (e, id) => { e.stopPropagation(); if(Reader.selectedType==='word') Reader.clearSel(); Reader.selectedType='verse'; Reader.toggleSel(id); },
+    verseClick: (e, id) => {
+        e.stopPropagation();
+        // With audio playing or the player open, a verse number jumps playback there
+        if (ReaderAudio.isActive() && ReaderAudio.seekToVerse(id.slice(2))) return;
+        if(Reader.selectedType==='word') Reader.clearSel(); Reader.selectedType='verse'; Reader.toggleSel(id);
+    },
     wordClick: (e, id) => { e.stopPropagation(); if(Reader.selectedType==='verse') Reader.clearSel(); Reader.selectedType='word'; Reader.toggleSel(id); },
     
     toggleSel: (id) => {
@@ -945,7 +1346,7 @@ const Reader = {
         let code = null;
         Reader.selectionIds.forEach(id => { const el = document.getElementById(id); if(el.dataset.code) code = el.dataset.code; });
         if(code) {
-            AppAPI.setGlobal("BibleAutoSearch", `[\\[${code}\\]]`);
+            AppAPI.setGlobal("BibleAutoSearch", code);
             App.goHome(); 
         }
     },
@@ -954,7 +1355,8 @@ const Reader = {
         Reader.selectionIds.forEach(id => { const el = document.getElementById(id); if(el.dataset.code) code = el.dataset.code; });
         if(code) {
             const lexPath = `lexicon/${code}.md`;
-            const defText = await AppAPI.readFile(lexPath);
+            const entries = Reader.lexiconPrefetch ? await Reader.lexiconPrefetch : {};
+            const defText = (typeof entries[code] === "string" && entries[code]) || await AppAPI.readFile(lexPath);
             if(defText) {
                 document.getElementById('lexiconContent').innerHTML = defText.replace(/\n/g, "<br>");
                 document.getElementById('lexiconModal').classList.add('open');
@@ -1033,6 +1435,7 @@ const ReaderAudio = {
     })(),
     partDurations: [], totalDuration: 0, currentTrack: 0,
     currentAudioFile: null, // Track the current audio file being checked
+    timing: null, // Verse timings: { durationMs, size, verses: [[verse, startMs], ...] }
     
     initForChapter: (name) => {
         const parts = name.split(" ");
@@ -1062,7 +1465,7 @@ const ReaderAudio = {
             // Only update if this is still the current chapter
             if (ReaderAudio.currentAudioFile !== thisAudioFile) return;
             document.getElementById('btnAudio').querySelector('span').innerText = "headphones";
-            ReaderAudio.playlist = [thisAudioFile];
+            ReaderAudio.playlist = [check.src];
         };
         
         check.onerror = () => { 
@@ -1072,13 +1475,62 @@ const ReaderAudio = {
             ReaderAudio.playlist = [];
         };
         
-        check.src = thisAudioFile;
-        check.load();
+        // On metered connections, check (and play) the cheapest rendition instead
+        ReaderAudio.chooseRendition(book, chapter, thisAudioFile).then(src => {
+            if (ReaderAudio.currentAudioFile !== thisAudioFile) return;
+            check.src = src;
+            check.load();
+        });
+        
+        ReaderAudio.loadTiming(book, chapter, thisAudioFile);
         
         ReaderAudio.player.addEventListener('ended', ReaderAudio.next);
         ReaderAudio.player.addEventListener('timeupdate', ReaderAudio.updateScrubber);
     },
     
+    chooseRendition: async (book, chapter, audioFile) => {
+        // Data saver or a slow connection: use the smallest rendition this browser can play
+        const conn = navigator.connection;
+        const metered = conn && (conn.saveData || ['slow-2g', '2g', '3g'].includes(conn.effectiveType));
+        if (!metered || !window.AppConfig) return audioFile;
+        try {
+            const res = await fetch(AppConfig.audio.getRenditionsUrl(book, chapter));
+            if (!res.ok) return audioFile;
+            const index = await res.json();
+            const probe = new Audio();
+            const playable = index.renditions.filter(r => probe.canPlayType(r.mime) !== '');
+            if (playable.length === 0) return audioFile;
+            const cheapest = playable.reduce((a, b) => (b.size < a.size ? b : a));
+            return AppConfig.audio.getFileUrl(cheapest.file);
+        } catch (e) { return audioFile; /* No rendition index: standard MP3 only */ }
+    },
+    loadTiming: async (book, chapter, audioFile) => {
+        ReaderAudio.timing = null;
+        if (!window.AppConfig) return;
+        try {
+            const res = await fetch(AppConfig.audio.getTimingUrl(book, chapter));
+            if (!res.ok) return;
+            const timing = await res.json();
+            // Only keep it if this is still the current chapter
+            if (ReaderAudio.currentAudioFile === audioFile) ReaderAudio.timing = timing;
+        } catch (e) { /* Older audio has no timing sidecar */ }
+    },
+    isActive: () => !ReaderAudio.player.paused || document.getElementById('audioPlayerPopup').classList.contains('visible'),
+    seekToVerse: (verse) => {
+        // Jump straight to a verse; the browser fetches only the needed byte range
+        const entry = ReaderAudio.timing && ReaderAudio.timing.verses.find(v => v[0] === parseInt(verse));
+        if (!entry || ReaderAudio.playlist.length === 0) return false;
+        const seek = () => { ReaderAudio.player.currentTime = entry[1] / 1000; };
+        if (ReaderAudio.player.src !== ReaderAudio.playlist[0]) {
+            ReaderAudio.currentTrack = 0;
+            ReaderAudio.player.src = ReaderAudio.playlist[0];
+            ReaderAudio.player.addEventListener('loadedmetadata', seek, { once: true });
+        } else {
+            seek();
+        }
+        ReaderAudio.player.play().then(() => ReaderAudio.updateUI(true)).catch(e => console.log("Play error", e));
+        return true;
+    },
     scanFiles: () => { 
         // For single-file format, just use the playlist as-is
         if (ReaderAudio.playlist.length > 0) {
@@ -1135,6 +1587,7 @@ const ReaderAudio = {
         ReaderAudio.currentTrack = 0;
         ReaderAudio.playlist = [];    // Clear the playlist
         ReaderAudio.currentAudioFile = null; // Clear the current audio file
+        ReaderAudio.timing = null;
         document.getElementById('audioPlayerPopup').classList.remove('visible');
         ReaderAudio.updateUI(false);
         document.getElementById('btnStop').classList.add('hidden');
@@ -64,6 +64,41 @@ const AppConfig = {
             const baseUrl = this.getBaseUrl();
             const filename = `${book.replace(/ /g, '_')}_${chapter}.mp3`;
             return `${baseUrl}/${filename}`;
+        },
+        
+        /**
+         * Build the URL of a chapter's verse timing sidecar
+         * (written by generate_audio.py next to the MP3)
+         * @param {string} book - Book name (e.g., "Genesis", "1 Samuel")
+         * @param {number|string} chapter - Chapter number
+         * @returns {string} Full URL to the timing JSON
+         */
+        getTimingUrl: function(book, chapter) {
+            const baseUrl = this.getBaseUrl();
+            const filename = `${book.replace(/ /g, '_')}_${chapter}.timing.json`;
+            return `${baseUrl}/${filename}`;
+        },
+        
+        /**
+         * Build the URL of a chapter's rendition index, which lists every
+         * encoding of the chapter (e.g. a low-bitrate Opus variant) with its size
+         * @param {string} book - Book name (e.g., "Genesis", "1 Samuel")
+         * @param {number|string} chapter - Chapter number
+         * @returns {string} Full URL to the renditions JSON
+         */
+        getRenditionsUrl: function(book, chapter) {
+            const baseUrl = this.getBaseUrl();
+            const filename = `${book.replace(/ /g, '_')}_${chapter}.renditions.json`;
+            return `${baseUrl}/${filename}`;
+        },
+        
+        /**
+         * Build the URL of a file in the audio directory
+         * @param {string} filename - File name (e.g., "Genesis_1.mobile.ogg")
+         * @returns {string} Full URL to the file
+         */
+        getFileUrl: function(filename) {
+            return `${this.getBaseUrl()}/${filename}`;
         }
     },
     
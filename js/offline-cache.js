@@ -2,10 +2,19 @@
  * OfflineCache - Manages downloading and caching of all Bible content
  */
 const OfflineCache = {
+    CONTENT_CACHE: 'bible-content-v1',
+    // The manifest of the last complete sync, kept in the content cache
+    SYNCED_KEY: 'data/content_manifest.synced.json',
+    // Up to this many files, taking less than half a bundle, are fetched by Range
+    RANGE_MAX_FILES: 8,
+    // Cached files carry their content hash in this header (as sw.js stores them)
+    HASH_HEADER: 'X-Content-Hash',
     isDownloading: false,
     totalFiles: 0,
     downloadedFiles: 0,
     failedFiles: 0,
+    totalBytes: 0,
+    downloadedBytes: 0,
     
     /**
      * Initialize the offline cache module
@@ -19,7 +28,7 @@ const OfflineCache = {
      */
     getManifest: async function() {
         try {
-            const response = await fetch('data/content_manifest.json');
+            const response = await fetch('data/content_manifest.json', { cache: 'no-cache' });
             if (!response.ok) throw new Error('Manifest not found');
             return await response.json();
         } catch (e) {
@@ -28,6 +37,183 @@ const OfflineCache = {
         }
     },
     
+    /**
+     * Get the manifest of the last complete sync ({version, entries}), if any
+     */
+    getSyncedManifest: async function(cache) {
+        const response = await cache.match(this.SYNCED_KEY);
+        return response ? response.json() : null;
+    },
+    
+    /**
+     * Content hash of some bytes as the manifest writes it (SHA-256, first 16 hex digits)
+     */
+    hashOf: async function(data) {
+        const digest = await crypto.subtle.digest('SHA-256', data);
+        return [...new Uint8Array(digest)].map(b => b.toString(16).padStart(2, '0')).join('').slice(0, 16);
+    },
+    
+    /**
+     * Bytes a download will take over the network: the brotli or gzip size
+     * when the manifest lists precompressed sidecars, the plain size if not
+     */
+    transferSize: function(size, gzip, brotli) {
+        return brotli ?? gzip ?? size;
+    },
+    
+    formatBytes: function(bytes) {
+        return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+    },
+    
+    contentType: function(file) {
+        return file.endsWith('.json') ? 'application/json' : 'text/markdown; charset=utf-8';
+    },
+    
+    /**
+     * A response for the content cache, with the file's content hash in HASH_HEADER
+     */
+    cachedResponse: function(file, body, hash) {
+        return new Response(body, { headers: { 'Content-Type': this.contentType(file), [this.HASH_HEADER]: hash } });
+    },
+    
+    /**
+     * Decide what a sync has to do: {files, remove, changed}
+     * - Same version as the last sync: nothing.
+     * - Last sync is in the manifest's history: the files the deltas since
+     *   then changed (changed = true: cached copies are out of date).
+     * - Otherwise: every file; cached copies are kept if their hash matches.
+     */
+    planSync: async function(manifest, synced) {
+        if (!manifest.entries) {
+            // Manifest without hashes: fetch whatever is not cached
+            return { files: manifest.files, remove: [], changed: false };
+        }
+        if (synced && synced.version === manifest.version) {
+            return { files: [], remove: [], changed: false };
+        }
+        
+        const history = manifest.history || [];
+        const start = synced ? history.indexOf(synced.version) : -1;
+        if (start !== -1) {
+            try {
+                const changed = new Set();
+                const removed = new Set();
+                for (const version of history.slice(start, -1)) {
+                    const response = await fetch(`data/content_deltas/${version}.json`, { cache: 'no-cache' });
+                    if (!response.ok) throw new Error(`Delta ${version} not found`);
+                    const delta = await response.json();
+                    Object.keys(delta.changed).forEach(file => { changed.add(file); removed.delete(file); });
+                    delta.removed.forEach(file => { removed.add(file); changed.delete(file); });
+                }
+                return { files: [...changed], remove: [...removed], changed: true };
+            } catch (e) {
+                console.warn('[OfflineCache] Deltas unavailable, comparing hashes:', e);
+            }
+        }
+        
+        const remove = synced ? Object.keys(synced.entries).filter(file => !(file in manifest.entries)) : [];
+        return { files: manifest.files, remove, changed: false };
+    },
+    
+    /**
+     * Whether the cache holds the manifest's version of a file. A cached
+     * copy that is out of date is deleted, or the service worker would
+     * answer the download with it.
+     */
+    isCurrent: async function(cache, file, manifest, synced, changed) {
+        const cached = await cache.match(file);
+        if (!cached) return false;
+        if (!changed) {
+            const expected = manifest.entries && manifest.entries[file];
+            if (!expected) return true;
+            // Unchanged since the last sync, or the cached bytes match
+            const known = synced && synced.entries[file];
+            if (known && known[0] === expected[0]) return true;
+            // Copies cached before hashes were stored have to be hashed here
+            const hash = cached.headers.get(this.HASH_HEADER) ?? await this.hashOf(await cached.arrayBuffer());
+            if (hash === expected[0]) return true;
+        }
+        await cache.delete(file);
+        return false;
+    },
+    
+    /**
+     * Download and cache one file
+     */
+    fetchFile: async function(cache, file) {
+        const response = await fetch(file, { cache: 'no-cache' });
+        if (!response.ok) throw new Error(`Failed to fetch ${file}`);
+        const body = await response.arrayBuffer();
+        await cache.put(file, this.cachedResponse(file, body, await this.hashOf(body)));
+    },
+    
+    /**
+     * Whether files are fetched out of a bundle by Range rather than whole
+     */
+    useRanges: function(info, files) {
+        const bytes = files.reduce((sum, file) => sum + info.files[file][1], 0);
+        return files.length <= this.RANGE_MAX_FILES && bytes * 2 < info.size;
+    },
+    
+    /**
+     * Bytes fetchFromBundle will transfer: the ranges, which are sent
+     * uncompressed, or the whole bundle
+     */
+    bundleTransferSize: function(info, files) {
+        if (this.useRanges(info, files)) {
+            return files.reduce((sum, file) => sum + info.files[file][1], 0);
+        }
+        return this.transferSize(info.size, info.gzip, info.brotli);
+    },
+    
+    /**
+     * Cache files out of a bundle: the whole bundle in one request, or only
+     * their byte ranges when they are a small part of it. Each file is
+     * checked against its manifest hash. Returns the files that could not
+     * be taken from the bundle.
+     */
+    fetchFromBundle: async function(cache, bundle, files, manifest) {
+        const info = manifest.bundles[bundle];
+        let slices;
+        
+        try {
+            if (this.useRanges(info, files)) {
+                slices = await Promise.all(files.map(async file => {
+                    const [offset, length] = info.files[file];
+                    const response = await fetch(bundle, {
+                        cache: 'no-cache',
+                        headers: { Range: `bytes=${offset}-${offset + length - 1}` }
+                    });
+                    if (!response.ok) throw new Error(`Failed to fetch ${bundle}`);
+                    const body = new Uint8Array(await response.arrayBuffer());
+                    // A server that ignores Range sends the whole bundle
+                    return response.status === 206 ? body : body.subarray(offset, offset + length);
+                }));
+            } else {
+                const response = await fetch(bundle, { cache: 'no-cache' });
+                if (!response.ok) throw new Error(`Failed to fetch ${bundle}`);
+                const body = new Uint8Array(await response.arrayBuffer());
+                slices = files.map(file => {
+                    const [offset, length] = info.files[file];
+                    return body.subarray(offset, offset + length);
+                });
+            }
+        } catch (e) {
+            console.warn('[OfflineCache] Bundle unavailable, fetching its files one by one:', e);
+            return files;
+        }
+        
+        const failed = [];
+        await Promise.all(files.map(async (file, i) => {
+            if (await this.hashOf(slices[i]) !== manifest.entries[file][0]) {
+                failed.push(file);
+                return;
+            }
+            await cache.put(file, this.cachedResponse(file, slices[i], manifest.entries[file][0]));
+        }));
+        return failed;
+    },
+    
     /**
      * Update the storage info display
      */
@@ -48,8 +234,8 @@ const OfflineCache = {
             }
             
             // Count cached files from content cache
-            const cache = await caches.open('bible-content-v1');
-            const keys = await cache.keys();
+            const cache = await caches.open(this.CONTENT_CACHE);
+            const keys = (await cache.keys()).filter(request => !request.url.endsWith(this.SYNCED_KEY));
             cachedFilesEl.textContent = keys.length.toLocaleString();
         } catch (e) {
             console.error('[OfflineCache] Failed to get storage info:', e);
@@ -77,61 +263,150 @@ const OfflineCache = {
         }
         
         this.isDownloading = true;
-        this.totalFiles = manifest.totalFiles;
         this.downloadedFiles = 0;
         this.failedFiles = 0;
+        this.totalBytes = 0;
+        this.downloadedBytes = 0;
         
         // Update UI
         btn.disabled = true;
         btn.innerHTML = '<span class="material-icons-round spin">sync</span> Downloading...';
         progressContainer.classList.remove('hidden');
         progressFill.style.width = '0%';
-        progressText.textContent = `Preparing to download ${this.totalFiles.toLocaleString()} files...`;
+        progressText.textContent = 'Checking for changes...';
         
-        const cache = await caches.open('bible-content-v1');
+        const cache = await caches.open(this.CONTENT_CACHE);
         const batchSize = 10; // Download in batches to avoid overwhelming the browser
+        let fetchedFiles = 0;
         
         try {
-            for (let i = 0; i < manifest.files.length; i += batchSize) {
-                const batch = manifest.files.slice(i, i + batchSize);
-                
-                const results = await Promise.allSettled(
-                    batch.map(async (file) => {
-                        // Check if already cached
-                        const cached = await cache.match(file);
-                        if (cached) return { file, cached: true };
-                        
-                        // Fetch and cache
-                        const response = await fetch(file);
-                        if (!response.ok) throw new Error(`Failed to fetch ${file}`);
-                        await cache.put(file, response);
-                        return { file, cached: false };
-                    })
+            const synced = await this.getSyncedManifest(cache);
+            const plan = await this.planSync(manifest, synced);
+            this.totalFiles = plan.files.length;
+            
+            await Promise.all(plan.remove.map(file => cache.delete(file)));
+            
+            // By files while checking the cache, by bytes once downloading
+            const showProgress = () => {
+                const files = `${this.downloadedFiles.toLocaleString()} / ${this.totalFiles.toLocaleString()} files`;
+                if (this.totalBytes > 0) {
+                    const progress = Math.round((this.downloadedBytes / this.totalBytes) * 100);
+                    progressFill.style.width = `${progress}%`;
+                    progressText.textContent = `${files} · ${this.formatBytes(this.downloadedBytes)} / ${this.formatBytes(this.totalBytes)} (${progress}%)`;
+                } else {
+                    const progress = Math.round((this.downloadedFiles / this.totalFiles) * 100);
+                    progressFill.style.width = `${progress}%`;
+                    progressText.textContent = `${files} (${progress}%)`;
+                }
+            };
+            
+            // Check what the cache already holds
+            const missing = [];
+            for (let i = 0; i < plan.files.length; i += batchSize) {
+                const batch = plan.files.slice(i, i + batchSize);
+                const current = await Promise.all(
+                    batch.map(file => this.isCurrent(cache, file, manifest, synced, plan.changed))
                 );
+                batch.forEach((file, j) => {
+                    if (current[j]) this.downloadedFiles++;
+                    else missing.push(file);
+                });
+                if (i % (batchSize * 50) === 0) showProgress();
+            }
+            showProgress();
+            
+            // Take what the bundles hold from them, a bundle at a time
+            const bundled = new Map();
+            Object.entries(manifest.bundles || {}).forEach(([bundle, info]) => {
+                Object.keys(info.files).forEach(file => bundled.set(file, bundle));
+            });
+            const groups = new Map();
+            const loose = [];
+            missing.forEach(file => {
+                const bundle = bundled.get(file);
+                if (!bundle) return loose.push(file);
+                if (!groups.has(bundle)) groups.set(bundle, []);
+                groups.get(bundle).push(file);
+            });
+            
+            // What the download will transfer; a file a bundle fails to
+            // deliver is counted again when it is fetched loose
+            const fileTransferSize = file => {
+                const entry = manifest.entries && manifest.entries[file];
+                return entry ? this.transferSize(entry[1], entry[2], entry[3]) : 0;
+            };
+            for (const [bundle, files] of groups) {
+                this.totalBytes += this.bundleTransferSize(manifest.bundles[bundle], files);
+            }
+            loose.forEach(file => { this.totalBytes += fileTransferSize(file); });
+            
+            // The cache stores files uncompressed; stop early if they won't fit
+            const storedBytes = missing.reduce((sum, file) => {
+                const entry = manifest.entries && manifest.entries[file];
+                return sum + (entry ? entry[1] : 0);
+            }, 0);
+            if (navigator.storage && navigator.storage.estimate) {
+                const estimate = await navigator.storage.estimate();
+                if (estimate.quota && estimate.quota - estimate.usage < storedBytes) {
+                    throw new Error(`Not enough storage: ${this.formatBytes(storedBytes)} needed, ${this.formatBytes(estimate.quota - estimate.usage)} available`);
+                }
+            }
+            showProgress();
+            
+            for (const [bundle, files] of groups) {
+                const failed = await this.fetchFromBundle(cache, bundle, files, manifest);
+                this.downloadedFiles += files.length - failed.length;
+                fetchedFiles += files.length - failed.length;
+                this.downloadedBytes += this.bundleTransferSize(manifest.bundles[bundle], files);
+                failed.forEach(file => { this.totalBytes += fileTransferSize(file); });
+                loose.push(...failed);
+                showProgress();
+            }
+            
+            // Everything else file by file
+            for (let i = 0; i < loose.length; i += batchSize) {
+                const batch = loose.slice(i, i + batchSize);
+                
+                const results = await Promise.allSettled(batch.map(file => this.fetchFile(cache, file)));
                 
                 // Update counters
-                results.forEach(result => {
+                results.forEach((result, j) => {
+                    this.downloadedBytes += fileTransferSize(batch[j]);
                     if (result.status === 'fulfilled') {
                         this.downloadedFiles++;
+                        fetchedFiles++;
                     } else {
                         this.failedFiles++;
                     }
                 });
-                
-                // Update progress
-                const progress = Math.round((this.downloadedFiles / this.totalFiles) * 100);
-                progressFill.style.width = `${progress}%`;
-                progressText.textContent = `${this.downloadedFiles.toLocaleString()} / ${this.totalFiles.toLocaleString()} files (${progress}%)`;
+                showProgress();
                 
                 // Small delay between batches to prevent UI freezing
                 await new Promise(resolve => setTimeout(resolve, 10));
             }
             
+            // Remember what was synced, so the next sync only fetches what changed since
+            if (this.failedFiles === 0 && manifest.entries) {
+                await cache.put(this.SYNCED_KEY, new Response(
+                    JSON.stringify({ version: manifest.version, entries: manifest.entries }),
+                    { headers: { 'Content-Type': 'application/json' } }
+                ));
+                // The service worker checks cached content against the manifest it loaded
+                if (navigator.serviceWorker && navigator.serviceWorker.controller) {
+                    navigator.serviceWorker.controller.postMessage('content-manifest-updated');
+                }
+            }
+            
+            progressFill.style.width = '100%';
+            
             // Complete
             if (this.failedFiles > 0) {
                 progressText.textContent = `Complete! ${this.downloadedFiles.toLocaleString()} files cached, ${this.failedFiles} failed.`;
+            } else if (this.totalFiles === 0) {
+                progressText.textContent = 'Complete! Offline content is already up to date.';
             } else {
-                progressText.textContent = `Complete! All ${this.downloadedFiles.toLocaleString()} files cached for offline use.`;
+                const transferred = this.totalBytes > 0 ? ` (${this.formatBytes(this.downloadedBytes)})` : '';
+                progressText.textContent = `Complete! ${fetchedFiles.toLocaleString()} files downloaded${transferred}, all ${manifest.totalFiles.toLocaleString()} cached for offline use.`;
             }
             
             btn.innerHTML = '<span class="material-icons-round">check</span> Download Complete';
@@ -158,7 +433,7 @@ const OfflineCache = {
         }
         
         try {
-            await caches.delete('bible-content-v1');
+            await caches.delete(this.CONTENT_CACHE);
             await this.updateStorageInfo();
             
             // Reset UI
@@ -1,4 +1,4 @@
-const CACHE_NAME = "bible-app-v9";
+const CACHE_NAME = "bible-app-v18";
 const CONTENT_CACHE = "bible-content-v1";
 const APP_SHELL = [
   "./",
@@ -26,6 +26,48 @@ const APP_SHELL = [
   "./icons/icon-512x512.png"
 ];
 
+// Cached content carries its content hash (SHA-256, first 16 hex digits,
+// as the manifest writes it) in this header, computed once when stored
+const HASH_HEADER = "X-Content-Hash";
+
+// The manifest's entries are loaded once per worker start (an idle worker
+// is stopped within minutes) and again after an offline sync
+let manifestEntries = null;
+
+// {path: [hash, size]} from the content manifest, or null if unavailable
+function getManifestEntries() {
+  if (!manifestEntries) {
+    manifestEntries = fetch(new URL("data/content_manifest.json", self.registration.scope), { cache: "no-cache" })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((manifest) => (manifest && manifest.entries) || null)
+      .catch(() => null);
+    // Try again next time if it could not be loaded
+    manifestEntries.then((entries) => { if (!entries) manifestEntries = null; });
+  }
+  return manifestEntries;
+}
+
+// A copy of a network response for the content cache, with its content hash
+async function withContentHash(response) {
+  const body = await response.arrayBuffer();
+  const digest = await crypto.subtle.digest("SHA-256", body);
+  const hash = [...new Uint8Array(digest)].map((b) => b.toString(16).padStart(2, "0")).join("").slice(0, 16);
+  return new Response(body, {
+    headers: { "Content-Type": response.headers.get("Content-Type") || "", [HASH_HEADER]: hash }
+  });
+}
+
+// Whether a cached response may be out of date: its stored hash differs
+// from the manifest's (copies cached without one count), or the manifest
+// does not list it
+async function isStale(url, cached) {
+  const entries = await getManifestEntries();
+  const scope = new URL(self.registration.scope).pathname;
+  const entry = entries && entries[decodeURIComponent(url.pathname.slice(scope.length))];
+  if (!entry) return true;
+  return cached.headers.get(HASH_HEADER) !== entry[0];
+}
+
 // Install event - cache app shell
 self.addEventListener("install", (e) => {
   e.waitUntil(
@@ -62,23 +104,39 @@ self.addEventListener("fetch", (e) => {
     return;
   }
   
-  // Bible content, lexicon, and search index - cache first, then network
+  // Content manifest, deltas and bundles - always from the network, so an
+  // offline sync sees the current version (bundles are unpacked into the
+  // content cache file by file)
+  if (url.pathname.endsWith("/data/content_manifest.json") ||
+      url.pathname.includes("/data/content_deltas/") ||
+      url.pathname.includes("/data/bundles/")) {
+    return;
+  }
+  
+  // Bible content, lexicon (with per-chapter lexicon bundles), and search
+  // index - cache first, then network
   // This ensures content is available offline once it's been read
   if (url.pathname.includes("/bibles/") || 
       url.pathname.includes("/lexicon/") || 
+      url.pathname.includes("/data/lexicon_store/") ||
       url.pathname.includes("search_index.json") ||
+      url.pathname.includes("search_columnar.json") ||
+      url.pathname.includes("/data/search/") ||
+      url.pathname.includes("/data/search_trigrams/") ||
       url.pathname.includes("/plans/")) {
     e.respondWith(
       caches.open(CONTENT_CACHE).then((cache) => {
         return cache.match(e.request).then((cached) => {
           // Return cached version immediately if available
           if (cached) {
-            // Fetch in background to update cache
-            fetch(e.request).then((net) => {
-              if (net.ok) {
-                cache.put(e.request, net.clone());
-              }
-            }).catch(() => {}); // Ignore network errors
+            // Refresh in the background, unless the manifest shows the cached copy is current
+            isStale(url, cached)
+              .then((stale) => stale && fetch(e.request))
+              .then((net) => {
+                if (net && net.ok) {
+                  return withContentHash(net).then((copy) => cache.put(e.request, copy));
+                }
+              }).catch(() => {}); // Ignore network errors
             return cached;
           }
           
@@ -86,7 +144,7 @@ self.addEventListener("fetch", (e) => {
           return fetch(e.request)
             .then((net) => {
               if (net.ok) {
-                cache.put(e.request, net.clone());
+                withContentHash(net.clone()).then((copy) => cache.put(e.request, copy));
               }
               return net;
             })
@@ -149,6 +207,11 @@ self.addEventListener("message", (e) => {
     caches.delete(CONTENT_CACHE);
   }
   
+  // An offline sync fetched a newer manifest; reload its hashes
+  if (e.data === "content-manifest-updated") {
+    manifestEntries = null;
+  }
+  
   // Allow the app to pre-cache specific chapters
   if (e.data && e.data.type === "cache-urls") {
     caches.open(CONTENT_CACHE).then((cache) => {